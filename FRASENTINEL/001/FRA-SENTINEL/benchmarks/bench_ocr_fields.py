@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Patta OCR field parsing
+Reports per-document parse time of the precompiled PattaFieldParser against
+the previous loop of re.search calls on pattern strings
+
+Usage: python benchmarks/bench_ocr_fields.py [--documents 200] [--noise 0 2000 10000]
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add webgis to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'webgis'))
+
+from patta_fields import FieldPatterns, PattaFieldParser
+
+PATTA_1 = ("மாவட்டம் : கடலூர் வட்டம் : குறிஞ்சிப்பாடி Arugampattu பட்டா எண் : 366 "
+           "1. இராமச்சந்திரன் மனைவி ஆனந்தபிரியா புல எண் 8 0 - 19.50 1.08 தீர்வை: 2.40 "
+           "ANNADURAI P 12/05/2019 10:11:12:PM RTR1234/2019")
+
+PATTA_2 = ("பெரம்பலூர் (வடக்கு) பட்டா எண் 2423 1. துரைசாமி நாடார் மகன் சுயம்பு(எ)லிங்கராஜ் "
+           "0.28.1 22-09-2017 10-10-2024 2017/0105/16/018690 - 2017/16/03/001156SD "
+           "eservices.tn.gov.in")
+
+WORDS = ["நிலம்", "உரிமை", "கிராமம்", "land", "record", "office", "Tamil", "Nadu", "page"]
+
+def string_matches(self, text, folded=None):
+    """The previous loop shape: re.search on each pattern string in priority order"""
+    for index, source in enumerate(self.sources):
+        match = re.search(source, text, self.flags)
+        if match:
+            yield index, match
+
+def documents(count, noise):
+    """Patta texts padded with ``noise`` characters of OCR'd boilerplate"""
+    rng = random.Random(7)
+    texts = []
+    for index in range(count):
+        padding = []
+        while sum(len(word) + 1 for word in padding) < noise:
+            padding.append(rng.choice(WORDS))
+        texts.append(' '.join(padding) + ' ' + (PATTA_1, PATTA_2)[index % 2])
+    return texts
+
+def parse_all(parser, texts):
+    for text in texts:
+        parser.parse(text)
+
+def best_of(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--noise', type=int, nargs='+', default=[0, 2000, 10000],
+                        help='characters of boilerplate ahead of the fields')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    field_parser = PattaFieldParser()
+    compiled_matches = FieldPatterns.matches
+
+    print(f"{args.documents} documents, best of {args.repeat}")
+    print(f"{'noise chars':>11} {'re.search us/doc':>17} {'compiled us/doc':>16} {'speedup':>8}")
+    for noise in args.noise:
+        texts = documents(args.documents, noise)
+        FieldPatterns.matches = string_matches
+        try:
+            string_time = best_of(parse_all, args.repeat, field_parser, texts)
+        finally:
+            FieldPatterns.matches = compiled_matches
+        compiled_time = best_of(parse_all, args.repeat, field_parser, texts)
+        print(f"{noise:>11} {string_time / len(texts) * 1e6:>17.1f} "
+              f"{compiled_time / len(texts) * 1e6:>16.1f} {string_time / compiled_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: page image handoff to Tesseract
+Reports per-page time and peak RSS of passing rasterized 300-DPI pages to
+Tesseract through a PNG round-trip (before) and the raw handoff (after)
+
+Without a tesseract binary only the handoff is timed: everything from the
+rendered page up to the temp file pytesseract writes for the CLI.
+
+Usage: python benchmarks/bench_page_handoff.py [--pages 5] [--dpi 300] [--ocr]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import subprocess
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from PIL import Image, ImageDraw
+import pytesseract
+
+from digitization import image_handoff
+
+WORDS = ["Patta", "Survey", "No", "Village", "Taluk", "District", "Owner", "Extent", "Hectare"]
+
+def render_page(page_number, dpi):
+    """A synthetic A4 page of text lines, as pdf2image would return it"""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    page = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(page)
+    rng = np.random.default_rng(page_number)
+    for y in range(dpi // 2, height - dpi // 2, dpi // 6):
+        line = ' '.join(rng.choice(WORDS, size=12))
+        draw.text((dpi // 2, y), line, fill='black')
+    return page
+
+def png_roundtrip(page):
+    """The previous handoff: PNG-encode the page and open the encoded copy"""
+    buffer = io.BytesIO()
+    page.save(buffer, format='PNG')
+    buffer.seek(0)
+    return Image.open(buffer)
+
+def handoff_before(page):
+    with pytesseract.pytesseract.save(png_roundtrip(page)):
+        pass
+
+def handoff_after(page):
+    if image_handoff.TESSEROCR_AVAILABLE:
+        np.ascontiguousarray(image_handoff.as_array(page)).tobytes()
+        return
+    with pytesseract.pytesseract.save(image_handoff.tesseract_input(page)):
+        pass
+
+def ocr_before(page):
+    pytesseract.image_to_string(png_roundtrip(page), lang='eng', config='--psm 6')
+
+def ocr_after(page):
+    image_handoff.image_to_string(page, lang='eng', config='--psm 6')
+
+MODES = {
+    ('before', False): handoff_before,
+    ('after', False): handoff_after,
+    ('before', True): ocr_before,
+    ('after', True): ocr_after,
+}
+
+def run_mode(mode, pages, dpi, ocr):
+    """Time one mode in this process and print its per-page time and peak RSS as JSON"""
+    func = MODES[(mode, ocr)]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Warm up on a first page so lazy imports are not timed
+    func(render_page(0, dpi))
+    timings = []
+    for page_number in range(1, pages + 1):
+        page = render_page(page_number, dpi)
+        start = time.perf_counter()
+        func(page)
+        timings.append(time.perf_counter() - start)
+        del page
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'ms_per_page': sum(timings) / len(timings) * 1000,
+                      'peak_rss_mb': peak / 1024, 'rss_growth_mb': (peak - baseline) / 1024}))
+
+def measure(mode, args):
+    """Run a mode in a fresh interpreter so each gets its own peak RSS"""
+    command = [sys.executable, __file__, '--mode', mode, '--pages', str(args.pages), '--dpi', str(args.dpi)]
+    if args.ocr:
+        command.append('--ocr')
+    output = subprocess.run(command, check=True, capture_output=True, text=True,
+                            env=dict(os.environ, OMP_THREAD_LIMIT='1')).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--ocr', action='store_true',
+                        help='include the Tesseract run itself (needs the tesseract binary)')
+    parser.add_argument('--mode', choices=['before', 'after'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.pages, args.dpi, args.ocr)
+        return
+    if args.ocr and not shutil.which(pytesseract.pytesseract.tesseract_cmd):
+        parser.error('--ocr needs the tesseract binary on PATH')
+
+    after_label = 'raw API' if image_handoff.TESSEROCR_AVAILABLE else f'{image_handoff.TEMP_FORMAT} temp file'
+    scope = 'handoff + OCR' if args.ocr else 'handoff only'
+    print(f"{args.pages} pages at {args.dpi} DPI, {scope}, after = {after_label}")
+    print(f"{'':>8} {'ms/page':>9} {'peak RSS MB':>12} {'RSS growth MB':>14}")
+    results = {mode: measure(mode, args) for mode in ('before', 'after')}
+    for mode, result in results.items():
+        print(f"{mode:>8} {result['ms_per_page']:>9.1f} {result['peak_rss_mb']:>12.1f} "
+              f"{result['rss_growth_mb']:>14.1f}")
+    print(f"speedup {results['before']['ms_per_page'] / results['after']['ms_per_page']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: polygon projection for raster tiles
+Reports vertices/sec of the vectorized TileProjector path used by
+_polygon_to_pixels against projecting one vertex at a time
+
+Usage: python benchmarks/bench_polygon_projection.py [--vertices 100 10000 100000] [--radius 0.6]
+"""
+
+import sys
+import math
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add webgis to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'webgis'))
+
+from tiles import RASTER_BUFFER, TILE_SIZE, TileRenderer, deg2num, num2deg
+from tiles.projection import TileProjector
+
+def per_vertex(renderer, geometry, projector):
+    """The previous loop shape: one scalar projection per exterior ring vertex, no clipping"""
+    pixels = []
+    for lon, lat in geometry['coordinates'][0]:
+        px, py = projector.project(lon, lat)
+        pixels.append((int(px), int(py)))
+    return pixels
+
+def vectorized(renderer, geometry, projector):
+    """Project, clip and floor every ring as arrays (_polygon_to_pixels)"""
+    return renderer._polygon_to_pixels(geometry, projector)
+
+def best_of(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def circle(lat, lon, radius, count):
+    """A closed polygon ring of ``count`` vertices around a centre"""
+    angles = np.linspace(0, 2 * math.pi, count, endpoint=False)
+    ring = np.column_stack((lon + radius * np.cos(angles), lat + radius * np.sin(angles))).tolist()
+    return {'type': 'Polygon', 'coordinates': [ring + ring[:1]]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--vertices', type=int, nargs='+', default=[100, 1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--zoom', type=int, default=10)
+    parser.add_argument('--radius', type=float, default=0.6,
+                        help='ring radius as a fraction of the tile width (above 0.5 the ring is clipped)')
+    args = parser.parse_args()
+
+    renderer = TileRenderer()
+    z = args.zoom
+    x, y = deg2num(21.5, 80.5, z)
+    lat_min, lon_min = num2deg(x, y + 1, z)
+    lat_max, lon_max = num2deg(x + 1, y, z)
+    projector = TileProjector(z, x, y, TILE_SIZE)
+    centre_lat, centre_lon = (lat_min + lat_max) / 2, (lon_min + lon_max) / 2
+    radius = args.radius * (lon_max - lon_min)
+
+    print(f"Tile z{z} ({TILE_SIZE}px, {RASTER_BUFFER}px clip buffer), best of {args.repeat}")
+    print(f"{'vertices':>9} {'loop Mvert/s':>13} {'NumPy Mvert/s':>14} {'speedup':>8}")
+    for count in args.vertices:
+        geometry = circle(centre_lat, centre_lon, radius, count)
+        loop_time = best_of(per_vertex, args.repeat, renderer, geometry, projector)
+        numpy_time = best_of(vectorized, args.repeat, renderer, geometry, projector)
+        print(f"{count:>9} {count / loop_time / 1e6:>13.2f} {count / numpy_time / 1e6:>14.2f} "
+              f"{loop_time / numpy_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: patta holder point rasterization
+Compares the batched NumPy sprite stamping used by render_patta_holders_tile
+with drawing one PIL ellipse per point
+
+Usage: python benchmarks/bench_tile_points.py [--points 100 1000 10000] [--repeat 5]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add webgis to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'webgis'))
+
+from tiles import TILE_SIZE, TileRenderer, deg2num, num2deg
+from tiles.projection import TileProjector
+
+def pil_per_point(renderer, holders, bounds, color, radius):
+    """The previous rendering path: one projected point and draw.ellipse per holder"""
+    projector = TileProjector.from_bounds(*bounds, TILE_SIZE)
+    tile = Image.new('RGBA', (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(tile)
+    for holder in holders:
+        px, py = (int(value) for value in projector.project(holder['longitude'], holder['latitude']))
+        draw.ellipse([px - radius, py - radius, px + radius, py + radius],
+                     fill=color, outline=(255, 255, 255, 255))
+    return tile
+
+def numpy_stamped(renderer, holders, projector, color, radius):
+    """The batched path used by render_patta_holders_tile"""
+    lats = np.fromiter((holder['latitude'] for holder in holders), dtype=np.float64, count=len(holders))
+    lons = np.fromiter((holder['longitude'] for holder in holders), dtype=np.float64, count=len(holders))
+    pixels = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    renderer._stamp_points(pixels, lats, lons, projector, color, radius)
+    return Image.fromarray(pixels)
+
+def best_of(func, repeat, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--zoom', type=int, default=8)
+    args = parser.parse_args()
+
+    renderer = TileRenderer()
+    z = args.zoom
+    x, y = deg2num(21.5, 80.5, z)
+    lat_min, lon_min = num2deg(x, y + 1, z)
+    lat_max, lon_max = num2deg(x + 1, y, z)
+    bounds = (lat_min, lon_min, lat_max, lon_max)
+    projector = TileProjector(z, x, y, TILE_SIZE)
+    color = renderer.colors['ifr']
+    radius = max(2, min(8, 12 - z))
+    rng = random.Random(42)
+
+    print(f"Tile z{z} ({TILE_SIZE}px), marker radius {radius}px, best of {args.repeat}")
+    print(f"{'points':>8} {'PIL/point ms':>14} {'NumPy ms':>10} {'speedup':>8}  identical")
+    for count in args.points:
+        holders = [{'latitude': rng.uniform(lat_min, lat_max), 'longitude': rng.uniform(lon_min, lon_max)}
+                   for _ in range(count)]
+        pil_time, pil_tile = best_of(pil_per_point, args.repeat, renderer, holders, bounds, color, radius)
+        numpy_time, numpy_tile = best_of(numpy_stamped, args.repeat, renderer, holders, projector, color, radius)
+        identical = np.array_equal(np.asarray(pil_tile), np.asarray(numpy_tile))
+        print(f"{count:>8} {pil_time * 1000:>14.2f} {numpy_time * 1000:>10.2f} "
+              f"{pil_time / numpy_time:>7.1f}x  {identical}")
+
+if __name__ == '__main__':
+    main()
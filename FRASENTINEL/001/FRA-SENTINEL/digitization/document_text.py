@@ -0,0 +1,154 @@
+"""
+Document Text Provider for FRA-SENTINEL
+Reads each PDF page's embedded text layer when it is usable and OCRs only
+the pages without one, recording which path every page took
+"""
+
+import os
+import re
+import logging
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from digitization.pdf_ocr import DEFAULT_DPI, iter_pdf_page_text, pdf_page_count
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TEXT_LAYER = 'text_layer'
+SOURCE_OCR = 'ocr'
+
+# Letters a page's text layer needs before OCR is skipped for it
+MIN_TEXT_CHARS = int(os.getenv('TEXT_LAYER_MIN_CHARS', 20))
+
+# Share of non-space characters that must be letters, digits or combining marks;
+# fonts without a Unicode map extract as (cid:N) codes or symbol soup instead
+MIN_LETTER_RATIO = 0.5
+
+# Legacy Tamil fonts (TAM/TAB, Bamini) extract as Latin letter soup ("khtl;lk;");
+# with Tamil OCR, a page with under MIN_TAMIL_RATIO of its letters in the Tamil
+# block also needs MIN_WORD_RATIO of its Latin tokens to read as plain words
+MIN_TAMIL_RATIO = float(os.getenv('TEXT_LAYER_MIN_TAMIL_RATIO', 0.2))
+MIN_WORD_RATIO = 0.5
+
+CID_CODE = re.compile(r'\(cid:\d+\)')
+CONFIG_LANG = re.compile(r'(?:^|\s)-l\s+(\S+)')
+LATIN_WORD = re.compile(r'[A-Za-z]*[AEIOUYaeiouy][A-Za-z]*')
+
+def _legacy_font_soup(text: str, letters: List[str]) -> bool:
+    """Whether mostly-Latin text reads as letter soup rather than words"""
+    if sum(1 for ch in letters if '\u0b80' <= ch <= '\u0bff') >= MIN_TAMIL_RATIO * len(letters):
+        return False
+    tokens = [token.strip('.,:;()[]"\'-/') for token in text.split()]
+    tokens = [token for token in tokens if any(ch.isalpha() for ch in token)]
+    words = sum(1 for token in tokens if LATIN_WORD.fullmatch(token))
+    return words < MIN_WORD_RATIO * len(tokens)
+
+def usable_text_layer(text: Optional[str], min_chars: int = MIN_TEXT_CHARS, tamil: bool = False) -> bool:
+    """Whether a page's extracted text is real text rather than empty, (cid:N) codes or glyph junk
+
+    With ``tamil`` a page is also rejected when it looks like a legacy Tamil
+    font's Latin letter soup; English and Tamil text layers are both kept.
+    """
+    if not text:
+        return False
+    visible = [ch for ch in CID_CODE.sub('\ufffd', text) if not ch.isspace()]
+    letters = [ch for ch in visible if ch.isalnum() or unicodedata.category(ch).startswith('M')]
+    if len(letters) < min_chars or len(letters) < MIN_LETTER_RATIO * len(visible):
+        return False
+    return not (tamil and _legacy_font_soup(text, letters))
+
+@dataclass
+class PageText:
+    page_number: int
+    text: str
+    source: str
+
+@dataclass
+class DocumentText:
+    """Text of a document, page by page, with the path each page took"""
+    pages: List[PageText] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages)
+
+    @property
+    def page_sources(self) -> List[str]:
+        return [page.source for page in self.pages]
+
+    @property
+    def ocr_pages(self) -> List[int]:
+        return [page.page_number for page in self.pages if page.source == SOURCE_OCR]
+
+    @property
+    def ocr_used(self) -> bool:
+        return bool(self.ocr_pages)
+
+    def summary(self) -> Dict:
+        return {
+            'pages': len(self.pages),
+            'text_layer_pages': len(self.pages) - len(self.ocr_pages),
+            'ocr_pages': self.ocr_pages,
+            'page_sources': self.page_sources
+        }
+
+PageOCR = Callable[[str, Sequence[int]], Iterator[Tuple[int, str]]]
+
+class DocumentTextProvider:
+    """Text of PDF pages from the text layer where usable, OCR elsewhere
+
+    ``ocr_pages(pdf_path, page_numbers)`` yields ``(page_number, text)`` for
+    the pages that need OCR; by default they go through the streaming
+    pipeline in ``pdf_ocr`` with this provider's language, config and DPI.
+    A document whose pages all have a text layer never reaches Tesseract.
+    When the language (``lang`` or ``-l`` in ``config``) includes Tamil, a
+    text layer in a legacy Tamil font's Latin letter soup is OCR'd instead.
+    """
+
+    def __init__(self, lang: Optional[str] = None, config: str = '', dpi: int = DEFAULT_DPI,
+                 min_chars: int = MIN_TEXT_CHARS, ocr_pages: Optional[PageOCR] = None):
+        self.lang = lang
+        self.config = config
+        self.dpi = dpi
+        self.min_chars = min_chars
+        languages = lang or next(iter(CONFIG_LANG.findall(config or '')), '')
+        self.tamil = 'tam' in languages.split('+')
+        self._ocr_pages = ocr_pages or self._pipeline_ocr
+
+    def _pipeline_ocr(self, pdf_path: str, page_numbers: Sequence[int]) -> Iterator[Tuple[int, str]]:
+        return iter_pdf_page_text(pdf_path, lang=self.lang, config=self.config, dpi=self.dpi,
+                                  page_numbers=page_numbers)
+
+    def _text_layer(self, pdf_path: str) -> List[str]:
+        """Embedded text of every page ('' where a page has none)"""
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            return [page.extract_text() or '' for page in pdf.pages]
+
+    def extract(self, pdf_path: str) -> DocumentText:
+        """Text of every page of a PDF, OCRing only pages without a usable text layer"""
+        try:
+            layer = self._text_layer(pdf_path)
+        except Exception as e:
+            # Unreadable structure: OCR every page the rasterizer can find
+            logger.warning(f"Text layer unreadable for {pdf_path}, OCR of all pages: {e}")
+            layer = [''] * pdf_page_count(pdf_path)
+
+        pages = {}
+        needs_ocr = []
+        for page_number, text in enumerate(layer, start=1):
+            if usable_text_layer(text, self.min_chars, self.tamil):
+                pages[page_number] = PageText(page_number, text, SOURCE_TEXT_LAYER)
+            else:
+                needs_ocr.append(page_number)
+
+        if needs_ocr:
+            for page_number, text in self._ocr_pages(pdf_path, needs_ocr):
+                pages[page_number] = PageText(page_number, text, SOURCE_OCR)
+
+        document = DocumentText([pages[number] for number in sorted(pages)])
+        logger.info(f"{pdf_path}: {len(layer) - len(needs_ocr)} pages from text layer, "
+                    f"{len(needs_ocr)} OCR'd")
+        return document
@@ -8,17 +8,18 @@ import json
 import logging
 import hashlib
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import cv2
 import numpy as np
-from PIL import Image
-import pytesseract
-import pdfplumber
 from flask import Blueprint, request, jsonify, current_app
 import re
 
+from digitization.document_text import SOURCE_OCR, DocumentText, DocumentTextProvider
+from digitization.image_handoff import image_to_string, pixmap_array
+from digitization.ocr_cache import OCRCache, cache_key, file_sha256, ocr_cache
+
 logger = logging.getLogger(__name__)
 
 # Create blueprint
@@ -36,6 +37,7 @@ class ExtractionResult:
     processing_time: float
     error_message: Optional[str] = None
     created_at: datetime = None
+    page_sources: Optional[List[str]] = None
     
     def __post_init__(self):
         if self.created_at is None:
@@ -44,9 +46,14 @@ class ExtractionResult:
 class EnhancedOCREngine:
     """Enhanced OCR engine with batch processing and NER"""
     
-    def __init__(self):
+    # Bump when preprocessing, text extraction or NER patterns change
+    CACHE_VERSION = 'enhanced-ocr-2'
+    
+    def __init__(self, cache: Optional[OCRCache] = None):
+        self.cache = ocr_cache if cache is None else cache
         self.supported_formats = ['.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.bmp']
         self.tesseract_config = '--oem 3 --psm 6 -l eng+tam'
+        self.text_provider = DocumentTextProvider(config=self.tesseract_config, ocr_pages=self._ocr_pdf_pages)
         self.extraction_patterns = self._load_extraction_patterns()
         self.batch_size = 10
         self.max_retries = 3
@@ -136,17 +143,27 @@ class EnhancedOCREngine:
             # Calculate file hash
             file_hash = self._calculate_file_hash(file_path)
             
-            # Extract text based on file type
-            if file_extension == '.pdf':
-                extracted_text = self._extract_from_pdf(file_path)
-            else:
-                extracted_text = self._extract_from_image(file_path)
-            
-            # Perform NER extraction
-            extracted_data = self._extract_entities(extracted_text)
+            def extract() -> Dict:
+                # Extract text based on file type
+                if file_extension == '.pdf':
+                    document = self._extract_from_pdf(file_path)
+                    extracted_text, page_sources = document.text, document.page_sources
+                else:
+                    extracted_text, page_sources = self._extract_from_image(file_path), [SOURCE_OCR]
+                
+                # Perform NER extraction
+                extracted_data = self._extract_entities(extracted_text)
+                
+                # Calculate confidence scores
+                confidence_scores = self._calculate_confidence_scores(extracted_data, extracted_text)
+                return {'text': extracted_text, 'fields': extracted_data, 'confidence': confidence_scores,
+                        'page_sources': page_sources}
             
-            # Calculate confidence scores
-            confidence_scores = self._calculate_confidence_scores(extracted_data, extracted_text)
+            # Identical documents reuse the first run's text and fields
+            key = cache_key(file_hash, 'eng+tam', self.tesseract_config, self.CACHE_VERSION)
+            cached = self.cache.get_or_compute(key, extract)
+            extracted_data = cached['fields']
+            confidence_scores = cached['confidence']
             
             processing_time = time.time() - start_time
             
@@ -158,7 +175,8 @@ class EnhancedOCREngine:
                 extraction_status="success",
                 extracted_data=extracted_data,
                 confidence_scores=confidence_scores,
-                processing_time=processing_time
+                processing_time=processing_time,
+                page_sources=cached.get('page_sources', [])
             )
             
         except Exception as e:
@@ -214,29 +232,12 @@ class EnhancedOCREngine:
         return results
     
     def _calculate_file_hash(self, file_path: str) -> str:
-        """Calculate MD5 hash of file"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        """Calculate SHA-256 hash of file (also the OCR cache address)"""
+        return file_sha256(file_path)
     
-    def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF using pdfplumber"""
-        text = ""
-        
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-        except Exception as e:
-            logger.error(f"PDF extraction failed: {e}")
-            # Fallback to OCR on PDF pages
-            text = self._ocr_pdf_pages(file_path)
-        
-        return text
+    def _extract_from_pdf(self, file_path: str) -> DocumentText:
+        """Extract text from PDF: the text layer where usable, OCR for the other pages"""
+        return self.text_provider.extract(file_path)
     
     def _extract_from_image(self, file_path: str) -> str:
         """Extract text from image using Tesseract"""
@@ -246,7 +247,7 @@ class EnhancedOCREngine:
             processed_image = self._preprocess_image(image)
             
             # Extract text using Tesseract
-            text = pytesseract.image_to_string(processed_image, config=self.tesseract_config)
+            text = image_to_string(processed_image, config=self.tesseract_config)
             
             return text
             
@@ -277,38 +278,28 @@ class EnhancedOCREngine:
         
         return cleaned
     
-    def _ocr_pdf_pages(self, file_path: str) -> str:
-        """Fallback OCR for PDF pages"""
-        text = ""
+    def _ocr_pdf_pages(self, file_path: str, page_numbers: Sequence[int]) -> Iterator[Tuple[int, str]]:
+        """OCR the given PDF pages, yielding ``(page_number, text)``"""
+        import fitz  # PyMuPDF
         
+        doc = fitz.open(file_path)
         try:
-            # Convert PDF to images and OCR each page
-            import fitz  # PyMuPDF
-            
-            doc = fitz.open(file_path)
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
+            for page_number in page_numbers:
+                page = doc.load_page(page_number - 1)
                 pix = page.get_pixmap()
-                img_data = pix.tobytes("png")
                 
-                # Convert bytes to PIL Image
-                img = Image.open(io.BytesIO(img_data))
-                
-                # Convert to OpenCV format
-                img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+                # Grayscale straight from the pixmap's RGB samples, no PNG round-trip
+                gray = cv2.cvtColor(pixmap_array(pix), cv2.COLOR_RGB2GRAY)
+                del pix
                 
                 # Preprocess and OCR
-                processed = self._preprocess_image(img_cv)
-                page_text = pytesseract.image_to_string(processed, config=self.tesseract_config)
-                text += page_text + "\n"
-            
-            doc.close()
-            
+                processed = self._preprocess_image(gray)
+                yield page_number, image_to_string(processed, config=self.tesseract_config)
         except Exception as e:
-            logger.error(f"PDF OCR fallback failed: {e}")
+            logger.error(f"PDF OCR failed: {e}")
             raise
-        
-        return text
+        finally:
+            doc.close()
     
     def _extract_entities(self, text: str) -> Dict:
         """Extract entities using regex patterns"""
@@ -9,11 +9,10 @@ import json
 import logging
 from typing import Dict, Optional, List, Tuple
 from datetime import datetime
-import pdfplumber
-from pdf2image import convert_from_path
 import pytesseract
-from PIL import Image
-import io
+
+from digitization.document_text import DocumentText, DocumentTextProvider
+from digitization.pdf_ocr import iter_pdf_page_text
 
 # Configure Tesseract path for Windows
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
@@ -25,9 +24,15 @@ logger = logging.getLogger(__name__)
 class EnhancedPattaExtractor:
     """Enhanced Patta Document Extractor with optimized Tamil+English OCR"""
     
+    # Tamil+English with optimized config
+    OCR_LANG = "tam+eng"
+    OCR_CONFIG = '--psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789அஆஇஈஉஊஎஏஐஒஓஔகஙசஜஞடணதநனபமயரலவழளறனஷஸஹ் '
+    OCR_DPI = 300
+    
     def __init__(self):
         self.raw_text = ""
         self.confidence_scores = {}
+        self.text_provider = DocumentTextProvider(lang=self.OCR_LANG, config=self.OCR_CONFIG, dpi=self.OCR_DPI)
         
     def clean_tamil_text(self, val: str) -> Optional[str]:
         """Clean Tamil text by removing extra spaces and normalizing"""
@@ -40,18 +45,11 @@ class EnhancedPattaExtractor:
     def ocr_pdf(self, pdf_path: str) -> str:
         """Enhanced OCR with optimized settings for Tamil+English"""
         try:
-            # Convert PDF to images with higher DPI for better OCR
-            images = convert_from_path(pdf_path, dpi=300)
+            # Pages are rendered lazily at higher DPI and OCR'd concurrently, in page order
             all_text = []
-            
-            for i, img in enumerate(images):
-                logger.info(f"Processing page {i+1} with OCR...")
-                # Use Tamil+English with optimized config
-                txt = pytesseract.image_to_string(
-                    img, 
-                    lang="tam+eng",
-                    config='--psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789அஆஇஈஉஊஎஏஐஒஓஔகஙசஜஞடணதநனபமயரலவழளறனஷஸஹ் '
-                )
+            for page_number, txt in iter_pdf_page_text(pdf_path, lang=self.OCR_LANG, config=self.OCR_CONFIG,
+                                                       dpi=self.OCR_DPI):
+                logger.info(f"OCR completed for page {page_number}")
                 all_text.append(txt)
             
             return "\n".join(all_text)
@@ -232,31 +230,18 @@ class EnhancedPattaExtractor:
         """Main extraction method with enhanced processing"""
         logger.info(f"Starting enhanced extraction from PDF: {pdf_path}")
         
-        # Step 1: Try direct text extraction
-        text = ""
+        # Step 1: Text layer where a page has one; only the other pages are OCR'd
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for p in pdf.pages:
-                    t = p.extract_text() or ""
-                    text += t + "\n"
-            logger.info("Extracted text from PDF pages")
+            document = self.text_provider.extract(pdf_path)
         except Exception as e:
-            logger.error(f"PDF text extraction failed: {e}")
-            text = ""
-        
-        # Step 2: Always use OCR for Tamil documents (better accuracy)
-        logger.info("Using OCR for Tamil document processing...")
-        ocr_text = self.ocr_pdf(pdf_path)
-        if ocr_text and len(ocr_text.strip()) > len(text.strip()):
-            text = ocr_text
-            logger.info("OCR text used (better than PDF text)")
-        else:
-            logger.info("PDF text used (OCR not better)")
+            logger.error(f"Text extraction failed: {e}")
+            document = DocumentText()
+        text = document.text
         
-        # Step 3: Extract fields
+        # Step 2: Extract fields
         fields = self.extract_fields(text)
         
-        # Step 4: Calculate confidence scores
+        # Step 3: Calculate confidence scores
         confidence_scores = {}
         for field, value in fields.items():
             if value:
@@ -265,7 +250,7 @@ class EnhancedPattaExtractor:
             else:
                 confidence_scores[field] = 0.0
         
-        # Step 5: Prepare result
+        # Step 4: Prepare result
         result = {
             "source_file": os.path.basename(pdf_path),
             "success": True,
@@ -274,7 +259,8 @@ class EnhancedPattaExtractor:
             "confidence_scores": confidence_scores,
             "extraction_timestamp": datetime.now().isoformat(),
             "text_length": len(text),
-            "ocr_used": len(text.strip()) < 100
+            "ocr_used": document.ocr_used,
+            "page_sources": document.page_sources
         }
         
         logger.info("Enhanced extraction completed successfully")
@@ -0,0 +1,140 @@
+"""
+Page Image Handoff for FRA-SENTINEL
+Passes rasterized pages to preprocessing and Tesseract as raw pixel buffers,
+without encoding them to PNG and decoding them again in between
+"""
+
+import shlex
+import logging
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+import pytesseract
+
+logger = logging.getLogger(__name__)
+
+# Optional Tesseract C API binding: pixels go straight into Tesseract, no temp file
+try:
+    from tesserocr import PyTessBaseAPI
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Uncompressed format of the temp file pytesseract hands to the tesseract CLI
+# (pytesseract writes PNG for images that have no format of their own)
+TEMP_FORMAT = 'PPM'
+
+# PIL modes whose pixels Tesseract reads directly as gray, RGB or RGBA bytes
+RAW_MODES = ('L', 'RGB', 'RGBA')
+
+PageImage = Union[Image.Image, np.ndarray]
+
+def pixmap_array(pix) -> np.ndarray:
+    """``(height, width, channels)`` uint8 view of a PyMuPDF pixmap's samples"""
+    samples = getattr(pix, 'samples_mv', None)
+    if samples is None:
+        samples = pix.samples
+    return np.frombuffer(samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+
+def as_array(image: PageImage) -> np.ndarray:
+    """Pixels of a page image as an ndarray (arrays are returned as-is)"""
+    if isinstance(image, np.ndarray):
+        return image
+    return np.asarray(image)
+
+def _parse_config(config: str) -> Optional[Tuple[Optional[str], Optional[int], Optional[int], Dict[str, str]]]:
+    """``(lang, psm, oem, variables)`` from a pytesseract config string, or None if it has other options"""
+    lang, psm, oem, variables = None, None, None, {}
+    tokens = shlex.split(config or '')
+    index = 0
+    while index < len(tokens):
+        option = tokens[index]
+        if index + 1 >= len(tokens):
+            return None
+        value = tokens[index + 1]
+        if option in ('--psm', '--oem') and value.isdigit():
+            if option == '--psm':
+                psm = int(value)
+            else:
+                oem = int(value)
+        elif option == '-l':
+            lang = value
+        elif option == '-c' and '=' in value:
+            name, _, setting = value.partition('=')
+            variables[name] = setting
+        else:
+            return None
+        index += 2
+    return lang, psm, oem, variables
+
+class TesseractAPIs:
+    """Per-thread Tesseract API handles, one per language and config
+
+    Each handle loads its traineddata and applies its settings when a
+    thread first OCRs with that language and config, then is reused for
+    every later page on the same thread. Handles only last as long as their
+    thread, so the reuse comes from long-lived threads such as pdf_ocr's
+    shared worker pool; a short-lived thread pays the load each time.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, lang: str, config: str, psm: Optional[int], oem: Optional[int],
+            variables: Dict[str, str]):
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get((lang, config))
+        if api is None:
+            kwargs = {'lang': lang}
+            if oem is not None:
+                kwargs['oem'] = oem
+            if psm is not None:
+                kwargs['psm'] = psm
+            api = apis[(lang, config)] = PyTessBaseAPI(**kwargs)
+            for name, setting in variables.items():
+                api.SetVariable(name, setting)
+        return api
+
+_apis = TesseractAPIs()
+
+def _raw_image_to_string(pixels: np.ndarray, lang: str, config: str) -> Optional[str]:
+    """OCR a uint8 gray/RGB/RGBA array through the Tesseract C API
+
+    Returns None when ``config`` has options the handles do not support.
+    """
+    options = _parse_config(config)
+    if options is None or pixels.dtype != np.uint8 or pixels.ndim not in (2, 3):
+        return None
+    config_lang, psm, oem, variables = options
+    api = _apis.get(config_lang or lang, config, psm, oem, variables)
+    pixels = np.ascontiguousarray(pixels)
+    height, width = pixels.shape[:2]
+    channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+    api.SetImageBytes(pixels.tobytes(), width, height, channels, width * channels)
+    return api.GetUTF8Text()
+
+def image_to_string(image: PageImage, lang: Optional[str] = None, config: str = '') -> str:
+    """OCR a PIL image or uint8 ndarray, same arguments as ``pytesseract.image_to_string``
+
+    With tesserocr installed the pixels are handed to Tesseract directly;
+    otherwise pytesseract writes them to an uncompressed temp file rather
+    than PNG. Arrays are read as gray or RGB, as pytesseract reads them.
+    """
+    if TESSEROCR_AVAILABLE and (isinstance(image, np.ndarray) or image.mode in RAW_MODES):
+        text = _raw_image_to_string(as_array(image), lang or 'eng', config)
+        if text is not None:
+            return text
+
+    return pytesseract.image_to_string(tesseract_input(image), lang=lang, config=config)
+
+def tesseract_input(image: PageImage) -> Image.Image:
+    """The image pytesseract should save for the tesseract CLI, tagged with an uncompressed format"""
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    if not image.format and image.mode in ('L', 'RGB'):
+        image.format = TEMP_FORMAT
+    return image
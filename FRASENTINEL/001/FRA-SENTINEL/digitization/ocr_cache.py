@@ -0,0 +1,208 @@
+"""
+OCR Result Cache for FRA-SENTINEL
+Content-addressed store of OCR text and extracted fields shared by every
+extractor, worker and web process on the host
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default disk budget for cached results
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Read size when hashing documents
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Eviction trims the cache to this fraction of max_bytes so it does not run on every put
+EVICT_TO = 0.9
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(sha256: str, lang: str, config: str, preprocess_version: str) -> str:
+    """Key of one OCR run: document content, language pack, Tesseract/DPI config and pipeline version
+
+    Bump ``preprocess_version`` whenever preprocessing or field parsing
+    changes, so results from the old pipeline are no longer returned.
+    """
+    return '|'.join((sha256, lang, config, preprocess_version))
+
+class OCRCache:
+    """SQLite-backed, size-bounded LRU cache of OCR results
+
+    Values are JSON dicts (typically ``text`` plus extracted fields). Each
+    entry records its size and last access time; once the total exceeds
+    ``max_bytes`` the least recently used entries are deleted. The database
+    runs in WAL mode so web and worker processes share one cache file.
+    """
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)",
+    ]
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._last_stamp = 0.0
+
+    def _stamp(self) -> float:
+        """Access time, strictly increasing within the process so recency has no ties"""
+        self._last_stamp = max(time.time(), self._last_stamp + 1e-6)
+        return self._last_stamp
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (reopened after a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            self._ensure_schema()
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.pid = os.getpid()
+        return conn
+
+    def _ensure_schema(self):
+        with self._init_lock:
+            if self._initialized:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+            finally:
+                conn.close()
+            self._initialized = True
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached value for a key, or None; a hit refreshes the entry's recency"""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self._write_lock:
+                conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (self._stamp(), key))
+            self.hits += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"OCR cache read failed: {e}")
+            return None
+
+    def put(self, key: str, value: Dict):
+        """Store a value, evicting least recently used entries past max_bytes"""
+        if not self.enabled:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        try:
+            conn = self._connection()
+            with self._write_lock:
+                now = self._stamp()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO results (key, value, size, created_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, payload, size, now, now)
+                    )
+                    self._evict(conn)
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"OCR cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used entries once the cache is over budget"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * EVICT_TO)
+        freed = 0
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+            if total - freed <= target:
+                break
+            stale.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+        logger.info(f"OCR cache evicted {len(stale)} entries ({freed} bytes)")
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        """Cached value for a key, computing and storing it on a miss
+
+        Values holding an ``error`` are returned but not cached.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = compute()
+        if 'error' not in value:
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        if not self.enabled:
+            return
+        with self._write_lock:
+            self._connection().execute("DELETE FROM results")
+
+    def get_stats(self) -> Dict:
+        entries, total = 0, 0
+        if self.enabled:
+            entries, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0
+        }
+
+# Shared cache; OCR_CACHE_BYTES=0 disables it
+ocr_cache = OCRCache(
+    os.getenv('OCR_CACHE_PATH', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ocr_cache.db')),
+    max_bytes=int(os.getenv('OCR_CACHE_BYTES', DEFAULT_MAX_BYTES))
+)
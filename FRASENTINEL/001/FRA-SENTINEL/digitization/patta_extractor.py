@@ -9,11 +9,10 @@ import json
 import logging
 from typing import Dict, Optional, List, Tuple
 from datetime import datetime
-import pdfplumber
-from pdf2image import convert_from_path
 import pytesseract
-from PIL import Image
-import io
+
+from digitization.ocr_cache import OCRCache, cache_key, file_sha256, ocr_cache
+from digitization.document_text import DocumentTextProvider
 
 # Configure Tesseract path for Windows
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
@@ -22,15 +21,26 @@ pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tessera
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OCR settings, part of the cache key
+OCR_LANG = 'tam+eng'
+OCR_DPI = 300
+OCR_CONFIG = '--psm 6'
+
+# Bump when text extraction, OCR preprocessing or field parsing changes
+CACHE_VERSION = 'patta-extractor-2'
+
 class PattaExtractor:
     """
     Main class for extracting structured data from Patta documents
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[OCRCache] = None):
+        self.cache = ocr_cache if cache is None else cache
         self.extracted_data = {}
         self.raw_text = ""
         self.confidence_scores = {}
+        self.page_sources = []
+        self.text_provider = DocumentTextProvider(lang=OCR_LANG, config=OCR_CONFIG, dpi=OCR_DPI)
         
         # Enhanced field patterns for Tamil+English Patta documents
         self.field_patterns = {
@@ -171,18 +181,33 @@ class PattaExtractor:
         try:
             logger.info(f"Starting extraction from PDF: {pdf_path}")
             
-            # Step 1: Try to extract text directly from PDF
-            text_extracted = self._extract_text_from_pdf(pdf_path)
+            # Identical documents reuse the first run's text and fields
+            key = None
+            if self.cache.enabled and os.path.isfile(pdf_path):
+                key = cache_key(file_sha256(pdf_path), OCR_LANG, f"dpi={OCR_DPI} {OCR_CONFIG}", CACHE_VERSION)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    logger.info("Using cached extraction for identical document")
+                    self.raw_text = cached['text']
+                    self.confidence_scores = cached['confidence']
+                    self.extracted_data = cached['fields']
+                    self.page_sources = cached.get('page_sources', [])
+                    return self.extracted_data
             
-            if not text_extracted:
-                # Step 2: If no text, use OCR
-                logger.info("No searchable text found, using OCR...")
-                text_extracted = self._extract_text_with_ocr(pdf_path)
+            # Step 1: Text layer per page, OCR only for pages without one
+            text_extracted = self._extract_text(pdf_path)
             
             if text_extracted:
-                # Step 3: Parse the extracted text
+                # Step 2: Parse the extracted text
                 self.extracted_data = self._parse_text(text_extracted)
                 logger.info("Data extraction completed successfully")
+                if key:
+                    self.cache.put(key, {
+                        'text': self.raw_text,
+                        'confidence': self.confidence_scores,
+                        'fields': self.extracted_data,
+                        'page_sources': self.page_sources
+                    })
                 return self.extracted_data
             else:
                 logger.error("Failed to extract text from PDF")
@@ -192,59 +217,20 @@ class PattaExtractor:
             logger.error(f"Error during extraction: {str(e)}")
             return {"error": f"Extraction failed: {str(e)}"}
     
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
+    def _extract_text(self, pdf_path: str) -> str:
         """
-        Extract text from PDF using pdfplumber
+        Extract text page by page: the text layer where usable, OCR for the rest
         """
         try:
-            text = ""
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                        logger.info(f"Extracted text from page {page_num + 1}")
-            
-            self.raw_text = text
-            return text if len(text.strip()) > 50 else ""  # Minimum text threshold
+            document = self.text_provider.extract(pdf_path)
+            self.raw_text = document.text
+            self.page_sources = document.page_sources
+            return self.raw_text if len(self.raw_text.strip()) > 50 else ""  # Minimum text threshold
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             return ""
     
-    def _extract_text_with_ocr(self, pdf_path: str) -> str:
-        """
-        Extract text using OCR after converting PDF to images
-        """
-        try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path, dpi=300)
-            text = ""
-            
-            for i, image in enumerate(images):
-                # Convert PIL image to bytes
-                img_bytes = io.BytesIO()
-                image.save(img_bytes, format='PNG')
-                img_bytes.seek(0)
-                
-                # Perform OCR with Tamil+English focus
-                page_text = pytesseract.image_to_string(
-                    Image.open(img_bytes),
-                    lang='tam+eng',  # Tamil + English for Patta documents
-                    config='--psm 6'  # Assume uniform block of text
-                )
-                
-                if page_text:
-                    text += page_text + "\n"
-                    logger.info(f"OCR completed for page {i + 1}")
-            
-            self.raw_text = text
-            return text if len(text.strip()) > 50 else ""
-            
-        except Exception as e:
-            logger.error(f"Error during OCR: {str(e)}")
-            return ""
-    
     def _parse_text(self, text: str) -> Dict:
         """
         Parse extracted text to find structured data
@@ -452,6 +438,7 @@ class PattaExtractor:
             "confidence_scores": self.confidence_scores,
             "average_confidence": round(sum(self.confidence_scores.values()) / len(self.confidence_scores), 2) if self.confidence_scores else 0,
             "text_length": len(self.raw_text),
+            "page_sources": self.page_sources,
             "extraction_timestamp": datetime.now().isoformat()
         }
 
@@ -0,0 +1,112 @@
+"""
+Streaming PDF OCR for FRA-SENTINEL
+Rasterizes PDF pages one at a time and OCRs them concurrently, yielding text
+in page order with a bounded number of page bitmaps held in memory
+"""
+
+import os
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DPI = 300
+
+# Concurrent Tesseract runs; Tesseract itself runs in a subprocess, so threads scale
+DEFAULT_WORKERS = int(os.getenv('PDF_OCR_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Rendered pages allowed to wait for or be in OCR at once (a 300-DPI A4 page is ~25 MB)
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv('PDF_OCR_MAX_IN_FLIGHT', 0)) or DEFAULT_WORKERS + 1
+
+_pools: Dict[Tuple[int, int], ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _ocr_pool(size: int) -> ThreadPoolExecutor:
+    """Process-wide OCR thread pool with ``size`` workers, shared by every document
+
+    Worker threads outlive a single document, so per-thread Tesseract state
+    (image_handoff's tesserocr handles and their traineddata) is loaded once
+    per worker rather than once per document. Pools are keyed by pid so a
+    forked child starts its own.
+    """
+    key = (os.getpid(), size)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ThreadPoolExecutor(max_workers=size, thread_name_prefix='pdf-ocr')
+    return pool
+
+def ocr_pages(render: Callable[[int], Any], page_count: int, ocr: Callable[[Any], str],
+              workers: Optional[int] = None, max_in_flight: Optional[int] = None,
+              page_numbers: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, str]]:
+    """Yield ``(page_number, text)`` for pages 1..page_count, in page order
+
+    ``page_numbers`` restricts the run to those pages (in the given order).
+    ``render(page_number)`` runs in the calling thread and ``ocr(image)``
+    on a shared pool of ``workers`` threads. At most ``max_in_flight`` rendered
+    pages are queued or being OCR'd; rendering the next page waits for the
+    oldest one to finish. Closing the iterator early cancels queued pages.
+    """
+    workers = max(1, workers or DEFAULT_WORKERS)
+    max_in_flight = max(1, max_in_flight or DEFAULT_MAX_IN_FLIGHT)
+    if workers > 1:
+        # One OpenMP thread per Tesseract process; the pool supplies the parallelism
+        os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+    if page_numbers is None:
+        page_numbers = range(1, page_count + 1)
+
+    pool = _ocr_pool(min(workers, max_in_flight))
+    pending = deque()
+    try:
+        for page_number in page_numbers:
+            while len(pending) >= max_in_flight:
+                number, future = pending.popleft()
+                yield number, future.result()
+            image = render(page_number)
+            pending.append((page_number, pool.submit(ocr, image)))
+            del image
+        while pending:
+            number, future = pending.popleft()
+            yield number, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+def pdf_page_count(pdf_path: str) -> int:
+    from pdf2image import pdfinfo_from_path
+    return int(pdfinfo_from_path(pdf_path)['Pages'])
+
+def iter_pdf_page_text(pdf_path: str, lang: Optional[str] = None, config: str = '',
+                       dpi: int = DEFAULT_DPI, workers: Optional[int] = None,
+                       max_in_flight: Optional[int] = None,
+                       ocr: Optional[Callable[[Any], str]] = None,
+                       page_numbers: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, str]]:
+    """Yield ``(page_number, text)`` for every page of a PDF (or just ``page_numbers``), in page order
+
+    Pages are rasterized one at a time with pdf2image's ``first_page``/
+    ``last_page`` instead of converting the whole document up front. ``ocr``
+    replaces the default ``image_handoff.image_to_string(image, lang, config)``.
+    """
+    from pdf2image import convert_from_path
+
+    if ocr is None:
+        from digitization.image_handoff import image_to_string
+
+        def ocr(image) -> str:
+            return image_to_string(image, lang=lang, config=config)
+
+    def render(page_number: int):
+        return convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)[0]
+
+    if page_numbers is None:
+        page_count = pdf_page_count(pdf_path)
+    else:
+        page_count = len(page_numbers)
+    logger.info(f"OCR of {page_count} pages from {pdf_path}")
+    return ocr_pages(render, page_count, ocr, workers, max_in_flight, page_numbers)
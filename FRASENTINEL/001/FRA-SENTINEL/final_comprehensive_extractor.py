@@ -5,13 +5,13 @@ Combines OCR processing with optimized regex patterns
 """
 
 import re, os, json
-import pdfplumber
-from pdf2image import convert_from_path
 import pytesseract
 import logging
 from datetime import datetime
 from typing import Dict
 
+from digitization.document_text import DocumentText, DocumentTextProvider
+
 # Configure Tesseract path
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
@@ -23,6 +23,7 @@ class FinalComprehensiveExtractor:
     """Final comprehensive extractor combining OCR and optimized regex"""
     
     def __init__(self):
+        self.text_provider = DocumentTextProvider(lang="tam+eng", config='--psm 6', dpi=300)
         # Your optimized regex patterns
         self.patterns = {
             'owner_name': [
@@ -129,55 +130,19 @@ class FinalComprehensiveExtractor:
         
         return "Not found"
     
-    def ocr_pdf(self, pdf_path: str) -> str:
-        """Enhanced OCR with optimized settings for Tamil+English"""
-        try:
-            # Convert PDF to images with higher DPI for better OCR
-            images = convert_from_path(pdf_path, dpi=300)
-            all_text = []
-            
-            for i, img in enumerate(images):
-                logger.info(f"Processing page {i+1} with OCR...")
-                # Use Tamil+English with optimized config
-                txt = pytesseract.image_to_string(
-                    img, 
-                    lang="tam+eng",
-                    config='--psm 6'
-                )
-                all_text.append(txt)
-            
-            return "\n".join(all_text)
-            
-        except Exception as e:
-            logger.error(f"OCR failed: {e}")
-            return ""
-    
     def extract_patta_document(self, pdf_path: str) -> Dict:
         """Main extraction method combining OCR and regex"""
         logger.info(f"Starting comprehensive extraction from PDF: {pdf_path}")
         
-        # Step 1: Try direct text extraction
-        text = ""
+        # Step 1: Text layer where a page has one; only the other pages are OCR'd
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for p in pdf.pages:
-                    t = p.extract_text() or ""
-                    text += t + "\n"
-            logger.info("Extracted text from PDF pages")
+            document = self.text_provider.extract(pdf_path)
         except Exception as e:
-            logger.error(f"PDF text extraction failed: {e}")
-            text = ""
-        
-        # Step 2: Always use OCR for Tamil documents (better accuracy)
-        logger.info("Using OCR for Tamil document processing...")
-        ocr_text = self.ocr_pdf(pdf_path)
-        if ocr_text and len(ocr_text.strip()) > len(text.strip()):
-            text = ocr_text
-            logger.info("OCR text used (better than PDF text)")
-        else:
-            logger.info("PDF text used (OCR not better)")
+            logger.error(f"Text extraction failed: {e}")
+            document = DocumentText()
+        text = document.text
         
-        # Step 3: Extract fields using your optimized regex patterns
+        # Step 2: Extract fields using your optimized regex patterns
         result = {
             "Owner Name": self.extract_field(text, 'owner_name'),
             "Father/Husband Name": self.extract_field(text, 'father_or_husband'),
@@ -206,7 +171,8 @@ class FinalComprehensiveExtractor:
             "extraction_timestamp": datetime.now().isoformat(),
             "text_length": len(text),
             "success_rate": success_rate,
-            "ocr_used": len(text.strip()) < 100,
+            "ocr_used": document.ocr_used,
+            "page_sources": document.page_sources,
             "method": "OCR + Optimized Regex"
         }
 
@@ -1,10 +1,11 @@
- """
+"""
 Comprehensive Patta Document Verification System
 Implements all rules and conditions for online Patta verification with OCR, portal verification, GIS validation, and authentication checks.
 """
 
 import os
 import re
+import sys
 import json
 import hashlib
 import requests
@@ -20,6 +21,13 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 import logging
 
+# Shared OCR pipeline lives in the project root's digitization package
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from digitization.document_text import SOURCE_OCR, DocumentText, DocumentTextProvider, PageText
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -40,6 +48,7 @@ class PattaVerifier:
     def __init__(self):
         # Configure Tesseract path
         pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+        self.text_provider = DocumentTextProvider(config='--psm 6', dpi=300)
         
         # Load NLP model
         try:
@@ -98,11 +107,13 @@ class PattaVerifier:
         logger.info(f"Extracting data from document: {file_path}")
         
         # Convert document to text
-        text = self._convert_to_text(file_path)
+        document = self._convert_to_text(file_path)
+        text = document.text
         
         # Extract structured data
         extracted_data = {
             'raw_text': text,
+            'page_sources': document.page_sources,
             'extraction_timestamp': datetime.now().isoformat(),
             'fields': {},
             'confidence_scores': {},
@@ -120,23 +131,19 @@ class PattaVerifier:
         
         return extracted_data
     
-    def _convert_to_text(self, file_path: str) -> str:
-        """Convert PDF/image to text using OCR"""
+    def _convert_to_text(self, file_path: str) -> DocumentText:
+        """Convert PDF/image to text: a PDF's text layer where usable, OCR otherwise"""
         try:
             if file_path.lower().endswith('.pdf'):
-                # Convert PDF to images
-                images = convert_from_path(file_path, dpi=300)
-                text = ""
-                for img in images:
-                    text += pytesseract.image_to_string(img, config='--psm 6')
-                return text
+                # Pages without a text layer are rendered and OCR'd concurrently
+                return self.text_provider.extract(file_path)
             else:
                 # Process image directly
                 img = Image.open(file_path)
-                return pytesseract.image_to_string(img, config='--psm 6')
+                return DocumentText([PageText(1, pytesseract.image_to_string(img, config='--psm 6'), SOURCE_OCR)])
         except Exception as e:
             logger.error(f"Error converting document to text: {e}")
-            return ""
+            return DocumentText()
     
     def _extract_field_with_confidence(self, text: str, pattern: str, field_name: str) -> Tuple[str, float]:
         """Extract field value with confidence scoring"""
@@ -495,7 +502,7 @@ class PattaVerifier:
         try:
             # Convert to image if PDF
             if file_path.lower().endswith('.pdf'):
-                images = convert_from_path(file_path)
+                images = convert_from_path(file_path, first_page=1, last_page=1)
                 img = np.array(images[0])
             else:
                 img = cv2.imread(file_path)
@@ -535,7 +542,7 @@ class PattaVerifier:
         try:
             # Convert to image if PDF
             if file_path.lower().endswith('.pdf'):
-                images = convert_from_path(file_path)
+                images = convert_from_path(file_path, first_page=1, last_page=1)
                 img = np.array(images[0])
             else:
                 img = cv2.imread(file_path)
@@ -598,7 +605,7 @@ class PattaVerifier:
             
             # Check for multiple versions of same text (copy-paste indicators)
             if file_path.lower().endswith('.pdf'):
-                images = convert_from_path(file_path)
+                images = convert_from_path(file_path, first_page=1, last_page=1)
                 text = pytesseract.image_to_string(images[0])
                 
                 # Look for repeated text patterns that might indicate tampering
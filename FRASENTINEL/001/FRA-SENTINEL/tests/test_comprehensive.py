@@ -106,6 +106,302 @@ class TestOCREngine(unittest.TestCase):
         self.assertIsNotNone(processed)
         self.assertEqual(len(processed.shape), 2)  # Should be grayscale
 
+class TestOCRCache(unittest.TestCase):
+    """Test the content-addressed OCR result cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, 'ocr_cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cache_key(self):
+        """Test that content, language, config and version all address results"""
+        from digitization.ocr_cache import cache_key, file_sha256
+
+        doc_a = os.path.join(self.temp_dir, 'a.pdf')
+        doc_b = os.path.join(self.temp_dir, 'copy of a.pdf')
+        for path in (doc_a, doc_b):
+            with open(path, 'wb') as f:
+                f.write(b'%PDF-1.4 patta')
+
+        sha = file_sha256(doc_a)
+        self.assertEqual(sha, file_sha256(doc_b))
+        key = cache_key(sha, 'tam+eng', '--psm 6', 'v1')
+        self.assertNotEqual(key, cache_key(sha, 'eng', '--psm 6', 'v1'))
+        self.assertNotEqual(key, cache_key(sha, 'tam+eng', '--psm 3', 'v1'))
+        self.assertNotEqual(key, cache_key(sha, 'tam+eng', '--psm 6', 'v2'))
+
+    def test_disk_persistence(self):
+        """Test that results survive across cache instances"""
+        from digitization.ocr_cache import OCRCache
+
+        value = {'text': 'பட்டா எண் 366', 'fields': {'patta_number': '366'}}
+        OCRCache(self.cache_path).put('doc', value)
+
+        cache = OCRCache(self.cache_path)
+        self.assertEqual(cache.get('doc'), value)
+        self.assertIsNone(cache.get('other'))
+        stats = cache.get_stats()
+        self.assertEqual((stats['entries'], stats['hits'], stats['misses']), (1, 1, 1))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries go once over budget"""
+        from digitization.ocr_cache import OCRCache
+
+        cache = OCRCache(self.cache_path, max_bytes=1000)
+        text = 'x' * 200
+        for key in ('a', 'b', 'c', 'd'):
+            cache.put(key, {'text': text})
+        cache.get('a')
+        cache.put('e', {'text': text})
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('e'))
+        self.assertLessEqual(cache.get_stats()['bytes'], 1000)
+
+        cache.put('huge', {'text': 'x' * 2000})
+        self.assertIsNone(cache.get('huge'))
+
+    def test_get_or_compute(self):
+        """Test that extraction runs once and failures are not cached"""
+        from digitization.ocr_cache import OCRCache
+
+        cache = OCRCache(self.cache_path)
+        calls = []
+
+        def extract():
+            calls.append(1)
+            return {'text': 'ok'}
+
+        self.assertEqual(cache.get_or_compute('doc', extract), {'text': 'ok'})
+        self.assertEqual(cache.get_or_compute('doc', extract), {'text': 'ok'})
+        self.assertEqual(len(calls), 1)
+
+        cache.get_or_compute('bad', lambda: {'error': 'OCR failed'})
+        self.assertIsNone(cache.get('bad'))
+
+        disabled = OCRCache(os.path.join(self.temp_dir, 'off.db'), max_bytes=0)
+        disabled.put('doc', {'text': 'ok'})
+        self.assertIsNone(disabled.get('doc'))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'off.db')))
+
+class TestPdfOCRPipeline(unittest.TestCase):
+    """Test the streaming, page-parallel OCR pipeline"""
+
+    def _pipeline(self, page_count, workers, max_in_flight, delays=None):
+        """Run ocr_pages with fake pages, tracking how many are rendered but unfinished"""
+        import threading
+        import time
+        from digitization.pdf_ocr import ocr_pages
+
+        state = {'in_flight': 0, 'peak': 0, 'concurrent': 0, 'peak_concurrent': 0}
+        lock = threading.Lock()
+
+        def render(page_number):
+            with lock:
+                state['in_flight'] += 1
+                state['peak'] = max(state['peak'], state['in_flight'])
+            return {'page': page_number}
+
+        def ocr(image):
+            with lock:
+                state['concurrent'] += 1
+                state['peak_concurrent'] = max(state['peak_concurrent'], state['concurrent'])
+            time.sleep((delays or {}).get(image['page'], 0.01))
+            with lock:
+                state['concurrent'] -= 1
+                state['in_flight'] -= 1
+            return f"page {image['page']}"
+
+        return ocr_pages(render, page_count, ocr, workers, max_in_flight), state
+
+    def test_page_order(self):
+        """Test that text comes back in page order whatever finishes first"""
+        pages, state = self._pipeline(6, 3, 4, delays={1: 0.05, 2: 0.0, 3: 0.03})
+        self.assertEqual(list(pages), [(n, f'page {n}') for n in range(1, 7)])
+        self.assertGreater(state['peak_concurrent'], 1)
+
+    def test_in_flight_cap(self):
+        """Test that no more than max_in_flight rendered pages are held"""
+        pages, state = self._pipeline(12, 4, 2)
+        self.assertEqual(len(list(pages)), 12)
+        self.assertLessEqual(state['peak'], 2)
+        self.assertLessEqual(state['peak_concurrent'], 2)
+
+    def test_early_close_and_errors(self):
+        """Test that closing early stops rendering and OCR errors propagate"""
+        from digitization.pdf_ocr import ocr_pages
+
+        rendered = []
+        pages = ocr_pages(lambda n: rendered.append(n) or n, 50, str, workers=2, max_in_flight=2)
+        self.assertEqual(next(pages), (1, '1'))
+        pages.close()
+        self.assertLessEqual(len(rendered), 3)
+
+        def failing_ocr(image):
+            raise RuntimeError('tesseract failed')
+
+        with self.assertRaises(RuntimeError):
+            list(ocr_pages(lambda n: n, 3, failing_ocr, workers=2))
+
+    def test_worker_threads_shared_across_documents(self):
+        """Test that later documents run on the same worker threads, keeping per-thread Tesseract handles"""
+        import threading
+        from digitization.pdf_ocr import ocr_pages
+
+        def thread_ids():
+            ocr = lambda image: str(threading.get_ident())
+            return {text for _, text in ocr_pages(lambda n: n, 8, ocr, workers=2, max_in_flight=3)}
+
+        seen = set()
+        for _ in range(4):
+            seen |= thread_ids()
+        self.assertLessEqual(len(seen), 2)
+        self.assertNotIn(str(threading.get_ident()), seen)
+
+class TestDocumentText(unittest.TestCase):
+    """Test the per-page text layer / OCR document text provider"""
+
+    PAGE_TEXT = "Patta Number: 366 Survey No: 8 District: Cuddalore Taluk: Kurinjipadi"
+
+    def _provider(self, layer, **kwargs):
+        from digitization.document_text import DocumentTextProvider
+
+        ocr_calls = []
+
+        def ocr_pages(pdf_path, page_numbers):
+            ocr_calls.append(list(page_numbers))
+            return ((number, f"ocr {number}") for number in page_numbers)
+
+        provider = DocumentTextProvider(ocr_pages=ocr_pages, **kwargs)
+        provider._text_layer = lambda pdf_path: layer
+        return provider, ocr_calls
+
+    def test_usable_text_layer(self):
+        """Test which extracted page texts count as a usable text layer"""
+        from digitization.document_text import usable_text_layer
+
+        self.assertTrue(usable_text_layer(self.PAGE_TEXT))
+        self.assertTrue(usable_text_layer("பட்டா எண் : 366 மாவட்டம் : கடலூர் வட்டம் : குறிஞ்சிப்பாடி"))
+        self.assertFalse(usable_text_layer(""))
+        self.assertFalse(usable_text_layer(None))
+        self.assertFalse(usable_text_layer("Page 1"))
+        self.assertFalse(usable_text_layer("(cid:12)(cid:45)(cid:7) " * 20))
+        self.assertFalse(usable_text_layer("#$%&*@!~^ " * 10 + "abc"))
+
+    def test_born_digital_skips_ocr(self):
+        """Test that a document with a text layer on every page is never OCR'd"""
+        provider, ocr_calls = self._provider([self.PAGE_TEXT, self.PAGE_TEXT])
+        document = provider.extract('patta.pdf')
+        self.assertEqual(ocr_calls, [])
+        self.assertEqual(document.page_sources, ['text_layer', 'text_layer'])
+        self.assertFalse(document.ocr_used)
+        self.assertEqual(document.text, self.PAGE_TEXT + "\n" + self.PAGE_TEXT)
+
+    def test_mixed_document_ocrs_only_missing_pages(self):
+        """Test that only pages without a usable text layer are OCR'd, in page order"""
+        provider, ocr_calls = self._provider(['', self.PAGE_TEXT, '(cid:3)(cid:9)', self.PAGE_TEXT])
+        document = provider.extract('patta.pdf')
+        self.assertEqual(ocr_calls, [[1, 3]])
+        self.assertEqual(document.page_sources, ['ocr', 'text_layer', 'ocr', 'text_layer'])
+        self.assertEqual(document.ocr_pages, [1, 3])
+        self.assertEqual([page.text for page in document.pages],
+                         ['ocr 1', self.PAGE_TEXT, 'ocr 3', self.PAGE_TEXT])
+        self.assertEqual(document.summary()['text_layer_pages'], 2)
+
+    def test_tamil_language_rejects_legacy_font_soup(self):
+        """Test that a legacy-font Latin letter-soup page is OCR'd when the language includes Tamil"""
+        from digitization.document_text import usable_text_layer
+
+        garbage = "gl;lh vz; : 366 khtl;lk; : flY}h; tl;lk; : FwpQ;rpg;ghb"
+        tamil = "பட்டா எண் : 366 மாவட்டம் : கடலூர் Survey No: 8 District: Cuddalore"
+        self.assertTrue(usable_text_layer(garbage))
+        self.assertFalse(usable_text_layer(garbage, tamil=True))
+        self.assertTrue(usable_text_layer(tamil, tamil=True))
+        self.assertTrue(usable_text_layer(self.PAGE_TEXT, tamil=True))
+
+        for kwargs in ({'lang': 'tam+eng'}, {'config': '--oem 3 --psm 6 -l eng+tam'}):
+            provider, ocr_calls = self._provider([garbage, tamil], **kwargs)
+            document = provider.extract('patta.pdf')
+            self.assertEqual(ocr_calls, [[1]], kwargs)
+            self.assertEqual(document.page_sources, ['ocr', 'text_layer'])
+
+        provider, ocr_calls = self._provider([garbage], lang='eng')
+        self.assertEqual(provider.extract('patta.pdf').page_sources, ['text_layer'])
+        self.assertEqual(ocr_calls, [])
+
+    def test_english_text_layer_skips_ocr_under_tamil(self):
+        """Test that a born-digital English patta skips OCR although the extractors OCR tam+eng"""
+        provider, ocr_calls = self._provider([self.PAGE_TEXT, self.PAGE_TEXT], lang='tam+eng')
+        document = provider.extract('patta.pdf')
+        self.assertEqual(ocr_calls, [])
+        self.assertEqual(document.page_sources, ['text_layer', 'text_layer'])
+
+    def test_unreadable_text_layer_falls_back_to_ocr(self):
+        """Test that a PDF whose text layer cannot be read is OCR'd page by page"""
+        from digitization import document_text
+
+        provider, ocr_calls = self._provider([])
+
+        def broken(pdf_path):
+            raise ValueError('bad xref')
+
+        provider._text_layer = broken
+        with patch.object(document_text, 'pdf_page_count', return_value=3):
+            document = provider.extract('patta.pdf')
+        self.assertEqual(ocr_calls, [[1, 2, 3]])
+        self.assertEqual(document.page_sources, ['ocr'] * 3)
+
+    def test_pipeline_page_subset(self):
+        """Test that the OCR pipeline can run on a subset of pages"""
+        from digitization.pdf_ocr import ocr_pages
+
+        pages = ocr_pages(lambda n: n, 2, str, workers=2, page_numbers=[2, 5])
+        self.assertEqual(list(pages), [(2, '2'), (5, '5')])
+
+class TestImageHandoff(unittest.TestCase):
+    """Test raw page image handoff to Tesseract"""
+
+    def test_pixmap_array_is_a_view(self):
+        """Test that pixmap samples are wrapped without copying"""
+        from digitization.image_handoff import pixmap_array
+
+        samples = bytearray(range(24))
+        pix = Mock(samples_mv=memoryview(samples), width=4, height=2, n=3)
+        array = pixmap_array(pix)
+        self.assertEqual(array.shape, (2, 4, 3))
+        self.assertEqual(array[1, 0].tolist(), [12, 13, 14])
+        samples[12] = 99
+        self.assertEqual(array[1, 0, 0], 99)
+
+    def test_config_parsing(self):
+        """Test which pytesseract configs the raw API handles"""
+        from digitization.image_handoff import _parse_config
+
+        self.assertEqual(_parse_config(''), (None, None, None, {}))
+        self.assertEqual(_parse_config('--oem 3 --psm 6 -l eng+tam'), ('eng+tam', 6, 3, {}))
+        self.assertEqual(_parse_config('--psm 6 -c tessedit_char_whitelist=0123456789'),
+                         (None, 6, None, {'tessedit_char_whitelist': '0123456789'}))
+        self.assertIsNone(_parse_config('--dpi 300'))
+        self.assertIsNone(_parse_config('--psm'))
+
+    def test_pytesseract_fallback_skips_png(self):
+        """Test that pytesseract gets the page pixels in an uncompressed format"""
+        from digitization import image_handoff
+
+        page = np.zeros((20, 30), dtype=np.uint8)
+        page[5:15, 10:20] = 255
+        with patch.object(image_handoff, 'TESSEROCR_AVAILABLE', False), \
+                patch.object(image_handoff.pytesseract, 'image_to_string', return_value='text') as ocr:
+            self.assertEqual(image_handoff.image_to_string(page, lang='tam+eng', config='--psm 6'), 'text')
+        image = ocr.call_args[0][0]
+        self.assertEqual(image.format, 'PPM')
+        self.assertTrue(np.array_equal(np.asarray(image), page))
+        self.assertEqual(ocr.call_args[1], {'lang': 'tam+eng', 'config': '--psm 6'})
+
 class TestDSSEngine(unittest.TestCase):
     """Test DSS functionality"""
     
@@ -223,6 +519,16 @@ class TestAssetMapping(unittest.TestCase):
         self.assertIn('water', stats)
         self.assertIn('homestead', stats)
 
+_warmed_pids = []
+
+def _record_warmup():
+    """Pool warm-up used by the process executor test"""
+    _warmed_pids.append(os.getpid())
+
+def _pid_handler(data):
+    """Process executor test handler (module level so it can be pickled)"""
+    return {'pid': os.getpid(), 'warmed': list(_warmed_pids), 'value': data['value'] * 2}
+
 class TestMessageQueue(unittest.TestCase):
     """Test message queue functionality"""
     
@@ -231,7 +537,7 @@ class TestMessageQueue(unittest.TestCase):
     
     def test_job_creation(self):
         """Test job creation"""
-        from webgis.queue import MessageQueue, Job, JobStatus
+        from webgis.job_queue import MessageQueue, Job, JobStatus
         
         queue = MessageQueue()
         
@@ -247,7 +553,7 @@ class TestMessageQueue(unittest.TestCase):
     
     def test_job_processing(self):
         """Test job processing"""
-        from webgis.queue import MessageQueue
+        from webgis.job_queue import MessageQueue
         
         queue = MessageQueue()
         
@@ -273,7 +579,7 @@ class TestMessageQueue(unittest.TestCase):
     
     def test_queue_statistics(self):
         """Test queue statistics"""
-        from webgis.queue import get_queue_stats
+        from webgis.job_queue import get_queue_stats
         
         stats = get_queue_stats()
         
@@ -284,6 +590,386 @@ class TestMessageQueue(unittest.TestCase):
         self.assertIn('completed', stats)
         self.assertIn('failed', stats)
 
+    def test_priority_order(self):
+        """Test priority ordering with FIFO tie-break"""
+        from webgis.job_queue import MessageQueue
+
+        queue = MessageQueue()
+        low = queue.enqueue('test_job', {}, priority=9)
+        first = queue.enqueue('test_job', {}, priority=1)
+        second = queue.enqueue('test_job', {}, priority=1)
+
+        self.assertEqual([queue.dequeue().id for _ in range(3)], [first, second, low])
+        self.assertIsNone(queue.dequeue())
+
+    def test_blocking_dequeue(self):
+        """Test that dequeue waits for a job from another thread"""
+        import threading
+        from webgis.job_queue import MessageQueue
+
+        queue = MessageQueue()
+        timer = threading.Timer(0.05, queue.enqueue, args=('test_job', {}))
+        timer.start()
+
+        job = queue.dequeue(timeout=2.0)
+        timer.join()
+        self.assertIsNotNone(job)
+        self.assertIsNone(queue.dequeue(timeout=0.01))
+
+    def test_status_index(self):
+        """Test status lookups follow job transitions"""
+        from webgis.job_queue import MessageQueue, JobStatus
+
+        queue = MessageQueue()
+        job_ids = [queue.enqueue('test_job', {}) for _ in range(3)]
+        queue.dequeue()
+        queue.complete_job(job_ids[0])
+
+        counts = queue.count_by_status()
+        self.assertEqual(counts[JobStatus.PENDING], 2)
+        self.assertEqual(counts[JobStatus.COMPLETED], 1)
+        self.assertEqual([job.id for job in queue.get_jobs_by_status(JobStatus.COMPLETED)], [job_ids[0]])
+
+        queue.jobs[job_ids[0]].completed_at = datetime(2000, 1, 1)
+        queue.cleanup_old_jobs()
+        self.assertEqual(queue.count_by_status()[JobStatus.COMPLETED], 0)
+        self.assertNotIn(job_ids[0], queue.jobs)
+
+    def test_process_executor(self):
+        """Test that process-pool jobs run warmed up and report back"""
+        import time
+        from webgis.job_queue import MessageQueue, JobStatus
+
+        queue = MessageQueue()
+        queue.register_handler('test_job', _pid_handler, warmup=_record_warmup)
+        queue.start(num_workers=1, executor='process', pool_sizes={'test_job': 2})
+        try:
+            job_ids = [queue.enqueue('test_job', {'value': i}) for i in range(4)]
+            deadline = time.time() + 10
+            while time.time() < deadline and queue.count_by_status()[JobStatus.COMPLETED] < 4:
+                time.sleep(0.05)
+        finally:
+            queue.stop()
+
+        self.assertEqual(len(queue.workers), 2)
+        for i, job_id in enumerate(job_ids):
+            result = queue.jobs[job_id].result
+            self.assertEqual(queue.jobs[job_id].status, JobStatus.COMPLETED)
+            self.assertEqual(result['value'], i * 2)
+            self.assertNotEqual(result['pid'], os.getpid())
+            self.assertEqual(result['warmed'], [result['pid']])
+
+    def test_broken_pool_replaced_outside_lock(self):
+        """Test that the queue stays usable while a broken pool's replacement warms up"""
+        import threading
+        from webgis.job_queue import MessageQueue, JobStatus
+
+        queue = MessageQueue()
+        broken, fresh = Mock(), Mock()
+        queue.pools['test_job'] = broken
+        building, release = threading.Event(), threading.Event()
+        builds = []
+
+        def create_pool(job_type):
+            builds.append(job_type)
+            building.set()
+            release.wait(5)
+            return fresh
+
+        queue._create_pool = create_pool
+        thread = threading.Thread(target=queue._replace_pool, args=('test_job', broken))
+        thread.start()
+        self.assertTrue(building.wait(5))
+
+        queue.enqueue('test_job', {})
+        self.assertEqual(queue.count_by_status()[JobStatus.PENDING], 1)
+        self.assertIsNotNone(queue.dequeue())
+
+        release.set()
+        thread.join(5)
+        self.assertIs(queue.pools['test_job'], fresh)
+        broken.shutdown.assert_called_once_with(wait=False)
+
+        # A worker that saw the same broken pool later does not rebuild it again
+        queue._replace_pool('test_job', broken)
+        self.assertEqual(builds, ['test_job'])
+
+    def test_sqlite_store(self):
+        """Test the durable queue survives a restart and is shared"""
+        from webgis.job_queue import SQLiteMessageQueue, JobStatus
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'queue.db')
+            web = SQLiteMessageQueue(db_path)
+            low = web.enqueue('test_job', {'file': 'a.pdf'}, priority=9)
+            high = web.enqueue('test_job', {'file': 'b.pdf'}, priority=1)
+
+            # A second process opening the same file sees the same backlog
+            worker = SQLiteMessageQueue(db_path)
+            job = worker.dequeue()
+            self.assertEqual(job.id, high)
+            self.assertEqual(job.data, {'file': 'b.pdf'})
+            self.assertEqual(job.status, JobStatus.PROCESSING)
+            worker.complete_job(high, {'pages': 2})
+
+            self.assertEqual(web.get_job(high).result, {'pages': 2})
+            self.assertEqual(web.get_jobs_by_status(JobStatus.PENDING)[0].id, low)
+            self.assertEqual(web.count_by_status()[JobStatus.COMPLETED], 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_lease_expiry(self):
+        """Test that jobs of a crashed worker become visible again"""
+        import time
+        from webgis.job_queue import SQLiteMessageQueue, JobStatus
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'queue.db')
+            crashed = SQLiteMessageQueue(db_path, visibility_timeout=0.05)
+            job_id = crashed.enqueue('test_job', {})
+            self.assertEqual(crashed.dequeue().id, job_id)
+            self.assertIsNone(crashed.dequeue())
+
+            time.sleep(0.1)
+            worker = SQLiteMessageQueue(db_path)
+            job = worker.dequeue()
+            self.assertEqual(job.id, job_id)
+            self.assertEqual(job.retry_count, 1)
+
+            # The stale lease holder can no longer finish the job
+            crashed.complete_job(job_id, {'stale': True})
+            self.assertEqual(worker.get_job(job_id).status, JobStatus.PROCESSING)
+            worker.complete_job(job_id, {'stale': False})
+            self.assertEqual(worker.get_job(job_id).result, {'stale': False})
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_lease_heartbeat(self):
+        """Test that a handler running past the visibility timeout keeps its lease"""
+        import time
+        from webgis.job_queue import SQLiteMessageQueue, JobStatus
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'queue.db')
+            queue = SQLiteMessageQueue(db_path, visibility_timeout=0.15, poll_interval=0.02)
+            runs = []
+
+            def slow_handler(data):
+                runs.append(data)
+                time.sleep(0.6)
+                return {'seeded': True}
+
+            queue.register_handler('test_job', slow_handler)
+            job_id = queue.enqueue('test_job', {'layer': 'villages'})
+            queue.start(num_workers=1)
+            try:
+                other = SQLiteMessageQueue(db_path, visibility_timeout=0.15)
+                deadline = time.time() + 5
+                while time.time() < deadline and not runs:
+                    time.sleep(0.01)
+                while time.time() < deadline and other.get_job(job_id).status != JobStatus.COMPLETED:
+                    self.assertIsNone(other.dequeue())
+                    time.sleep(0.05)
+            finally:
+                queue.stop()
+
+            job = other.get_job(job_id)
+            self.assertEqual(job.status, JobStatus.COMPLETED)
+            self.assertEqual(job.retry_count, 0)
+            self.assertEqual(job.result, {'seeded': True})
+            self.assertEqual(len(runs), 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_idle_poll_reads_only(self):
+        """Test that idle polls take no write lock and sweep leases only every sweep_interval"""
+        from webgis.job_queue import SQLiteMessageQueue
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            queue = SQLiteMessageQueue(os.path.join(temp_dir, 'queue.db'), poll_interval=0.02)
+            statements = []
+            queue._connection().set_trace_callback(statements.append)
+
+            with patch.object(queue, 'requeue_expired_leases', wraps=queue.requeue_expired_leases) as sweep:
+                self.assertIsNone(queue.dequeue(timeout=0.2))
+            self.assertEqual(sweep.call_count, 1)
+            self.assertTrue(statements)
+            self.assertTrue(all(statement.lstrip().upper().startswith('SELECT') for statement in statements),
+                            statements)
+
+            job_id = queue.enqueue('test_job', {})
+            self.assertEqual(queue.dequeue().id, job_id)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_retry_policy(self):
+        """Test exponential backoff growth, cap and jitter bounds"""
+        from webgis.job_queue import RetryPolicy
+
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, multiplier=2.0, jitter=0.0)
+        self.assertEqual([policy.delay(attempt) for attempt in range(1, 6)], [1.0, 2.0, 4.0, 5.0, 5.0])
+
+        jittered = RetryPolicy(base_delay=10.0, jitter=0.2)
+        for _ in range(50):
+            self.assertTrue(8.0 <= jittered.delay(1) <= 12.0)
+
+    def test_retry_backoff(self):
+        """Test that failed jobs are re-run only after their backoff delay"""
+        import time
+        from webgis.job_queue import MessageQueue, JobStatus, RetryPolicy
+
+        queue = MessageQueue()
+        queue.retry_policies['test_job'] = RetryPolicy(base_delay=0.2, jitter=0.0)
+        job_id = queue.enqueue('test_job', {})
+        queue.fail_job(queue.dequeue().id, 'tesseract crashed')
+
+        self.assertEqual(queue.get_job(job_id).status, JobStatus.RETRYING)
+        fresh_id = queue.enqueue('test_job', {})
+        self.assertEqual(queue.dequeue().id, fresh_id)
+        self.assertIsNone(queue.dequeue())
+
+        started = time.monotonic()
+        job = queue.dequeue(timeout=2.0)
+        self.assertEqual(job.id, job_id)
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(job.retry_count, 1)
+
+    def test_dead_letter_replay(self):
+        """Test that exhausted jobs are dead-lettered, bounded and replayable"""
+        from webgis.job_queue import MessageQueue, JobStatus
+
+        queue = MessageQueue()
+        queue.dead_letters.max_size = 2
+        job_ids = []
+        for _ in range(3):
+            job_id = queue.enqueue('test_job', {})
+            queue.jobs[job_id].max_retries = 0
+            queue.fail_job(queue.dequeue().id, 'unreadable scan')
+            job_ids.append(job_id)
+
+        self.assertEqual([job.id for job in queue.get_dead_letters()], [job_ids[2], job_ids[1]])
+        self.assertEqual(queue.get_job(job_ids[2]).status, JobStatus.FAILED)
+
+        self.assertTrue(queue.replay_dead_letter(job_ids[2]))
+        self.assertFalse(queue.replay_dead_letter(job_ids[0]))
+        self.assertEqual(queue.dead_letter_count(), 1)
+        job = queue.dequeue()
+        self.assertEqual(job.id, job_ids[2])
+        self.assertEqual(job.retry_count, 0)
+
+    def test_sqlite_retry_and_dead_letter(self):
+        """Test backoff and dead-lettering in the durable store"""
+        import time
+        from webgis.job_queue import SQLiteMessageQueue, JobStatus, RetryPolicy
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            queue = SQLiteMessageQueue(os.path.join(temp_dir, 'queue.db'), poll_interval=0.02)
+            queue.retry_policies['test_job'] = RetryPolicy(base_delay=0.1, jitter=0.0)
+            job_id = queue.enqueue('test_job', {})
+
+            queue.fail_job(queue.dequeue().id, 'timeout')
+            self.assertEqual(queue.get_job(job_id).status, JobStatus.RETRYING)
+            self.assertIsNone(queue.dequeue())
+
+            for _ in range(3):
+                queue.fail_job(queue.dequeue(timeout=2.0).id, 'timeout')
+
+            self.assertEqual(queue.get_job(job_id).status, JobStatus.FAILED)
+            self.assertEqual([job.id for job in queue.get_dead_letters()], [job_id])
+
+            self.assertTrue(queue.replay_dead_letter(job_id))
+            self.assertEqual(queue.dead_letter_count(), 0)
+            self.assertEqual(queue.dequeue().id, job_id)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def _run_fanout(self, queue):
+        """Drive a three-file batch through a queue by hand"""
+        from webgis.job_queue import JobStatus, RetryPolicy, batch_completion_handler
+
+        queue.retry_policies['ocr_extraction'] = RetryPolicy(base_delay=0.0, jitter=0.0)
+        queue.register_completion_callback('batch_processing', batch_completion_handler)
+        files = ['a.pdf', 'b.pdf', 'c.pdf']
+        parent_id = queue.enqueue_fanout('batch_processing', 'ocr_extraction',
+                                         [{'file_path': path} for path in files],
+                                         data={'file_paths': files})
+
+        children = [queue.dequeue() for _ in files]
+        self.assertIsNone(queue.dequeue())
+        self.assertEqual([child.data['file_path'] for child in children], files)
+        self.assertTrue(all(child.parent_id == parent_id for child in children))
+
+        queue.complete_job(children[0].id, {'pages': 2})
+        self.assertEqual(queue.get_job(parent_id).progress, {'total': 3, 'done': 1, 'failed': 0})
+        self.assertEqual(queue.get_job(parent_id).status, JobStatus.PROCESSING)
+
+        queue.complete_job(children[2].id, {'pages': 1})
+        for _ in range(4):
+            queue.fail_job(children[1].id, 'unreadable scan')
+            if queue.get_job(children[1].id).status == JobStatus.FAILED:
+                break
+            children[1] = queue.dequeue(timeout=2.0)
+
+        parent = queue.get_job(parent_id)
+        self.assertEqual(parent.status, JobStatus.COMPLETED)
+        self.assertEqual(parent.progress, {'total': 3, 'done': 2, 'failed': 1})
+        self.assertEqual(parent.result['total_processed'], 2)
+        self.assertEqual(parent.result['errors'], [{'file_path': 'b.pdf', 'error': 'unreadable scan'}])
+        self.assertEqual([item['file_path'] for item in parent.result['results']], ['a.pdf', 'c.pdf'])
+
+    def test_batch_fanout(self):
+        """Test batch fan-out, parent progress and the completion callback"""
+        from webgis.job_queue import MessageQueue
+
+        queue = MessageQueue()
+        self._run_fanout(queue)
+
+        empty_id = queue.enqueue_fanout('batch_processing', 'ocr_extraction', [])
+        self.assertEqual(queue.get_job(empty_id).result['total_processed'], 0)
+
+    def test_sqlite_batch_fanout(self):
+        """Test batch fan-out in the durable store"""
+        from webgis.job_queue import SQLiteMessageQueue
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            queue = SQLiteMessageQueue(os.path.join(temp_dir, 'queue.db'), poll_interval=0.02)
+            self._run_fanout(queue)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_parent_finalized_after_crash(self):
+        """Test that a parent whose finalizing process died is finalized by another process"""
+        import time
+        from webgis.job_queue import SQLiteMessageQueue, JobStatus
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(temp_dir, 'queue.db')
+            crashed = SQLiteMessageQueue(db_path, visibility_timeout=0.05)
+            parent_id = crashed.enqueue_fanout('batch_processing', 'ocr_extraction', [{'file_path': 'a.pdf'}])
+            child = crashed.dequeue()
+            with patch.object(crashed, '_finalize_parent'):
+                crashed.complete_job(child.id, {'pages': 1})
+
+            worker = SQLiteMessageQueue(db_path)
+            worker.requeue_expired_leases()
+            self.assertEqual(worker.get_job(parent_id).status, JobStatus.PROCESSING)
+
+            time.sleep(0.1)
+            self.assertIsNone(worker.dequeue())
+            parent = worker.get_job(parent_id)
+            self.assertEqual(parent.status, JobStatus.COMPLETED)
+            self.assertEqual(parent.result, {'children': [child.id]})
+            self.assertEqual(parent.progress, {'total': 1, 'done': 1, 'failed': 0})
+        finally:
+            shutil.rmtree(temp_dir)
+
 class TestTileServer(unittest.TestCase):
     """Test tile server functionality"""
     
@@ -335,6 +1021,640 @@ class TestTileServer(unittest.TestCase):
         for color in renderer.colors.values():
             self.assertEqual(len(color), 4)  # RGBA
 
+    def test_tile_cache_lru(self):
+        """Test LRU order, byte budget and counters"""
+        from webgis.tiles import TileCache
+
+        cache = TileCache(max_bytes=300)
+        cache.set('ifr_5_1_1', b'a' * 100)
+        cache.set('ifr_5_1_2', b'b' * 100)
+        cache.set('ifr_5_1_3', b'c' * 100)
+        self.assertEqual(cache.get('ifr_5_1_1'), b'a' * 100)
+
+        # Least recently used tile (1_2) makes room for the new one
+        cache.set('cr_5_1_4', b'd' * 150)
+        self.assertIsNone(cache.get('ifr_5_1_2'))
+        self.assertIsNone(cache.get('ifr_5_1_3'))
+        self.assertIsNotNone(cache.get('ifr_5_1_1'))
+
+        stats = cache.get_stats()
+        self.assertEqual(stats['bytes'], 250)
+        self.assertEqual(stats['evictions'], 2)
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+        self.assertEqual(stats['layers']['cr']['bytes'], 150)
+
+        # Oversized tiles are not cached at all
+        cache.set('ifr_5_1_5', b'e' * 400)
+        self.assertIsNone(cache.get('ifr_5_1_5'))
+        self.assertEqual(cache.get_stats()['entries'], 2)
+
+    def test_tile_cache_layer_quota(self):
+        """Test that a layer quota only evicts that layer's tiles"""
+        from webgis.tiles import TileCache
+
+        cache = TileCache(max_bytes=10000, layer_quotas={'villages': 200})
+        cache.set('ifr_5_0_0', b'x' * 100)
+        for y in range(3):
+            cache.set(f'villages_5_0_{y}', b'v' * 100)
+
+        self.assertIsNone(cache.get('villages_5_0_0'))
+        self.assertIsNotNone(cache.get('villages_5_0_2'))
+        self.assertIsNotNone(cache.get('ifr_5_0_0'))
+        self.assertEqual(cache.get_stats()['layers']['villages']['bytes'], 200)
+
+        self.assertEqual(cache.delete_layer('villages'), 2)
+        self.assertEqual(cache.get_stats()['bytes'], 100)
+
+    def test_tile_cache_threads(self):
+        """Test concurrent access keeps the byte accounting consistent"""
+        import threading
+        from webgis.tiles import TileCache
+
+        cache = TileCache(max_bytes=5000, layer_quotas={'cr': 1000})
+
+        def worker(seed):
+            for i in range(500):
+                layer = ('ifr', 'cr', 'villages')[(seed + i) % 3]
+                key = f'{layer}_8_{seed}_{i % 40}'
+                if cache.get(key) is None:
+                    cache.set(key, b'#' * (50 + i % 70))
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.get_stats()
+        self.assertLessEqual(stats['bytes'], 5000)
+        self.assertEqual(stats['bytes'], sum(len(value) for value in cache.cache.values()))
+        self.assertEqual(stats['bytes'], sum(layer['bytes'] for layer in stats['layers'].values()))
+        self.assertLessEqual(stats['layers']['cr']['bytes'], 1000)
+
+    def test_mbtiles_store(self):
+        """Test MBTiles layout, batch writes and cross-instance reads"""
+        from webgis.tiles.mbtiles import MBTilesStore
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            writer = MBTilesStore(temp_dir)
+            written = writer.put_many('ifr', ((6, x, y, bytes([x, y])) for x in range(30) for y in range(30)))
+            self.assertEqual(written, 900)
+            writer.put('villages', 6, 44, 27, b'village-tile')
+
+            # A second instance stands in for another gunicorn worker
+            reader = MBTilesStore(temp_dir)
+            self.assertEqual(reader.get('ifr', 6, 3, 4), bytes([3, 4]))
+            self.assertIsNone(reader.get('ifr', 7, 3, 4))
+
+            # Rows follow the MBTiles TMS scheme
+            conn = sqlite3.connect(os.path.join(temp_dir, 'villages.mbtiles'))
+            row = conn.execute("SELECT zoom_level, tile_column, tile_row FROM tiles").fetchone()
+            metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+            conn.close()
+            self.assertEqual(row, (6, 44, 63 - 27))
+            self.assertEqual(metadata['format'], 'png')
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_mbtiles_layer_versioning(self):
+        """Test that invalidation only affects the changed layer"""
+        from webgis.tiles.mbtiles import MBTilesStore
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            store = MBTilesStore(temp_dir)
+            store.put('ifr', 5, 1, 1, b'ifr')
+            store.put('cr', 5, 1, 1, b'cr')
+            self.assertEqual(store.layer_version('ifr'), 1)
+
+            self.assertEqual(store.invalidate('ifr'), 2)
+            self.assertEqual(store.layer_version('ifr'), 2)
+            self.assertIsNone(store.get('ifr', 5, 1, 1))
+            self.assertEqual(store.get('cr', 5, 1, 1), b'cr')
+            self.assertEqual(MBTilesStore(temp_dir).layer_version('ifr'), 2)
+
+            with self.assertRaises(ValueError):
+                store.get('../ifr', 5, 1, 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_tile_seeding_resume(self):
+        """Test that an interrupted seeding run resumes from its checkpoint"""
+        from webgis.tiles.mbtiles import MBTilesStore
+        from webgis.tiles.seeding import TileSeeder, read_seed_progress, work_units
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with patch('webgis.tiles.seeding.tile_store', MBTilesStore(temp_dir)) as store:
+                total_units = len(list(work_units(1, 6, block_size=4)))
+
+                def interrupt(progress):
+                    if progress['done_units'] == 3:
+                        raise KeyboardInterrupt
+
+                with self.assertRaises(KeyboardInterrupt):
+                    TileSeeder('ifr', 1, 6, workers=1, block_size=4, progress_callback=interrupt).run()
+                self.assertEqual(read_seed_progress('ifr')['done_units'], 3)
+
+                resumed_units = []
+                progress = TileSeeder('ifr', 1, 6, workers=1, block_size=4,
+                                      progress_callback=resumed_units.append).run()
+
+                self.assertEqual(len(resumed_units), total_units - 3)
+                self.assertTrue(progress['finished'])
+                self.assertEqual(progress['done_units'], total_units)
+                self.assertEqual(progress['tiles_rendered'], store.count('ifr'))
+                self.assertGreater(progress['tiles_per_sec'], 0)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_tile_seeding_parallel_skips_empty(self):
+        """Test process-pool seeding and skipping of tiles without data"""
+        from webgis.tiles.mbtiles import MBTilesStore
+        from webgis.tiles.seeding import TileSeeder
+
+        def west_of_80(layer, lat_min, lon_min, lat_max, lon_max):
+            return lon_min < 80.0
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with patch('webgis.tiles.seeding.tile_store', MBTilesStore(temp_dir)) as store, \
+                    patch('webgis.tiles.seeding.tile_renderer.has_data_in_bounds', side_effect=west_of_80):
+                progress = TileSeeder('villages', 4, 6, workers=2, block_size=2).run()
+
+            self.assertGreater(progress['tiles_skipped'], 0)
+            self.assertEqual(progress['tiles_rendered'], store.count('villages'))
+            self.assertIsNotNone(store.get('villages', 6, 44, 27))  # lon 67.5-73.1
+            self.assertIsNone(store.get('villages', 6, 47, 27))     # lon 84.4-90.0
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_vector_tile_encoding(self):
+        """Test MVT clipping, ring orientation, holes and attributes"""
+        from webgis.tiles import num2deg
+        from webgis.tiles.mvt import BUFFER, EXTENT, GEOM_POINT, GEOM_POLYGON, decode_tile, encode_tile
+
+        lat_top, lon_left = num2deg(10, 10, 5)
+        lat_bottom, lon_right = num2deg(11, 11, 5)
+        lat_mid, lon_mid = (lat_top + lat_bottom) / 2, (lon_left + lon_right) / 2
+        # Counter-clockwise square overhanging the tile's west edge, with a hole
+        square = {'type': 'Polygon', 'coordinates': [
+            [[lon_left - 5, lat_bottom + 1], [lon_mid, lat_bottom + 1], [lon_mid, lat_mid],
+             [lon_left - 5, lat_mid], [lon_left - 5, lat_bottom + 1]],
+            [[lon_left + 1, lat_bottom + 2], [lon_left + 1, lat_mid - 1], [lon_left + 2, lat_mid - 1],
+             [lon_left + 2, lat_bottom + 2], [lon_left + 1, lat_bottom + 2]]
+        ]}
+        features = [
+            {'geometry': square, 'properties': {'land_use': 'forest', 'area_hectares': 12.5, 'verified': True}},
+            {'geometry': {'type': 'Point', 'coordinates': list(reversed(num2deg(10.5, 10.5, 5)))},
+             'properties': {'claim_type': 'IFR', 'status': 'granted', 'survey_count': -3}, 'id': 7},
+            {'geometry': {'type': 'Point', 'coordinates': [lon_right + 10, lat_mid]}, 'properties': {}}
+        ]
+
+        layer = decode_tile(encode_tile({'assets': features, 'empty': []}, 5, 10, 10))
+        self.assertEqual(list(layer), ['assets'])
+        self.assertEqual(layer['assets']['extent'], EXTENT)
+
+        polygon, point = layer['assets']['features']  # Point outside the buffer is dropped
+        self.assertEqual(polygon['type'], GEOM_POLYGON)
+        self.assertEqual(polygon['properties'], {'land_use': 'forest', 'area_hectares': 12.5, 'verified': True})
+        exterior, hole = polygon['geometry']
+        self.assertEqual(min(px for px, _ in exterior), -BUFFER)
+
+        def area(ring):
+            return sum(ring[i - 1][0] * ring[i][1] - ring[i][0] * ring[i - 1][1] for i in range(len(ring)))
+        self.assertGreater(area(exterior), 0)
+        self.assertLess(area(hole), 0)
+
+        self.assertEqual(point['type'], GEOM_POINT)
+        self.assertEqual(point['id'], 7)
+        self.assertEqual(point['properties'], {'claim_type': 'IFR', 'status': 'granted', 'survey_count': -3})
+        self.assertEqual(point['geometry'], [[(EXTENT // 2, EXTENT // 2)]])
+
+        # Ids that are not unsigned integers are left out instead of failing the tile
+        centre = {'type': 'Point', 'coordinates': list(reversed(num2deg(10.5, 10.5, 5)))}
+        odd_ids = ['PT-42', -1, 2.5, True, 1 << 64, None, 0]
+        layer = decode_tile(encode_tile({'ifr': [{'geometry': centre, 'id': i} for i in odd_ids]}, 5, 10, 10))
+        self.assertEqual([feature['id'] for feature in layer['ifr']['features']],
+                         [None, None, None, None, None, None, 0])
+
+    def test_vector_tile_simplification(self):
+        """Test that low zooms carry fewer vertices than high zooms"""
+        import math
+        from webgis.tiles import deg2num
+        from webgis.tiles.mvt import decode_tile, encode_tile
+
+        circle = {'type': 'Polygon', 'coordinates': [[
+            [80.0 + 0.5 * math.cos(math.radians(a)), 21.0 + 0.5 * math.sin(math.radians(a))]
+            for a in range(0, 361, 2)
+        ]]}
+
+        def vertices(z):
+            x, y = deg2num(21.0, 80.0, z)
+            tile = decode_tile(encode_tile({'villages': [{'geometry': circle}]}, z, x, y))
+            return len(tile['villages']['features'][0]['geometry'][0])
+
+        self.assertLess(vertices(4), vertices(7))
+        self.assertGreaterEqual(vertices(4), 3)
+
+    def test_grid_index(self):
+        """Test grid index queries against a brute-force scan"""
+        import random
+        from webgis.tiles.spatial_index import GridIndex
+
+        rng = random.Random(7)
+        index = GridIndex(cell_size=0.5, max_item_cells=16)
+        boxes = {}
+        for key in range(300):
+            lon, lat = rng.uniform(68, 97), rng.uniform(6, 37)
+            size = rng.choice([0.0, 0.1, 3.0])  # points, villages, items kept in the large list
+            boxes[key] = (lon, lat, lon + size, lat + size)
+            index.insert(key, boxes[key], {'key': key})
+
+        for key in range(0, 300, 3):
+            index.remove(key)
+            del boxes[key]
+        index.insert(1, (80.0, 20.0, 80.0, 20.0), {'key': 1})  # Replaces the old entry
+        boxes[1] = (80.0, 20.0, 80.0, 20.0)
+        self.assertEqual(len(index), len(boxes))
+
+        for _ in range(200):
+            lon, lat = rng.uniform(66, 97), rng.uniform(4, 37)
+            size = rng.choice([0.2, 2.0, 40.0])
+            query = (lon, lat, lon + size, lat + size)
+            expected = sorted(key for key, box in boxes.items()
+                              if box[0] <= query[2] and box[2] >= query[0] and box[1] <= query[3] and box[3] >= query[1])
+            self.assertEqual([record['key'] for record in index.query(*query)], expected)
+
+    def test_tile_data_source(self):
+        """Test database-backed tile lookups with incremental refresh"""
+        from sqlalchemy import create_engine, text
+        from webgis.tiles import TileRenderer
+        from webgis.tiles.spatial_index import TileDataSource
+
+        def point(lon, lat):
+            return json.dumps({'type': 'Point', 'coordinates': [lon, lat]})
+
+        def square(lon, lat, size):
+            return json.dumps({'type': 'Polygon', 'coordinates': [[
+                [lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]]})
+
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE patta_holders (id INTEGER PRIMARY KEY, holder_name TEXT, claim_type TEXT, "
+                "status TEXT, area_claimed REAL, area_vested REAL, geometry TEXT)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE villages (id INTEGER PRIMARY KEY, name TEXT, code TEXT, area_hectares REAL, "
+                "population INTEGER, forest_cover_pct REAL, geometry TEXT)"
+            ))
+            conn.execute(text("INSERT INTO patta_holders VALUES (1, 'A', 'IFR', 'granted', 2.0, 1.5, :g)"),
+                         {'g': point(80.1, 20.1)})
+            conn.execute(text("INSERT INTO patta_holders VALUES (2, 'B', 'CFR', 'filed', 40.0, NULL, :g)"),
+                         {'g': point(80.2, 20.2)})
+            conn.execute(text("INSERT INTO villages VALUES (1, 'Jeypore', 'V1', 120.0, 900, 55.0, :g)"),
+                         {'g': square(80.0, 20.0, 0.5)})
+
+        db = Mock(engine=engine, is_postgis=False)
+        data_source = TileDataSource(db, refresh_interval=3600)
+        changes = []
+        data_source.on_change = changes.append
+        self.assertTrue(data_source.available())
+
+        renderer = TileRenderer()
+        renderer.data_source = data_source
+        ifr = renderer._get_patta_holders_in_bounds(20.0, 80.0, 21.0, 81.0, 'ifr')
+        self.assertEqual([(h['holder_name'], h['status'], h['area_hectares']) for h in ifr], [('A', 'granted', 1.5)])
+        self.assertEqual(renderer._get_patta_holders_in_bounds(20.0, 80.0, 21.0, 81.0, 'cfr')[0]['area_hectares'], 40.0)
+        self.assertEqual(renderer._get_villages_in_bounds(20.4, 80.4, 20.6, 80.6)[0]['name'], 'Jeypore')
+        self.assertEqual(renderer._get_villages_in_bounds(21.0, 81.0, 22.0, 82.0), [])
+        self.assertEqual(renderer._get_asset_mapping_in_bounds(20.0, 80.0, 21.0, 81.0), [])  # No table
+        self.assertTrue(renderer.has_data_in_bounds('ifr', 20.0, 80.0, 20.15, 80.15))
+        self.assertFalse(renderer.has_data_in_bounds('ifr', 20.15, 80.15, 21.0, 81.0))
+
+        # Inserted rows are picked up by the next refresh or pushed in directly
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO patta_holders VALUES (3, 'C', 'IFR', 'filed', 1.0, NULL, :g)"),
+                         {'g': point(80.3, 20.3)})
+        self.assertEqual(len(renderer._get_patta_holders_in_bounds(20.0, 80.0, 21.0, 81.0, 'ifr')), 1)
+        self.assertEqual(data_source.refresh(force=True), 1)
+        self.assertEqual(data_source.add('patta_holders', {
+            'id': 4, 'holder_name': 'D', 'claim_type': 'IFR', 'geometry': point(80.4, 20.4)
+        }), 'ifr')
+        self.assertEqual([h['holder_name'] for h in renderer._get_patta_holders_in_bounds(20.0, 80.0, 21.0, 81.0, 'ifr')],
+                         ['A', 'C', 'D'])
+        self.assertEqual(data_source.rebuild(), 4)
+
+        # Layers are reported once per new high-water row id, not on reloads
+        self.assertEqual(changes, [{'ifr': 1, 'cfr': 2, 'villages': 1}, {'ifr': 3}, {'ifr': 4}])
+        del changes[:]
+
+        # Claim types without a tile layer are skipped instead of failing the refresh
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO patta_holders VALUES (5, 'E', 'Community Forest', 'filed', 1.0, NULL, :g)"),
+                         {'g': point(80.5, 20.5)})
+            conn.execute(text("INSERT INTO patta_holders VALUES (6, 'F', 'cr ', 'filed', 1.0, NULL, :g)"),
+                         {'g': point(80.6, 20.6)})
+        self.assertEqual(data_source.refresh(force=True), 1)
+        self.assertIsNone(data_source.add('patta_holders', {
+            'id': 7, 'holder_name': 'G', 'claim_type': 'IFR?', 'geometry': point(80.7, 20.7)
+        }))
+        self.assertEqual([h['holder_name'] for h in renderer._get_patta_holders_in_bounds(20.0, 80.0, 21.0, 81.0, 'cr')],
+                         ['F'])
+        self.assertEqual(changes, [{'cr': 6}])
+
+    def test_tile_versions_follow_data(self):
+        """Test that new rows bump a layer version once, across processes and restarts"""
+        import webgis.tiles as tiles
+        from webgis.tiles.mbtiles import MBTilesStore
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            store = MBTilesStore(temp_dir)
+            store.put('ifr', 5, 22, 14, b'tile')
+            with patch('webgis.tiles.tile_store', store), patch.object(tiles.tile_cache, 'delete_layer') as drop:
+                tiles.layers_changed({'ifr': 3})
+                self.assertEqual(store.layer_version('ifr'), 2)
+                self.assertEqual(store.count('ifr'), 0)
+                drop.assert_called_once_with('ifr')
+
+                # Another process (or a restart) reaching the same rows keeps the tiles
+                store.put('ifr', 5, 22, 14, b'tile')
+                other = MBTilesStore(temp_dir)
+                self.assertIsNone(other.advance('ifr', 3))
+                self.assertIsNone(other.advance('ifr', 2))
+                self.assertEqual(other.count('ifr'), 1)
+                self.assertEqual(other.advance('ifr', 4), 3)
+
+            # A process that sees the version move indexes the rows it is missing
+            data_source = Mock()
+            with patch('webgis.tiles.tile_store', Mock()) as mock_store, \
+                    patch.object(tiles.tile_renderer, 'data_source', data_source), \
+                    patch.dict(tiles._seen_versions, clear=True):
+                mock_store.layer_version.return_value = 3
+                self.assertEqual(tiles.tile_version('ifr'), 3)
+                self.assertEqual(tiles.tile_version('ifr'), 3)
+                data_source.refresh.assert_not_called()
+                mock_store.layer_version.return_value = 4
+                self.assertEqual(tiles.tile_version('ifr'), 4)
+                data_source.refresh.assert_called_once_with(force=True)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_point_stamping_matches_pil(self):
+        """Test that batched point stamping draws exactly what per-point PIL drawing does"""
+        from PIL import Image, ImageDraw
+        import webgis.tiles as tiles
+        from webgis.tiles.projection import TileProjector
+
+        renderer = tiles.TileRenderer()
+        lat_min, lon_min = tiles.num2deg(180, 113, 8)
+        lat_max, lon_max = tiles.num2deg(181, 112, 8)
+        rng = np.random.default_rng(5)
+        # Points slightly outside the tile check clipping at the edges
+        lats = rng.uniform(lat_min - 0.01, lat_max + 0.01, 3000)
+        lons = rng.uniform(lon_min - 0.01, lon_max + 0.01, 3000)
+        bounds_projector = TileProjector.from_bounds(lat_min, lon_min, lat_max, lon_max)
+
+        for count, radius in [(40, 8), (3000, 4), (3000, 2)]:  # sparse and dense stamping
+            expected = Image.new('RGBA', (256, 256), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(expected)
+            for lat, lon in zip(lats[:count], lons[:count]):
+                px, py = (int(value) for value in bounds_projector.project(lon, lat))
+                draw.ellipse([px - radius, py - radius, px + radius, py + radius],
+                             fill=renderer.colors['cr'], outline=(255, 255, 255, 255))
+
+            pixels = np.zeros((256, 256, 4), dtype=np.uint8)
+            renderer._stamp_points(pixels, lats[:count], lons[:count], TileProjector(8, 180, 112),
+                                   renderer.colors['cr'], radius)
+            np.testing.assert_array_equal(pixels, np.asarray(expected))
+
+    def test_point_clustering(self):
+        """Test that clusters conserve counts and areas at every zoom"""
+        import random
+        from webgis.tiles.clustering import ClusterIndex
+
+        rng = random.Random(3)
+        records = []
+        for center_lon, center_lat in [(75.6, 21.8), (82.7, 18.8), (91.3, 23.8)]:
+            for _ in range(300):
+                records.append({
+                    'longitude': center_lon + rng.gauss(0, 0.05),
+                    'latitude': center_lat + rng.gauss(0, 0.05),
+                    'claim_type': rng.choice(['IFR', 'CR']),
+                    'area_hectares': 0.5
+                })
+
+        index = ClusterIndex(max_zoom=12).load(records)
+        self.assertEqual(len(index), 900)
+        for zoom in range(0, 14):
+            clusters = index.get_clusters(-180, -85, 180, 85, zoom)
+            self.assertEqual(sum(c['count'] for c in clusters), 900)
+            self.assertAlmostEqual(sum(c['area_hectares'] for c in clusters), 450.0)
+            self.assertEqual(sum(sum(c['claim_types'].values()) for c in clusters), 900)
+
+        state_scale = index.get_clusters(68, 6, 97, 37, 4)
+        self.assertEqual(len(state_scale), 3)
+        self.assertTrue(all(c['cluster'] and c['count'] == 300 for c in state_scale))
+        self.assertEqual(len(index.get_clusters(68, 6, 80, 37, 4)), 1)  # bbox filter
+
+        points = index.get_clusters(68, 6, 97, 37, 13)  # beyond max_zoom: individual points
+        self.assertEqual(len(points), 900)
+        self.assertFalse(points[0]['cluster'])
+        self.assertIn('claim_type', points[0]['properties'])
+
+    def test_clustered_tiles(self):
+        """Test that low-zoom tiles and MVTs are drawn from clusters"""
+        from webgis.tiles import TileRenderer, deg2num
+        from webgis.tiles.mvt import decode_tile, encode_tile
+
+        records = [{'id': i, 'longitude': 80.0 + i * 1e-4, 'latitude': 21.0, 'claim_type': 'IFR',
+                    'area_hectares': 1.0} for i in range(500)]
+        renderer = TileRenderer()
+        renderer.data_source = Mock()
+        renderer.data_source.records.return_value = records
+
+        x, y = deg2num(21.0, 80.0, 6)
+        tile = renderer.render_patta_holders_tile(6, x, y, 'ifr')
+        self.assertIsNotNone(tile.getbbox())
+
+        features = renderer.get_features_in_bounds('ifr', 20.0, 79.0, 22.0, 81.0, zoom=6)
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0]['properties']['count'], 500)
+        self.assertEqual(features[0]['properties']['count_IFR'], 500)
+        decoded = decode_tile(encode_tile({'ifr': features}, 6, x, y))
+        self.assertEqual(decoded['ifr']['features'][0]['properties']['area_hectares'], 500.0)
+
+        # The index is built once and reused until cleared
+        renderer.render_patta_holders_tile(7, *deg2num(21.0, 80.0, 7), 'ifr')
+        self.assertEqual(renderer.data_source.records.call_count, 1)
+        renderer.clear_clusters('ifr')
+        renderer.cluster_index('ifr')
+        self.assertEqual(renderer.data_source.records.call_count, 2)
+
+    def _tile_lonlat(self, z, x, y, fx, fy):
+        """Position at a fraction of a tile (0, 0 = north-west corner) as [lon, lat]"""
+        from webgis.tiles import num2deg
+
+        lat, lon = num2deg(x + fx, y + fy, z)
+        return [lon, lat]
+
+    def test_polygon_projection(self):
+        """Test that polygon vertices land on their Web-Mercator pixels and are clipped"""
+        from webgis.tiles import TileRenderer, deg2num
+        from webgis.tiles.projection import TileProjector, clip_ring
+
+        z = 6
+        x, y = deg2num(21.5, 80.5, z)
+        corner = lambda fx, fy: self._tile_lonlat(z, x, y, fx, fy)
+        quadrant = {'type': 'Polygon', 'coordinates': [[corner(0, 0), corner(0.5, 0), corner(0.5, 0.5),
+                                                        corner(0, 0.5), corner(0, 0)]]}
+        rings = TileProjector(z, x, y).project_polygons(quadrant, 4)
+        np.testing.assert_allclose(rings[0][0], [[0, 0], [128, 0], [128, 128], [0, 128]], atol=1e-6)
+
+        renderer = TileRenderer()
+        renderer.data_source = Mock()
+        renderer.data_source.query.return_value = [{'name': 'NW', 'geometry': quadrant}]
+        pixels = np.asarray(renderer.render_village_boundaries_tile(z, x, y))
+        self.assertEqual(tuple(pixels[64, 64]), renderer.colors['village'])
+        self.assertEqual(pixels[64, 192, 3], 0)
+        self.assertEqual(pixels[192, 64, 3], 0)
+
+        # Clipping keeps a ring within the buffered tile and preserves inside vertices
+        ring = np.array([[-100.0, 50.0], [50.0, -100.0], [400.0, 50.0], [50.0, 120.0]])
+        clipped = clip_ring(ring, -4, 260)
+        self.assertTrue(((clipped >= -4) & (clipped <= 260)).all())
+        self.assertIn([50.0, 120.0], clipped.tolist())
+        self.assertEqual(len(clip_ring(ring + 1000, -4, 260)), 0)
+
+    def test_polygon_tiles_golden(self):
+        """Test polygon tiles (holes, multipolygons, edge clipping) against golden images"""
+        from PIL import Image
+        from webgis.tiles import TileRenderer, deg2num
+
+        z = 10
+        x, y = deg2num(21.5, 80.5, z)
+        ring = lambda *points: [self._tile_lonlat(z, x, y, fx, fy) for fx, fy in points + points[:1]]
+        features = {
+            'villages': [{'name': 'Holed', 'geometry': {'type': 'Polygon', 'coordinates': [
+                ring((-0.2, 0.1), (0.6, 0.1), (0.6, 0.7), (-0.2, 0.7)),
+                ring((0.2, 0.3), (0.2, 0.5), (0.4, 0.5), (0.4, 0.3))
+            ]}}],
+            'assets': [{'land_use': 'water', 'geometry': {'type': 'MultiPolygon', 'coordinates': [
+                [ring((0.7, 0.6), (1.3, 0.8), (0.8, 1.2))],
+                [ring((0.1, 0.8), (0.3, 0.8), (0.3, 0.95), (0.1, 0.95))]
+            ]}}]
+        }
+        renderer = TileRenderer()
+        renderer.data_source = Mock()
+        renderer.data_source.query.side_effect = lambda layer, *bounds: features[layer]
+
+        golden_dir = os.path.join(os.path.dirname(__file__), 'golden')
+        for layer, tile in (('villages', renderer.render_village_boundaries_tile(z, x, y)),
+                            ('assets', renderer.render_asset_mapping_tile(z, x, y))):
+            path = os.path.join(golden_dir, f"{layer}_tile.png")
+            if os.getenv('UPDATE_GOLDEN'):
+                tile.save(path)
+            with Image.open(path) as golden:
+                np.testing.assert_array_equal(np.asarray(tile), np.asarray(golden.convert('RGBA')))
+
+    def test_tile_data_source_postgis(self):
+        """Test that PostGIS lookups use a bounding-box (&&) query"""
+        from webgis.tiles.spatial_index import TileDataSource
+
+        conn = MagicMock()
+        conn.execute.return_value.fetchall.return_value = []
+        db = MagicMock(is_postgis=True)
+        db.engine.connect.return_value.__enter__.return_value = conn
+
+        self.assertEqual(TileDataSource(db).query('cr', 20.0, 80.0, 21.0, 81.0), [])
+        sql, params = str(conn.execute.call_args[0][0]), conn.execute.call_args[0][1]
+        self.assertIn('geometry && ST_MakeEnvelope(:lon_min, :lat_min, :lon_max, :lat_max, 4326)', sql)
+        self.assertEqual(params['claim_type'], 'cr')
+
+    def test_tile_conditional_requests(self):
+        """Test tile ETags, 304 responses and version-stamped tile URLs"""
+        from flask import Flask
+        from webgis.tiles import tile_bp, invalidate_layer
+        from webgis.tiles.mbtiles import MBTilesStore
+
+        app = Flask(__name__)
+        app.register_blueprint(tile_bp)
+        client = app.test_client()
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with patch('webgis.tiles.tile_store', MBTilesStore(temp_dir)):
+                response = client.get('/api/tiles/ifr/5/22/14.png')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers['Cache-Control'], 'public, max-age=60')
+                etag = response.headers['ETag']
+
+                # Revalidation is answered without looking up or rendering the tile
+                with patch('webgis.tiles.get_tile_bytes', side_effect=AssertionError('rendered')):
+                    response = client.get('/api/tiles/ifr/5/22/14.png', headers={'If-None-Match': etag})
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(response.data, b'')
+                    self.assertEqual(response.headers['ETag'], etag)
+
+                gzipped = client.get('/api/tiles/ifr/5/22/14.mvt', headers={'Accept-Encoding': 'gzip'})
+                plain = client.get('/api/tiles/ifr/5/22/14.mvt')
+                self.assertNotEqual(gzipped.headers['ETag'], plain.headers['ETag'])
+                self.assertEqual(gzipped.headers['Content-Encoding'], 'gzip')
+                refused = client.get('/api/tiles/ifr/5/22/14.mvt', headers={'Accept-Encoding': 'gzip;q=0'})
+                self.assertNotIn('Content-Encoding', refused.headers)
+                self.assertEqual(refused.data, plain.data)
+                self.assertEqual(refused.headers['ETag'], plain.headers['ETag'])
+
+                response = client.get('/api/tiles/ifr/v1/5/22/14.png')
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('immutable', response.headers['Cache-Control'])
+
+                self.assertEqual(invalidate_layer('ifr'), 2)
+                response = client.get('/api/tiles/ifr/5/22/14.png', headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.headers['ETag'], etag)
+
+                response = client.get('/api/tiles/ifr/v1/5/22/14.mvt')
+                self.assertEqual(response.status_code, 302)
+                self.assertTrue(response.headers['Location'].endswith('/api/tiles/ifr/v2/5/22/14.mvt'))
+                self.assertEqual(client.get('/api/tiles/info').json['versions']['ifr'], 2)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_json_layer_cache(self):
+        """Test that static GIS layers are serialized once per version and revalidated"""
+        from flask import Flask
+        from webgis.http_cache import JsonLayerCache
+
+        layers = JsonLayerCache()
+        data = {'type': 'FeatureCollection', 'features': []}
+        builds = []
+
+        def build():
+            builds.append(1)
+            return data
+
+        app = Flask(__name__)
+        app.add_url_rule('/layer', 'layer', lambda: layers.response('villages', build))
+        client = app.test_client()
+
+        response = client.get('/layer')
+        self.assertEqual(response.json, data)
+        etag = response.headers['ETag']
+        self.assertEqual(client.get('/layer', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(len(builds), 1)
+
+        data['features'].append({'type': 'Feature', 'properties': {}, 'geometry': None})
+        self.assertEqual(client.get('/layer', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(layers.invalidate('villages'), 2)
+        response = client.get('/layer', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['features']), 1)
+        self.assertEqual(len(builds), 2)
+
 class TestModelRegistry(unittest.TestCase):
     """Test model registry functionality"""
     
@@ -440,7 +1760,21 @@ class TestWebGISIntegration(unittest.TestCase):
     
     def setUp(self):
         self.app = None
-    
+
+    def test_import_from_repo_root(self):
+        """Test that webgis.app imports as the WSGI entrypoint does (gunicorn webgis.app:app)"""
+        import subprocess
+        import importlib.util
+
+        for module in ('flask', 'flask_babel'):
+            if importlib.util.find_spec(module) is None:
+                self.skipTest(f"{module} not installed")
+
+        repo_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        result = subprocess.run([sys.executable, '-c', 'import webgis.app'], cwd=repo_root,
+                                capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+
     def test_app_creation(self):
         """Test Flask app creation"""
         from webgis.app import create_app
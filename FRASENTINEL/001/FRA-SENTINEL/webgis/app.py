@@ -5,6 +5,19 @@ import sys
 import uuid
 from datetime import datetime
 
+# Sibling modules are imported by name, also when loaded as webgis.app (gunicorn)
+WEBGIS_DIR = os.path.dirname(os.path.abspath(__file__))
+if WEBGIS_DIR not in sys.path:
+    sys.path.append(WEBGIS_DIR)
+
+from atlas_index import AtlasIndex
+from atlas_search import AtlasSearchIndex
+from dataset_registry import dataset_registry
+from progress_store import get_progress_store
+from export_streams import iter_csv, iter_geojson, scope_filter, streaming_response
+from http_cache import JsonLayerCache
+from boundary_service import BoundaryService
+
 app = Flask(__name__)
 app.secret_key = "supersecretfra2025"
 
@@ -49,6 +62,16 @@ except ImportError as e:
     PATTA_API_AVAILABLE = False
     print(f"⚠️ Patta API not available: {e}")
 
+# Patta OCR engine, configured once per worker and shared by all requests
+try:
+    from ocr_service import get_ocr_service
+    get_ocr_service()
+    OCR_SERVICE_AVAILABLE = True
+    print("✅ Patta OCR service initialized")
+except Exception as e:
+    OCR_SERVICE_AVAILABLE = False
+    print(f"⚠️ Patta OCR service not available: {e}")
+
 # Import Demo Data for Hackathon Presentation
 try:
     # from webgis.demo_data import (
@@ -206,6 +229,11 @@ FRA_ATLAS_DATA = {
     }
 }
 
+# Rollup index so drill-down endpoints never walk the full atlas tree
+ATLAS_INDEX = AtlasIndex(FRA_ATLAS_DATA)
+ATLAS_SEARCH_INDEX = AtlasSearchIndex(FRA_ATLAS_DATA)
+ATLAS_INDEX.listeners.append(ATLAS_SEARCH_INDEX)
+
 # Legacy data for backward compatibility
 TEST_VILLAGES = {
     "type": "FeatureCollection",
@@ -496,6 +524,12 @@ TEST_STATS = {
     "homestead": {"percentage": 14.4, "pixels": 1440}
 }
 
+# Serialized TEST_VILLAGES with ETags; invalidate a layer after editing its data
+geojson_layers = JsonLayerCache()
+
+# Zoom-simplified BOUNDARY_DATA; invalidate a layer after editing its data
+boundary_service = BoundaryService(BOUNDARY_DATA)
+
 # Dummy users DB for demo
 USERS = {
     "ccf.admin@fra.gov.in": {"password": "fra2025ccf", "role": "official"},
@@ -1307,8 +1341,8 @@ def api_extract_data():
         
         # Use real OCR service
         try:
-            from ocr_service import PattaOCRService
-            ocr_service = PattaOCRService(use_ai=False)  # Use regex-only for now
+            from ocr_service import get_ocr_service
+            ocr_service = get_ocr_service()  # Use regex-only for now
             
             # Extract data using real OCR
             extracted_data = ocr_service.extract_patta_data(file_path)
@@ -1712,12 +1746,12 @@ def api_claims():
 # ====== Dashboard API endpoints (to avoid 404s) ======
 @app.route("/api/fra_data")
 def api_fra_data():
-    return jsonify(TEST_VILLAGES)
+    return geojson_layers.response('villages', lambda: TEST_VILLAGES)
 
 @app.route("/api/villages")
 def api_villages():
     """Get villages data - alias for fra_data"""
-    return jsonify(TEST_VILLAGES)
+    return geojson_layers.response('villages', lambda: TEST_VILLAGES)
 
 @app.route("/api/health")
 def api_health():
@@ -1744,12 +1778,8 @@ def api_dss_recommendations():
     village_id = request.args.get('village_id', 'Khargone')
     
     # Load DSS rules
-    import json
-    import os
-    
     try:
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'dss_catalog.json'), 'r') as f:
-            dss_catalog = json.load(f)
+        dss_catalog = dataset_registry.load_json('data/dss_catalog.json')
     except FileNotFoundError:
         # Fallback to basic recommendations
         return jsonify({
@@ -1922,87 +1952,28 @@ def api_progress():
     scope = request.args.get('scope', 'state')  # state, district, block, village
     id_param = request.args.get('id', '')
     
-    # Load progress data
-    import csv
-    import os
-    
+    # Columnar store is rebuilt only when the progress CSV changes
     try:
-        progress_data = []
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'progress_demo.csv'), 'r') as f:
-            reader = csv.DictReader(f)
-            progress_data = list(reader)
+        store = get_progress_store('data/progress_demo.csv')
     except FileNotFoundError:
         return jsonify({"error": "Progress data not found"}), 404
     
-    # Filter data based on scope and id
-    filtered_data = progress_data
-    if scope == 'state' and id_param:
-        filtered_data = [row for row in progress_data if row['state'] == id_param]
-    elif scope == 'district' and id_param:
-        filtered_data = [row for row in progress_data if row['district'] == id_param]
-    elif scope == 'block' and id_param:
-        filtered_data = [row for row in progress_data if row['block'] == id_param]
-    elif scope == 'village' and id_param:
-        filtered_data = [row for row in progress_data if row['village'] == id_param]
-    
-    # Calculate aggregates
-    aggregates = {
-        "ifr_total": sum(int(row['ifr_total']) for row in filtered_data),
-        "ifr_granted": sum(int(row['ifr_granted']) for row in filtered_data),
-        "cr_total": sum(int(row['cr_total']) for row in filtered_data),
-        "cr_granted": sum(int(row['cr_granted']) for row in filtered_data),
-        "cfr_total": sum(int(row['cfr_total']) for row in filtered_data),
-        "cfr_granted": sum(int(row['cfr_granted']) for row in filtered_data)
-    }
-    
-    # Calculate rates
-    rates = {
-        "ifr_rate": round((aggregates['ifr_granted'] / aggregates['ifr_total'] * 100) if aggregates['ifr_total'] > 0 else 0, 1),
-        "cr_rate": round((aggregates['cr_granted'] / aggregates['cr_total'] * 100) if aggregates['cr_total'] > 0 else 0, 1),
-        "cfr_rate": round((aggregates['cfr_granted'] / aggregates['cfr_total'] * 100) if aggregates['cfr_total'] > 0 else 0, 1)
-    }
-    
-    # Get top pending villages
-    top_pending = []
-    for row in filtered_data:
-        ifr_pending = int(row['ifr_total']) - int(row['ifr_granted'])
-        cr_pending = int(row['cr_total']) - int(row['cr_granted'])
-        cfr_pending = int(row['cfr_total']) - int(row['cfr_granted'])
-        total_pending = ifr_pending + cr_pending + cfr_pending
-        
-        if total_pending > 0:
-            top_pending.append({
-                "village": row['village'],
-                "district": row['district'],
-                "state": row['state'],
-                "total_pending": total_pending,
-                "ifr_pending": ifr_pending,
-                "cr_pending": cr_pending,
-                "cfr_pending": cfr_pending
-            })
-    
-    # Sort by total pending
-    top_pending.sort(key=lambda x: x['total_pending'], reverse=True)
-    top_pending = top_pending[:10]  # Top 10
+    rollup = store.rollup(scope, id_param)
     
     return jsonify({
         "scope": scope,
         "id": id_param,
-        "aggregates": aggregates,
-        "rates": rates,
-        "top_pending_villages": top_pending,
-        "total_units": len(filtered_data)
+        "aggregates": rollup["aggregates"],
+        "rates": rollup["rates"],
+        "top_pending_villages": rollup["top_pending_villages"],
+        "total_units": rollup["total_units"]
     })
 
 @app.route("/api/metrics")
 def api_metrics():
     """Metrics ribbon API"""
-    import json
-    import os
-    
     try:
-        with open(os.path.join(os.path.dirname(__file__), 'config', 'demo_metrics.json'), 'r') as f:
-            metrics = json.load(f)
+        metrics = dataset_registry.load_json('config/demo_metrics.json')
     except FileNotFoundError:
         # Fallback metrics
         metrics = {
@@ -2017,53 +1988,48 @@ def api_metrics():
 @app.route("/api/export/atlas")
 def api_export_atlas():
     """Export Atlas data as CSV/GeoJSON"""
-    import csv
-    import json
-    from flask import make_response
-    from datetime import datetime
-    
     format_type = request.args.get('format', 'csv')
     scope = request.args.get('scope', 'all')
+    id_param = request.args.get('id', '')
+    use_gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    in_scope = scope_filter(scope, id_param)
+    date_stamp = datetime.now().strftime("%Y%m%d")
     
     if format_type == 'csv':
         # Export as CSV
-        output = []
         fieldnames = ['state', 'district', 'block', 'village', 'patta_holder', 'area_hectares', 'claim_status', 'tribal_group']
         
-        for feature in TEST_VILLAGES["features"]:
-            props = feature["properties"]
-            output.append({
-                'state': props.get('state', 'Madhya Pradesh'),
-                'district': props.get('district', ''),
-                'block': props.get('block', ''),
-                'village': props.get('village', ''),
-                'patta_holder': props.get('patta_holder', ''),
-                'area_hectares': props.get('area_hectares', 0),
-                'claim_status': props.get('claim_status', ''),
-                'tribal_group': props.get('tribal_group', '')
-            })
-        
-        # Create CSV response
-        response = make_response('')
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = f'attachment; filename=fra_atlas_{scope}_{datetime.now().strftime("%Y%m%d")}.csv'
-        
-        # Write CSV data
-        import io
-        output_buffer = io.StringIO()
-        writer = csv.DictWriter(output_buffer, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(output)
+        def atlas_rows():
+            for feature in TEST_VILLAGES["features"]:
+                props = feature["properties"]
+                row = {
+                    'state': props.get('state', 'Madhya Pradesh'),
+                    'district': props.get('district', ''),
+                    'block': props.get('block', ''),
+                    'village': props.get('village', ''),
+                    'patta_holder': props.get('patta_holder', ''),
+                    'area_hectares': props.get('area_hectares', 0),
+                    'claim_status': props.get('claim_status', ''),
+                    'tribal_group': props.get('tribal_group', '')
+                }
+                if in_scope(row):
+                    yield row
         
-        response.data = output_buffer.getvalue()
-        return response
+        return streaming_response(
+            iter_csv(atlas_rows(), fieldnames), 'text/csv',
+            f'fra_atlas_{scope}_{date_stamp}.csv', gzip=use_gzip
+        )
     
     elif format_type == 'geojson':
         # Export as GeoJSON
-        response = make_response(json.dumps(TEST_VILLAGES, indent=2))
-        response.headers['Content-Type'] = 'application/json'
-        response.headers['Content-Disposition'] = f'attachment; filename=fra_atlas_{scope}_{datetime.now().strftime("%Y%m%d")}.geojson'
-        return response
+        features = (
+            feature for feature in TEST_VILLAGES["features"]
+            if in_scope(dict(feature["properties"], state=feature["properties"].get('state', 'Madhya Pradesh')))
+        )
+        return streaming_response(
+            iter_geojson(TEST_VILLAGES, features), 'application/json',
+            f'fra_atlas_{scope}_{date_stamp}.geojson', gzip=use_gzip
+        )
     
     else:
         return jsonify({"error": "Invalid format. Use 'csv' or 'geojson'"}), 400
@@ -2071,47 +2037,28 @@ def api_export_atlas():
 @app.route("/api/export/progress")
 def api_export_progress():
     """Export Progress data as CSV"""
-    import csv
-    import os
-    from flask import make_response
-    from datetime import datetime
-    
     scope = request.args.get('scope', 'all')
+    id_param = request.args.get('id', '')
+    use_gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
     
     try:
-        progress_data = []
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'progress_demo.csv'), 'r') as f:
-            reader = csv.DictReader(f)
-            progress_data = list(reader)
+        dataset = dataset_registry.load_csv('data/progress_demo.csv')
     except FileNotFoundError:
         return jsonify({"error": "Progress data not found"}), 404
     
-    # Create CSV response
-    response = make_response('')
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename=fra_progress_{scope}_{datetime.now().strftime("%Y%m%d")}.csv'
+    in_scope = scope_filter(scope, id_param)
+    rows = (row for row in dataset.rows if in_scope(row))
     
-    # Write CSV data
-    import io
-    output_buffer = io.StringIO()
-    if progress_data:
-        fieldnames = progress_data[0].keys()
-        writer = csv.DictWriter(output_buffer, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(progress_data)
-    
-    response.data = output_buffer.getvalue()
-    return response
+    return streaming_response(
+        iter_csv(rows, dataset.fieldnames), 'text/csv',
+        f'fra_progress_{scope}_{datetime.now().strftime("%Y%m%d")}.csv', gzip=use_gzip
+    )
 
 @app.route("/api/dss/catalog")
 def api_dss_catalog():
     """Serve DSS catalog with scheme details"""
-    import json
-    import os
-    
     try:
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'dss_catalog.json'), 'r') as f:
-            catalog = json.load(f)
+        catalog = dataset_registry.load_json('data/dss_catalog.json')
     except FileNotFoundError:
         return jsonify({"error": "DSS catalog not found"}), 404
     
@@ -2120,12 +2067,8 @@ def api_dss_catalog():
 @app.route("/api/progress/schema")
 def api_progress_schema():
     """Serve progress monitoring schema"""
-    import json
-    import os
-    
     try:
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'progress_schema.json'), 'r') as f:
-            schema = json.load(f)
+        schema = dataset_registry.load_json('data/progress_schema.json')
     except FileNotFoundError:
         return jsonify({"error": "Progress schema not found"}), 404
     
@@ -2134,12 +2077,8 @@ def api_progress_schema():
 @app.route("/api/digitization/schema")
 def api_digitization_schema():
     """Serve digitization schema"""
-    import json
-    import os
-    
     try:
-        with open(os.path.join(os.path.dirname(__file__), 'docs', 'schema_digitization.json'), 'r') as f:
-            schema = json.load(f)
+        schema = dataset_registry.load_json('docs/schema_digitization.json')
     except FileNotFoundError:
         return jsonify({"error": "Digitization schema not found"}), 404
     
@@ -2148,12 +2087,8 @@ def api_digitization_schema():
 @app.route("/api/cfr/template")
 def api_cfr_template():
     """Serve CFR plan template"""
-    import json
-    import os
-    
     try:
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'cfr_plan_template.json'), 'r') as f:
-            template = json.load(f)
+        template = dataset_registry.load_json('data/cfr_plan_template.json')
     except FileNotFoundError:
         return jsonify({"error": "CFR template not found"}), 404
     
@@ -2162,15 +2097,8 @@ def api_cfr_template():
 @app.route("/api/mpr/snapshot")
 def api_mpr_snapshot():
     """Serve MPR snapshot data"""
-    import csv
-    import json
-    import os
-    
     try:
-        mpr_data = []
-        with open(os.path.join(os.path.dirname(__file__), 'data', 'mpr_snapshot.csv'), 'r') as f:
-            reader = csv.DictReader(f)
-            mpr_data = list(reader)
+        mpr_data = dataset_registry.load_csv('data/mpr_snapshot.csv').rows
     except FileNotFoundError:
         return jsonify({"error": "MPR snapshot not found"}), 404
     
@@ -2189,38 +2117,43 @@ def api_system_status():
         "status": "online",
         "villages_loaded": len(TEST_VILLAGES.get("features", [])),
         "stats_loaded": len(TEST_STATS.keys()),
+        "dataset_cache": dataset_registry.get_stats(),
         "timestamp": "2025-09-01T12:31:00"
     })
 
 # Boundary layer API endpoints
 @app.route("/api/boundaries/<layer_type>")
 def api_boundaries(layer_type):
-    """Get boundary data for states, districts, villages, or tribal areas"""
-    if layer_type in BOUNDARY_DATA:
-        return jsonify(BOUNDARY_DATA[layer_type])
-    return jsonify({"error": "Invalid layer type"}), 404
+    """Get boundary data for states, districts, villages, or tribal areas
+
+    ``zoom`` selects a simplified resolution (full resolution without it)
+    and ``bbox=lon_min,lat_min,lon_max,lat_max`` keeps intersecting features.
+    """
+    if layer_type not in boundary_service:
+        return jsonify({"error": "Invalid layer type"}), 404
+
+    bbox = None
+    if request.args.get("bbox"):
+        try:
+            bbox = [float(value) for value in request.args["bbox"].split(",")]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4:
+            return jsonify({"error": "bbox must be lon_min,lat_min,lon_max,lat_max"}), 400
+
+    return boundary_service.response(layer_type, request.args.get("zoom", type=int), bbox)
 
 # FRA Atlas Drill-down API endpoints
 @app.route("/api/fra-atlas/states")
 def api_fra_states():
     """Get all states with summary statistics"""
     states_data = []
-    for state_name, state_data in FRA_ATLAS_DATA["states"].items():
-        total_pattas = 0
-        total_area = 0
-        districts_count = len(state_data["districts"])
-        
-        for district_name, district_data in state_data["districts"].items():
-            for block_name, block_data in district_data["blocks"].items():
-                for village_name, village_data in block_data["villages"].items():
-                    total_pattas += len(village_data["patta_holders"])
-                    total_area += sum(patta["area_hectares"] for patta in village_data["patta_holders"])
-        
+    for state_name, state_agg in ATLAS_INDEX.get_children(()):
         states_data.append({
             "name": state_name,
-            "districts_count": districts_count,
-            "total_pattas": total_pattas,
-            "total_area_hectares": total_area,
+            "districts_count": ATLAS_INDEX.child_count((state_name,)),
+            "total_pattas": state_agg.patta_count,
+            "total_area_hectares": state_agg.area_hectares,
             "avg_forest_cover": 70.2  # Mock data
         })
     
@@ -2229,25 +2162,16 @@ def api_fra_states():
 @app.route("/api/fra-atlas/states/<state_name>/districts")
 def api_fra_districts(state_name):
     """Get districts for a specific state"""
-    if state_name not in FRA_ATLAS_DATA["states"]:
+    if ATLAS_INDEX.get((state_name,)) is None:
         return jsonify({"error": "State not found"}), 404
     
     districts_data = []
-    for district_name, district_data in FRA_ATLAS_DATA["states"][state_name]["districts"].items():
-        total_pattas = 0
-        total_area = 0
-        blocks_count = len(district_data["blocks"])
-        
-        for block_name, block_data in district_data["blocks"].items():
-            for village_name, village_data in block_data["villages"].items():
-                total_pattas += len(village_data["patta_holders"])
-                total_area += sum(patta["area_hectares"] for patta in village_data["patta_holders"])
-        
+    for district_name, district_agg in ATLAS_INDEX.get_children((state_name,)):
         districts_data.append({
             "name": district_name,
-            "blocks_count": blocks_count,
-            "total_pattas": total_pattas,
-            "total_area_hectares": total_area
+            "blocks_count": ATLAS_INDEX.child_count((state_name, district_name)),
+            "total_pattas": district_agg.patta_count,
+            "total_area_hectares": district_agg.area_hectares
         })
     
     return jsonify({"districts": districts_data})
@@ -2255,26 +2179,18 @@ def api_fra_districts(state_name):
 @app.route("/api/fra-atlas/states/<state_name>/districts/<district_name>/blocks")
 def api_fra_blocks(state_name, district_name):
     """Get blocks for a specific district"""
-    if state_name not in FRA_ATLAS_DATA["states"]:
+    if ATLAS_INDEX.get((state_name,)) is None:
         return jsonify({"error": "State not found"}), 404
-    if district_name not in FRA_ATLAS_DATA["states"][state_name]["districts"]:
+    if ATLAS_INDEX.get((state_name, district_name)) is None:
         return jsonify({"error": "District not found"}), 404
     
     blocks_data = []
-    for block_name, block_data in FRA_ATLAS_DATA["states"][state_name]["districts"][district_name]["blocks"].items():
-        total_pattas = 0
-        total_area = 0
-        villages_count = len(block_data["villages"])
-        
-        for village_name, village_data in block_data["villages"].items():
-            total_pattas += len(village_data["patta_holders"])
-            total_area += sum(patta["area_hectares"] for patta in village_data["patta_holders"])
-        
+    for block_name, block_agg in ATLAS_INDEX.get_children((state_name, district_name)):
         blocks_data.append({
             "name": block_name,
-            "villages_count": villages_count,
-            "total_pattas": total_pattas,
-            "total_area_hectares": total_area
+            "villages_count": ATLAS_INDEX.child_count((state_name, district_name, block_name)),
+            "total_pattas": block_agg.patta_count,
+            "total_area_hectares": block_agg.area_hectares
         })
     
     return jsonify({"blocks": blocks_data})
@@ -2290,11 +2206,13 @@ def api_fra_villages(state_name, district_name, block_name):
         return jsonify({"error": "Block not found"}), 404
     
     villages_data = []
+    block_path = (state_name, district_name, block_name)
     for village_name, village_data in FRA_ATLAS_DATA["states"][state_name]["districts"][district_name]["blocks"][block_name]["villages"].items():
+        village_agg = ATLAS_INDEX.get(block_path + (village_name,))
         villages_data.append({
             "name": village_name,
-            "patta_holders_count": len(village_data["patta_holders"]),
-            "total_area_hectares": sum(patta["area_hectares"] for patta in village_data["patta_holders"]),
+            "patta_holders_count": village_agg.patta_count,
+            "total_area_hectares": village_agg.area_hectares,
             "forest_cover_percent": village_data["forest_cover"],
             "water_bodies_count": village_data["water_bodies"],
             "agricultural_land_percent": village_data["agricultural_land"],
@@ -2332,62 +2250,22 @@ def api_fra_patta_holders(state_name, district_name, block_name, village_name):
 def api_fra_search():
     """Search FRA data by various criteria"""
     query = request.args.get('q', '')
-    filter_type = request.args.get('type', 'all')  # all, patta_holder, village, tribal_group
+    filter_type = request.args.get('type', 'all')  # all, patta_holder, village, tribal_group, IFR, CR, CFR
     status_filter = request.args.get('status', 'all')  # all, pending, verified, approved
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(200, max(1, request.args.get('per_page', 50, type=int)))
     
-    results = []
-    
-    for state_name, state_data in FRA_ATLAS_DATA["states"].items():
-        for district_name, district_data in state_data["districts"].items():
-            for block_name, block_data in district_data["blocks"].items():
-                for village_name, village_data in block_data["villages"].items():
-                    for patta in village_data["patta_holders"]:
-                        # Apply filters
-                        if status_filter != 'all' and patta["status"].lower() != status_filter.lower():
-                            continue
-                        
-                        # Apply search query
-                        if query.lower() in patta["name"].lower() or \
-                           query.lower() in village_name.lower() or \
-                           query.lower() in patta["tribal_group"].lower():
-                            
-                            results.append({
-                                "patta_id": patta["id"],
-                                "patta_holder": patta["name"],
-                                "village": village_name,
-                                "block": block_name,
-                                "district": district_name,
-                                "state": state_name,
-                                "tribal_group": patta["tribal_group"],
-                                "claim_type": patta["claim_type"],
-                                "area_hectares": patta["area_hectares"],
-                                "status": patta["status"],
-                                "coordinates": patta["coordinates"]
-                            })
-    
-    return jsonify({"results": results, "total": len(results)})
+    return jsonify(ATLAS_SEARCH_INDEX.search(query, filter_type, status_filter, page, per_page))
 
 @app.route('/api/admin/real_stats')
 def admin_real_stats():
     """Get real admin statistics"""
-    # Count actual data from FRA_ATLAS_DATA
-    total_claims = 0
-    approved_claims = 0
-    pending_claims = 0
-    rejected_claims = 0
-    
-    for state_data in FRA_ATLAS_DATA["states"].values():
-        for district_data in state_data["districts"].values():
-            for block_data in district_data["blocks"].values():
-                for village_data in block_data["villages"].values():
-                    for patta_holder in village_data["patta_holders"]:
-                        total_claims += 1
-                        if patta_holder["status"] == "Approved":
-                            approved_claims += 1
-                        elif patta_holder["status"] == "Pending":
-                            pending_claims += 1
-                        else:
-                            rejected_claims += 1
+    # Count actual data from the atlas rollup index
+    totals = ATLAS_INDEX.get(())
+    total_claims = totals.patta_count
+    approved_claims = totals.status_counts.get("Approved", 0)
+    pending_claims = totals.status_counts.get("Pending", 0)
+    rejected_claims = total_claims - approved_claims - pending_claims
     
     return jsonify({
         "total_claims": total_claims,
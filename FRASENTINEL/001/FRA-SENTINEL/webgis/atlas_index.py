@@ -0,0 +1,190 @@
+"""
+FRA Atlas Aggregate Index
+Precomputed per-level rollups for the state -> district -> block -> village tree
+Built once at load time and updated incrementally as patta holders change
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Tree levels below the root, in drill-down order
+LEVELS = ("states", "districts", "blocks", "villages")
+
+Path = Tuple[str, ...]
+
+@dataclass
+class AtlasAggregate:
+    """Rollup for one node of the atlas tree"""
+    patta_count: int = 0
+    area_hectares: float = 0.0
+    status_counts: Dict[str, int] = field(default_factory=dict)
+
+    def apply(self, area: float, status: str, sign: int = 1):
+        """Add (sign=1) or remove (sign=-1) one patta holder"""
+        self.patta_count += sign
+        self.area_hectares += sign * area
+        count = self.status_counts.get(status, 0) + sign
+        if count:
+            self.status_counts[status] = count
+        else:
+            self.status_counts.pop(status, None)
+
+class AtlasIndex:
+    """Aggregate index over FRA_ATLAS_DATA keyed by path tuples
+
+    The root is ``()``, a state is ``(state,)``, a district
+    ``(state, district)`` and so on down to villages. Every drill-down
+    level is answered from ``children`` and ``aggregates`` without
+    walking the patta holder lists.
+
+    Objects in ``listeners`` (e.g. the atlas search index) are notified
+    through ``add_holder``/``update_holder``/``remove_holder`` whenever a
+    patta holder changes.
+    """
+
+    def __init__(self, atlas_data: Dict):
+        self.atlas_data = atlas_data
+        self.aggregates: Dict[Path, AtlasAggregate] = {}
+        self.children: Dict[Path, List[str]] = {}
+        self.holder_paths: Dict[str, Path] = {}
+        self.listeners: List = []
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the whole index from the atlas tree"""
+        with self._lock:
+            self.aggregates = {(): AtlasAggregate()}
+            self.children = {(): []}
+            self.holder_paths = {}
+
+            for state_name, state_data in self.atlas_data["states"].items():
+                for district_name, district_data in state_data["districts"].items():
+                    for block_name, block_data in district_data["blocks"].items():
+                        for village_name, village_data in block_data["villages"].items():
+                            path = (state_name, district_name, block_name, village_name)
+                            self._ensure_path(path)
+                            for holder in village_data["patta_holders"]:
+                                self._apply_holder(path, holder, 1)
+                        self._ensure_path((state_name, district_name, block_name))
+                    self._ensure_path((state_name, district_name))
+                self._ensure_path((state_name,))
+
+    def get(self, path: Path) -> Optional[AtlasAggregate]:
+        """Get the aggregate for a path, or None if it does not exist"""
+        return self.aggregates.get(tuple(path))
+
+    def get_children(self, path: Path) -> List[Tuple[str, AtlasAggregate]]:
+        """Get (name, aggregate) pairs for the direct children of a path"""
+        path = tuple(path)
+        return [
+            (name, self.aggregates[path + (name,)])
+            for name in self.children.get(path, [])
+        ]
+
+    def child_count(self, path: Path) -> int:
+        """Number of direct children of a path"""
+        return len(self.children.get(tuple(path), []))
+
+    def add_patta_holder(self, state: str, district: str, block: str,
+                         village: str, holder: Dict) -> Dict:
+        """Add a patta holder to the atlas tree and the index
+
+        Missing states, districts, blocks and villages are created.
+        """
+        path = (state, district, block, village)
+        with self._lock:
+            if holder["id"] in self.holder_paths:
+                raise ValueError(f"Patta holder {holder['id']} already exists")
+
+            node = self.atlas_data
+            for level, name in zip(LEVELS, path):
+                children = node.setdefault(level, {})
+                if name not in children:
+                    children[name] = self._new_node(level, holder)
+                node = children[name]
+
+            node["patta_holders"].append(holder)
+            self._ensure_path(path)
+            self._apply_holder(path, holder, 1)
+            for listener in self.listeners:
+                listener.add_holder(path, holder)
+        return holder
+
+    def update_patta_holder(self, holder_id: str, changes: Dict) -> Optional[Dict]:
+        """Apply field changes to an existing patta holder
+
+        Returns the updated holder, or None if the id is unknown.
+        """
+        with self._lock:
+            path = self.holder_paths.get(holder_id)
+            if path is None:
+                return None
+
+            holder = self._find_holder(path, holder_id)
+            self._apply_holder(path, holder, -1)
+            holder.update(changes)
+            self._apply_holder(path, holder, 1)
+            for listener in self.listeners:
+                listener.update_holder(path, holder)
+        return holder
+
+    def remove_patta_holder(self, holder_id: str) -> Optional[Dict]:
+        """Remove a patta holder from the atlas tree and the index"""
+        with self._lock:
+            path = self.holder_paths.get(holder_id)
+            if path is None:
+                return None
+
+            holder = self._find_holder(path, holder_id)
+            self._apply_holder(path, holder, -1)
+            self._village(path)["patta_holders"].remove(holder)
+            for listener in self.listeners:
+                listener.remove_holder(holder_id)
+        return holder
+
+    def _village(self, path: Path) -> Dict:
+        state, district, block, village = path
+        return (self.atlas_data["states"][state]["districts"][district]
+                ["blocks"][block]["villages"][village])
+
+    def _find_holder(self, path: Path, holder_id: str) -> Dict:
+        for holder in self._village(path)["patta_holders"]:
+            if holder["id"] == holder_id:
+                return holder
+        raise KeyError(holder_id)
+
+    def _ensure_path(self, path: Path):
+        """Register every prefix of a path as an indexed node"""
+        for depth in range(1, len(path) + 1):
+            prefix = path[:depth]
+            if prefix not in self.aggregates:
+                self.aggregates[prefix] = AtlasAggregate()
+                self.children[prefix] = []
+                self.children[prefix[:-1]].append(prefix[-1])
+
+    def _apply_holder(self, path: Path, holder: Dict, sign: int):
+        """Propagate one holder to the village and all of its ancestors"""
+        area = holder.get("area_hectares", 0) or 0
+        status = holder.get("status", "")
+        for depth in range(len(path) + 1):
+            self.aggregates[path[:depth]].apply(area, status, sign)
+
+        if sign > 0:
+            self.holder_paths[holder["id"]] = path
+        else:
+            self.holder_paths.pop(holder["id"], None)
+
+    @staticmethod
+    def _new_node(level: str, holder: Dict) -> Dict:
+        if level == "villages":
+            return {
+                "patta_holders": [],
+                "forest_cover": 0.0,
+                "water_bodies": 0,
+                "agricultural_land": 0.0,
+                "coordinates": holder.get("coordinates", [0.0, 0.0])
+            }
+        child_level = LEVELS[LEVELS.index(level) + 1]
+        return {child_level: {}}
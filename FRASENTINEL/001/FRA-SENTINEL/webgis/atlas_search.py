@@ -0,0 +1,230 @@
+"""
+FRA Atlas Search Index
+In-process n-gram inverted index over patta holders for /api/fra-atlas/search
+Handles Latin, Devanagari and Tamil text via Unicode normalization
+"""
+
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Longest n-gram stored in the postings; shorter queries use their own length
+GRAM_SIZE = 3
+
+# Searchable fields and their ranking weight
+SEARCH_FIELDS = {
+    "patta_holder": 3,
+    "village": 2,
+    "tribal_group": 1
+}
+
+CLAIM_TYPES = ("ifr", "cr", "cfr")
+
+# Zero-width joiners are optional in Indic input and must not break matches
+_IGNORED_CHARS = dict.fromkeys(map(ord, "\u200b\u200c\u200d\ufeff"))
+
+def normalize_text(text: str) -> str:
+    """Normalize text for matching: NFKC, casefold, drop joiners, squash spaces"""
+    text = unicodedata.normalize("NFKC", text or "").translate(_IGNORED_CHARS)
+    return " ".join(text.casefold().split())
+
+def text_grams(text: str) -> Set[str]:
+    """All substrings of length 1..GRAM_SIZE"""
+    grams = set()
+    for n in range(1, GRAM_SIZE + 1):
+        for i in range(len(text) - n + 1):
+            grams.add(text[i:i + n])
+    return grams
+
+def query_grams(query: str) -> Set[str]:
+    """Grams that every field containing ``query`` must also contain"""
+    n = min(GRAM_SIZE, len(query))
+    return {query[i:i + n] for i in range(len(query) - n + 1)}
+
+class AtlasSearchIndex:
+    """Inverted index over the patta holders of FRA_ATLAS_DATA
+
+    Each holder gets an integer document id in atlas order. Postings map
+    n-grams to document ids per field, and status / claim type buckets
+    are kept as sets so filters are set intersections rather than scans.
+    """
+
+    def __init__(self, atlas_data: Optional[Dict] = None):
+        self.docs: List[Optional[Dict]] = []
+        self.fields: List[Optional[Dict[str, str]]] = []
+        self.postings: Dict[str, Dict[str, Set[int]]] = {name: {} for name in SEARCH_FIELDS}
+        self.status_buckets: Dict[str, Set[int]] = {}
+        self.claim_type_buckets: Dict[str, Set[int]] = {}
+        self.doc_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if atlas_data is not None:
+            self.rebuild(atlas_data)
+
+    def rebuild(self, atlas_data: Dict):
+        """Rebuild the index from an atlas tree"""
+        with self._lock:
+            self.docs = []
+            self.fields = []
+            self.postings = {name: {} for name in SEARCH_FIELDS}
+            self.status_buckets = {}
+            self.claim_type_buckets = {}
+            self.doc_ids = {}
+
+            for state_name, state_data in atlas_data["states"].items():
+                for district_name, district_data in state_data["districts"].items():
+                    for block_name, block_data in district_data["blocks"].items():
+                        for village_name, village_data in block_data["villages"].items():
+                            path = (state_name, district_name, block_name, village_name)
+                            for holder in village_data["patta_holders"]:
+                                self._add(path, holder)
+
+    def add_holder(self, path: Tuple[str, str, str, str], holder: Dict):
+        """Index a new patta holder at (state, district, block, village)"""
+        with self._lock:
+            self._add(path, holder)
+
+    def update_holder(self, path: Tuple[str, str, str, str], holder: Dict):
+        """Re-index a patta holder after its fields changed"""
+        with self._lock:
+            self._remove(holder["id"])
+            self._add(path, holder)
+
+    def remove_holder(self, holder_id: str):
+        """Drop a patta holder from the index"""
+        with self._lock:
+            self._remove(holder_id)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def search(self, query: str = "", filter_type: str = "all", status_filter: str = "all",
+               page: int = 1, per_page: int = 50) -> Dict:
+        """Ranked, paginated search
+
+        ``filter_type`` is either a field name (``patta_holder``, ``village``,
+        ``tribal_group``) restricting where the query matches, or a claim
+        type (``IFR``, ``CR``, ``CFR``) restricting which holders match.
+        """
+        query = normalize_text(query)
+        filter_type = (filter_type or "all").lower()
+        status_filter = (status_filter or "all").lower()
+        fields = [filter_type] if filter_type in SEARCH_FIELDS else list(SEARCH_FIELDS)
+
+        with self._lock:
+            allowed = self._filter_ids(filter_type, status_filter)
+            if query:
+                scored = self._match(query, fields, allowed)
+                scored.sort()
+                ordered = [doc_id for _, doc_id in scored]
+            else:
+                ordered = sorted(allowed) if allowed is not None else sorted(self.doc_ids.values())
+
+            start = (page - 1) * per_page
+            results = [dict(self.docs[doc_id]) for doc_id in ordered[start:start + per_page]]
+
+        return {
+            "results": results,
+            "total": len(ordered),
+            "page": page,
+            "per_page": per_page,
+            "has_more": start + per_page < len(ordered)
+        }
+
+    def _filter_ids(self, filter_type: str, status_filter: str) -> Optional[Set[int]]:
+        """Intersect the pre-bucketed filters; None means no filter applies"""
+        allowed = None
+        if status_filter != "all":
+            allowed = self.status_buckets.get(status_filter, set())
+        if filter_type in CLAIM_TYPES:
+            bucket = self.claim_type_buckets.get(filter_type, set())
+            allowed = bucket if allowed is None else allowed & bucket
+        return allowed
+
+    def _match(self, query: str, fields: List[str],
+               allowed: Optional[Set[int]]) -> List[Tuple[int, int]]:
+        """Return (negated score, doc id) pairs for documents matching ``query``"""
+        grams = query_grams(query)
+        scores: Dict[int, int] = {}
+
+        for field in fields:
+            postings = self.postings[field]
+            sets = [postings.get(gram) for gram in grams]
+            if not all(sets):
+                continue
+            sets.sort(key=len)
+            candidates = set(sets[0])
+            for other in sets[1:]:
+                candidates &= other
+            if allowed is not None:
+                candidates &= allowed
+
+            weight = SEARCH_FIELDS[field]
+            for doc_id in candidates:
+                text = self.fields[doc_id][field]
+                if query not in text:
+                    continue
+                if text == query:
+                    score = 3 * weight
+                elif text.startswith(query) or (" " + query) in text:
+                    score = 2 * weight
+                else:
+                    score = weight
+                if score > scores.get(doc_id, 0):
+                    scores[doc_id] = score
+
+        return [(-score, doc_id) for doc_id, score in scores.items()]
+
+    def _add(self, path: Tuple[str, str, str, str], holder: Dict):
+        state_name, district_name, block_name, village_name = path
+        doc_id = len(self.docs)
+        doc = {
+            "patta_id": holder["id"],
+            "patta_holder": holder["name"],
+            "village": village_name,
+            "block": block_name,
+            "district": district_name,
+            "state": state_name,
+            "tribal_group": holder.get("tribal_group", ""),
+            "claim_type": holder.get("claim_type", ""),
+            "area_hectares": holder.get("area_hectares", 0),
+            "status": holder.get("status", ""),
+            "coordinates": holder.get("coordinates")
+        }
+        fields = {name: normalize_text(doc[name]) for name in SEARCH_FIELDS}
+
+        self.docs.append(doc)
+        self.fields.append(fields)
+        self.doc_ids[holder["id"]] = doc_id
+
+        for name, text in fields.items():
+            self._post(self.postings[name], text_grams(text), doc_id)
+        self.status_buckets.setdefault(doc["status"].lower(), set()).add(doc_id)
+        self.claim_type_buckets.setdefault(doc["claim_type"].lower(), set()).add(doc_id)
+
+    def _remove(self, holder_id: str):
+        doc_id = self.doc_ids.pop(holder_id, None)
+        if doc_id is None:
+            return
+
+        doc, fields = self.docs[doc_id], self.fields[doc_id]
+        for name, text in fields.items():
+            postings = self.postings[name]
+            for gram in text_grams(text):
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del postings[gram]
+        self.status_buckets.get(doc["status"].lower(), set()).discard(doc_id)
+        self.claim_type_buckets.get(doc["claim_type"].lower(), set()).discard(doc_id)
+        self.docs[doc_id] = None
+        self.fields[doc_id] = None
+
+    @staticmethod
+    def _post(postings: Dict[str, Set[int]], grams: Iterable[str], doc_id: int):
+        for gram in grams:
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {doc_id}
+            else:
+                ids.add(doc_id)
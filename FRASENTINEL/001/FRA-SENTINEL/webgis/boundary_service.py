@@ -0,0 +1,333 @@
+"""
+Boundary Service for FRA-SENTINEL
+Zoom-banded, simplified and quantized boundary layers for /api/boundaries
+Shared borders are simplified once, so neighbouring polygons stay gap-free
+"""
+
+import gzip
+import json
+import math
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from flask import Response, request
+
+from http_cache import REVALIDATE, conditional_response, make_etag
+from tiles.projection import simplify_line
+
+# Highest zoom of each band; deeper zooms get the full-resolution band
+BOUNDARY_ZOOM_BANDS = (4, 7, 10, 13)
+
+# Simplification tolerance, in screen pixels at a band's highest zoom
+SIMPLIFY_PIXELS = 1.0
+
+# Coordinates are rounded to a grid this many times finer than a pixel
+QUANTIZE_SUBPIXELS = 4
+FULL_RESOLUTION_DECIMALS = 6
+
+# Halvings of the tolerance tried on a polygon that collapses when simplified
+OUTLINE_ATTEMPTS = 6
+
+# Bodies smaller than this are not worth gzipping (matches nginx gzip_min_length)
+GZIP_MIN_BYTES = 1024
+
+Point = Tuple[float, float]
+
+def zoom_band(zoom: Optional[int]) -> int:
+    """Band index for a zoom level; no zoom means full resolution"""
+    if zoom is None:
+        return len(BOUNDARY_ZOOM_BANDS)
+    for band, max_zoom in enumerate(BOUNDARY_ZOOM_BANDS):
+        if zoom <= max_zoom:
+            return band
+    return len(BOUNDARY_ZOOM_BANDS)
+
+def _pixel_degrees(band: int) -> float:
+    return 360.0 / (256 * 2 ** BOUNDARY_ZOOM_BANDS[band])
+
+def band_tolerance(band: int) -> float:
+    """Douglas-Peucker tolerance of a band in degrees (0 for full resolution)"""
+    if band >= len(BOUNDARY_ZOOM_BANDS):
+        return 0.0
+    return SIMPLIFY_PIXELS * _pixel_degrees(band)
+
+def band_decimals(band: int) -> int:
+    """Decimal places coordinates are rounded to in a band"""
+    if band >= len(BOUNDARY_ZOOM_BANDS):
+        return FULL_RESOLUTION_DECIMALS
+    grid = _pixel_degrees(band) / QUANTIZE_SUBPIXELS
+    return min(FULL_RESOLUTION_DECIMALS, max(0, math.ceil(-math.log10(grid))))
+
+def _polygons(geometry: Dict) -> Optional[List]:
+    """Polygon coordinate lists of a (Multi)Polygon; None for other geometries"""
+    if not geometry:
+        return None
+    if geometry.get('type') == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry.get('type') == 'MultiPolygon':
+        return geometry['coordinates']
+    return None
+
+def _bbox(coordinates) -> Tuple[float, float, float, float]:
+    """lon_min, lat_min, lon_max, lat_max of nested coordinate lists"""
+    stack, lons, lats = [coordinates], [], []
+    while stack:
+        item = stack.pop()
+        if item and isinstance(item[0], (int, float)):
+            lons.append(item[0])
+            lats.append(item[1])
+        else:
+            stack.extend(item)
+    if not lons:
+        return (0.0, 0.0, 0.0, 0.0)
+    return (min(lons), min(lats), max(lons), max(lats))
+
+class ArcTopology:
+    """Polygon rings of a layer cut into arcs where neighbouring rings meet
+
+    A vertex is a junction when its neighbours differ between the rings it
+    appears in. Cutting every ring at its junctions turns a border shared by
+    two polygons into one arc, stored once, so it is simplified and
+    quantized identically for both and no gaps or slivers open up.
+    """
+
+    def __init__(self, rings: Sequence[Sequence[Point]]):
+        self.arcs: List[List[Point]] = []
+        self._arc_ids: Dict[Tuple[Point, ...], int] = {}
+        # Per ring: (arc id, reversed) in drawing order
+        self.rings: List[List[Tuple[int, bool]]] = []
+
+        rings = [self._open(ring) for ring in rings]
+        junctions = self._junctions(rings)
+        for ring in rings:
+            self.rings.append([self._arc(arc) for arc in self._cut(ring, junctions)])
+
+    @staticmethod
+    def _open(ring: Sequence[Sequence[float]]) -> List[Point]:
+        points = [(float(point[0]), float(point[1])) for point in ring]
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        return points
+
+    @staticmethod
+    def _junctions(rings: List[List[Point]]) -> set:
+        neighbours: Dict[Point, frozenset] = {}
+        junctions = set()
+        for ring in rings:
+            count = len(ring)
+            for i, point in enumerate(ring):
+                pair = frozenset((ring[i - 1], ring[(i + 1) % count]))
+                seen = neighbours.setdefault(point, pair)
+                if seen != pair:
+                    junctions.add(point)
+        return junctions
+
+    @staticmethod
+    def _cut(ring: List[Point], junctions: set) -> List[List[Point]]:
+        cuts = [i for i, point in enumerate(ring) if point in junctions]
+        if not cuts:
+            return [ring + ring[:1]]
+
+        start = cuts[0]
+        rotated = ring[start:] + ring[:start] + [ring[start]]
+        cuts = [i - start for i in cuts] + [len(ring)]
+        return [rotated[a:b + 1] for a, b in zip(cuts, cuts[1:])]
+
+    def _arc(self, arc: List[Point]) -> Tuple[int, bool]:
+        forward, backward = tuple(arc), tuple(reversed(arc))
+        key, is_reversed = (forward, False) if forward <= backward else (backward, True)
+        arc_id = self._arc_ids.get(key)
+        if arc_id is None:
+            arc_id = self._arc_ids[key] = len(self.arcs)
+            self.arcs.append(list(key))
+        return arc_id, is_reversed
+
+    def simplified_arcs(self, tolerance: float, decimals: int) -> List[List[Point]]:
+        """Every arc simplified with fixed end points, then rounded"""
+        simplified = []
+        for arc in self.arcs:
+            points = []
+            for lon, lat in simplify_line(arc, tolerance):
+                point = (round(lon, decimals), round(lat, decimals))
+                if not points or points[-1] != point:
+                    points.append(point)
+            simplified.append(points)
+        return simplified
+
+    def ring(self, index: int, arcs: List[List[Point]]) -> List[List[float]]:
+        """Closed ring ``index`` rebuilt from (simplified) arcs"""
+        points: List[Point] = []
+        for arc_id, is_reversed in self.rings[index]:
+            arc = arcs[arc_id][::-1] if is_reversed else arcs[arc_id]
+            points.extend(arc[1:] if points and points[-1] == arc[0] else arc)
+        if points and points[0] != points[-1]:
+            points.append(points[0])
+        return [list(point) for point in points]
+
+class _Band(NamedTuple):
+    fragments: List[bytes]
+    body: bytes
+    gzipped: Optional[bytes]
+    etag: str
+
+class _Layer:
+    """A boundary layer's topology and its per-band serialized features"""
+
+    def __init__(self, collection: Dict):
+        self.features = collection.get('features', [])
+        head = {key: value for key, value in collection.items() if key != 'features'}
+        head.setdefault('type', 'FeatureCollection')
+        self.prefix = (json.dumps(head, separators=(',', ':'))[:-1] + ',"features":[').encode('utf-8')
+
+        rings = []
+        # Per feature: per polygon, the indices of its rings in ``rings``
+        self.feature_rings: List[Optional[List[List[int]]]] = []
+        for feature in self.features:
+            polygons = _polygons(feature.get('geometry'))
+            if polygons is None:
+                self.feature_rings.append(None)
+                continue
+            layout = []
+            for polygon in polygons:
+                layout.append(list(range(len(rings), len(rings) + len(polygon))))
+                rings.extend(polygon)
+            self.feature_rings.append(layout)
+
+        self.bboxes = [_bbox((feature.get('geometry') or {}).get('coordinates') or [])
+                       for feature in self.features]
+        self.topology = ArcTopology(rings)
+        self.raw_rings = rings
+        self.bands: Dict[int, _Band] = {}
+
+    def geometry(self, index: int, arcs: List[List[Point]], tolerance: float, decimals: int) -> Optional[Dict]:
+        geometry = self.features[index].get('geometry')
+        layout = self.feature_rings[index]
+        if layout is None:
+            return geometry
+
+        polygons = []
+        for ring_ids in layout:
+            exterior = self._valid_ring(self.topology.ring(ring_ids[0], arcs))
+            if exterior is None:
+                exterior = self._outline(self.raw_rings[ring_ids[0]], tolerance, decimals)
+            holes = [self._valid_ring(self.topology.ring(ring_id, arcs)) for ring_id in ring_ids[1:]]
+            polygons.append([exterior] + [hole for hole in holes if hole is not None])
+
+        if geometry['type'] == 'Polygon':
+            return {'type': 'Polygon', 'coordinates': polygons[0]}
+        return {'type': 'MultiPolygon', 'coordinates': polygons}
+
+    @staticmethod
+    def _outline(ring: Sequence[Sequence[float]], tolerance: float, decimals: int) -> List[List[float]]:
+        """A ring that collapsed at the band's tolerance, simplified with the
+        largest halved tolerance that still leaves a polygon"""
+        points = [(float(point[0]), float(point[1])) for point in ring]
+        for _ in range(OUTLINE_ATTEMPTS):
+            outline = []
+            for lon, lat in simplify_line(points, tolerance):
+                rounded = [round(lon, decimals), round(lat, decimals)]
+                if not outline or outline[-1] != rounded:
+                    outline.append(rounded)
+            if len(outline) >= 4:
+                return outline
+            tolerance /= 2
+        decimals = FULL_RESOLUTION_DECIMALS
+        return [[round(lon, decimals), round(lat, decimals)] for lon, lat in points]
+
+    @staticmethod
+    def _valid_ring(ring: List[List[float]]) -> Optional[List[List[float]]]:
+        return ring if len(ring) >= 4 else None
+
+    def band(self, band: int) -> _Band:
+        cached = self.bands.get(band)
+        if cached is not None:
+            return cached
+
+        tolerance, decimals = band_tolerance(band), band_decimals(band)
+        arcs = self.topology.simplified_arcs(tolerance, decimals)
+        fragments = []
+        for index, feature in enumerate(self.features):
+            simplified = dict(feature)
+            simplified['geometry'] = self.geometry(index, arcs, tolerance, decimals)
+            fragments.append(json.dumps(simplified, separators=(',', ':')).encode('utf-8'))
+
+        body = self.prefix + b','.join(fragments) + b']}'
+        gzipped = gzip.compress(body, compresslevel=9) if len(body) >= GZIP_MIN_BYTES else None
+        cached = self.bands[band] = _Band(fragments, body, gzipped, make_etag(body))
+        return cached
+
+class BoundaryService:
+    """Simplified boundary layers with pre-serialized, pre-compressed bodies
+
+    Layers come from a ``{layer: FeatureCollection}`` mapping. A layer's
+    topology is built on first use, and each zoom band is simplified,
+    serialized and gzipped once; bbox queries only join the pre-serialized
+    features that intersect the bbox.
+    """
+
+    def __init__(self, layers: Dict[str, Dict]):
+        self._source = layers
+        self._layers: Dict[str, _Layer] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, layer: str) -> bool:
+        return layer in self._source
+
+    def _layer(self, layer: str) -> _Layer:
+        cached = self._layers.get(layer)
+        if cached is None:
+            with self._lock:
+                cached = self._layers.get(layer)
+                if cached is None:
+                    cached = self._layers[layer] = _Layer(self._source[layer])
+        return cached
+
+    def warm(self):
+        """Precompute every band of every layer"""
+        for layer in self._source:
+            for band in range(len(BOUNDARY_ZOOM_BANDS) + 1):
+                self._band(layer, band)
+
+    def _band(self, layer: str, band: int) -> _Band:
+        data = self._layer(layer)
+        cached = data.bands.get(band)
+        if cached is None:
+            with self._lock:
+                cached = data.band(band)
+        return cached
+
+    def invalidate(self, layer: Optional[str] = None):
+        """Drop precomputed bands after the source data changed"""
+        with self._lock:
+            if layer is None:
+                self._layers.clear()
+            else:
+                self._layers.pop(layer, None)
+
+    def body(self, layer: str, zoom: Optional[int] = None,
+             bbox: Optional[Sequence[float]] = None) -> Tuple[bytes, Optional[bytes], str]:
+        """GeoJSON body, its gzip encoding (None when small) and ETag"""
+        band = self._band(layer, zoom_band(zoom))
+        if bbox is None:
+            return band.body, band.gzipped, band.etag
+
+        data = self._layer(layer)
+        lon_min, lat_min, lon_max, lat_max = bbox
+        indices = [index for index, (x0, y0, x1, y1) in enumerate(data.bboxes)
+                   if x0 <= lon_max and x1 >= lon_min and y0 <= lat_max and y1 >= lat_min]
+        if len(indices) == len(band.fragments):
+            return band.body, band.gzipped, band.etag
+
+        body = data.prefix + b','.join(band.fragments[index] for index in indices) + b']}'
+        gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        return body, gzipped, make_etag(band.etag, *indices)
+
+    def response(self, layer: str, zoom: Optional[int] = None, bbox: Optional[Sequence[float]] = None,
+                 cache_control: str = REVALIDATE) -> Response:
+        """GeoJSON response, gzip-encoded when the client accepts it, or a 304"""
+        body, gzipped, etag = self.body(layer, zoom, bbox)
+        headers = {'Vary': 'Accept-Encoding'}
+        if gzipped is not None and request.accept_encodings['gzip'] > 0:
+            headers['Content-Encoding'] = 'gzip'
+            return conditional_response(gzipped, 'application/json', f"{etag}-gz", cache_control, headers)
+        return conditional_response(body, 'application/json', etag, cache_control, headers)
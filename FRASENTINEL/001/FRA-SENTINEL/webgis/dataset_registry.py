@@ -0,0 +1,136 @@
+"""
+Dataset Registry for FRA-SENTINEL
+Load-once cache for the JSON/CSV reference datasets under webgis/
+Files are re-parsed only when their mtime or size changes
+"""
+
+import csv
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Typed columns of the progress CSVs (progress_demo.csv, mpr_snapshot.csv)
+PROGRESS_INT_COLUMNS = (
+    'ifr_total', 'ifr_granted', 'cr_total', 'cr_granted', 'cfr_total', 'cfr_granted',
+    'ifr_filed', 'ifr_rejected', 'cr_filed', 'cr_rejected', 'cfr_filed', 'cfr_rejected'
+)
+PROGRESS_FLOAT_COLUMNS = ('total_area_vested', 'cfr_managed_area')
+
+@dataclass
+class CsvDataset:
+    """Parsed CSV file
+
+    ``rows`` are the raw ``csv.DictReader`` rows, ``typed_rows`` the same
+    rows with numeric columns already converted.
+    """
+    fieldnames: List[str]
+    rows: List[Dict[str, str]]
+    typed_rows: List[Dict[str, Any]] = field(default_factory=list)
+
+@dataclass
+class _CacheEntry:
+    signature: Tuple[int, int]
+    value: Any
+
+class DatasetRegistry:
+    """Shared, mtime-invalidated cache of parsed dataset files
+
+    Paths are relative to ``base_dir``. Cached values are shared between
+    requests and must be treated as read-only by callers.
+    """
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self._entries: Dict[Tuple[str, str], _CacheEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def load_json(self, rel_path: str) -> Any:
+        """Get a parsed JSON file; raises FileNotFoundError if it is missing"""
+        return self._load(rel_path, 'json', self._parse_json)
+
+    def load_csv(self, rel_path: str, int_columns: Iterable[str] = PROGRESS_INT_COLUMNS,
+                 float_columns: Iterable[str] = PROGRESS_FLOAT_COLUMNS) -> CsvDataset:
+        """Get a parsed CSV file with numeric columns converted"""
+        int_columns, float_columns = tuple(int_columns), tuple(float_columns)
+        kind = f"csv:{','.join(int_columns)}:{','.join(float_columns)}"
+        return self._load(rel_path, kind,
+                          lambda path: self._parse_csv(path, int_columns, float_columns))
+
+    def invalidate(self, rel_path: Optional[str] = None):
+        """Drop one file (or everything) from the cache"""
+        with self._lock:
+            if rel_path is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == rel_path]:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict:
+        """Cache counters"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'cached_files': len(self._entries)
+            }
+
+    def _load(self, rel_path: str, kind: str, parser) -> Any:
+        path = os.path.join(self.base_dir, rel_path)
+        key = (rel_path, kind)
+
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._entries.pop(key, None)
+                raise
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self.hits += 1
+                return entry.value
+
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+
+            value = parser(path)
+            self._entries[key] = _CacheEntry(signature, value)
+            return value
+
+    @staticmethod
+    def _parse_json(path: str) -> Any:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _parse_csv(path: str, int_columns: Tuple[str, ...],
+                   float_columns: Tuple[str, ...]) -> CsvDataset:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+
+        ints = [name for name in int_columns if name in fieldnames]
+        floats = [name for name in float_columns if name in fieldnames]
+        typed_rows = []
+        for row in rows:
+            typed = dict(row)
+            for name in ints:
+                typed[name] = int(row[name] or 0)
+            for name in floats:
+                typed[name] = float(row[name] or 0)
+            typed_rows.append(typed)
+
+        return CsvDataset(fieldnames=fieldnames, rows=rows, typed_rows=typed_rows)
+
+# Global registry rooted at webgis/
+dataset_registry = DatasetRegistry(os.path.dirname(os.path.abspath(__file__)))
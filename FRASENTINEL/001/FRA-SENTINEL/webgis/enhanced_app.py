@@ -15,8 +15,10 @@ from typing import Dict, List, Optional
 
 # Import custom modules
 from database import init_database, get_db, db_manager
-from queue import init_message_queue, enqueue_ocr_job, enqueue_batch_job, get_queue_stats
-from tiles import tile_bp, generate_tiles_for_layer
+from job_queue import (init_message_queue, enqueue_ocr_job, enqueue_batch_job, get_queue_stats,
+                   get_dead_letters, replay_dead_letter, enqueue_tile_seeding_job, get_job_status)
+from tiles import tile_bp, tile_renderer, TILE_LAYERS, CLUSTER_LAYERS, MIN_ZOOM, MAX_ZOOM, configure_tile_data
+from tiles.seeding import read_seed_progress
 from models import init_model_registry, get_current_models, list_available_models
 from dss.enhanced_dss_engine import analyze_village_dss, get_convergence_analysis
 from digitization.enhanced_ocr import process_document, batch_process_documents
@@ -39,7 +41,8 @@ def create_app():
     CORS(app)
     
     # Initialize components
-    init_database()
+    if init_database():
+        configure_tile_data(db_manager)
     init_message_queue()
     init_model_registry()
     
@@ -414,31 +417,106 @@ def get_queue_stats_api():
         logger.error(f"Queue stats error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/queue/dead-letters')
+def get_dead_letters_api():
+    """List jobs that exhausted their retries"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        return jsonify({'dead_letters': get_dead_letters(limit)})
+        
+    except Exception as e:
+        logger.error(f"Dead letter listing error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/queue/dead-letters/<job_id>/replay', methods=['POST'])
+def replay_dead_letter_api(job_id):
+    """Re-queue a dead-lettered job"""
+    try:
+        if not replay_dead_letter(job_id):
+            return jsonify({'error': 'Job is not in the dead-letter queue'}), 404
+        return jsonify({'job_id': job_id, 'replayed': True})
+        
+    except Exception as e:
+        logger.error(f"Dead letter replay error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/generate-tiles', methods=['POST'])
 def generate_tiles():
-    """Generate map tiles for a layer"""
+    """Queue background tile generation for a layer"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         layer = data.get('layer')
         min_zoom = data.get('min_zoom', 1)
         max_zoom = data.get('max_zoom', 10)
         
         if not layer:
             return jsonify({'error': 'layer is required'}), 400
+        if layer not in TILE_LAYERS:
+            return jsonify({'error': f'Unknown layer: {layer}'}), 400
+        zooms = (min_zoom, max_zoom)
+        if (any(not isinstance(zoom, int) or isinstance(zoom, bool) for zoom in zooms)
+                or not MIN_ZOOM <= min_zoom <= max_zoom <= MAX_ZOOM):
+            return jsonify({'error': f'min_zoom and max_zoom must be integers with '
+                                     f'{MIN_ZOOM} <= min_zoom <= max_zoom <= {MAX_ZOOM}'}), 400
         
-        count = generate_tiles_for_layer(layer, min_zoom, max_zoom)
+        job_id = enqueue_tile_seeding_job(layer, min_zoom, max_zoom, workers=data.get('workers'))
         
         return jsonify({
+            'job_id': job_id,
             'layer': layer,
-            'tiles_generated': count,
             'min_zoom': min_zoom,
-            'max_zoom': max_zoom
-        })
+            'max_zoom': max_zoom,
+            'status_url': url_for('generate_tiles_status', job_id=job_id)
+        }), 202
         
     except Exception as e:
         logger.error(f"Tile generation error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/generate-tiles/<job_id>')
+def generate_tiles_status(job_id):
+    """Status and seeding progress (tiles/sec, units done) of a tile generation job"""
+    job = get_job_status(job_id)
+    if job is None or job['type'] != 'tile_seeding':
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': job['status'],
+        'error': job['error_message'],
+        'progress': read_seed_progress(job['data']['layer'])
+    })
+
+@app.route('/api/clusters')
+def get_clusters_api():
+    """Patta holder clusters (centroid, count, area sum) inside a bbox at a zoom level"""
+    try:
+        bbox = [float(value) for value in request.args.get('bbox', '').split(',')]
+        zoom = request.args.get('z', type=int)
+        layer = request.args.get('layer', 'all')
+        
+        if len(bbox) != 4 or zoom is None:
+            return jsonify({'error': 'bbox=lon_min,lat_min,lon_max,lat_max and z are required'}), 400
+        if layer not in CLUSTER_LAYERS:
+            return jsonify({'error': f'Unknown layer: {layer}'}), 400
+        
+        index = tile_renderer.cluster_index(layer)
+        clusters = index.get_clusters(*bbox, zoom) if index is not None else []
+        
+        return jsonify({
+            'layer': layer,
+            'zoom': zoom,
+            'bbox': bbox,
+            'total': len(clusters),
+            'clusters': clusters
+        })
+        
+    except ValueError:
+        return jsonify({'error': 'bbox must be four comma-separated numbers'}), 400
+    except Exception as e:
+        logger.error(f"Clusters API error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,115 @@
+"""
+Streaming Exports for FRA-SENTINEL
+Chunked CSV/GeoJSON writers for the /api/export/* endpoints
+Memory stays bounded by the chunk size regardless of export size
+"""
+
+import csv
+import io
+import json
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from flask import Response, stream_with_context
+
+CSV_CHUNK_ROWS = 500
+GEOJSON_CHUNK_FEATURES = 200
+SCOPE_LEVELS = ('state', 'district', 'block', 'village')
+
+def scope_filter(scope: str, name: str = '') -> Callable[[Dict], bool]:
+    """Build a record predicate from the ``scope`` and ``id`` export parameters
+
+    ``all`` (or empty) keeps everything. A level name (``state``,
+    ``district``, ...) is the dashboard breadcrumb level, as in
+    ``/api/progress``: it matches ``name`` at that level, or everything
+    when no name is given. ``<level>:<name>`` matches one administrative
+    level, and any other bare ``<name>`` matches any level.
+    """
+    scope = (scope or 'all').strip()
+    level, _, value = scope.partition(':')
+    level = level.lower()
+    if level in SCOPE_LEVELS and not value:
+        value = name or ''
+    if scope.lower() == 'all' or (level in SCOPE_LEVELS and not value.strip()):
+        return lambda record: True
+
+    if level in SCOPE_LEVELS:
+        value = value.strip().lower()
+        return lambda record: str(record.get(level, '')).lower() == value
+
+    bare = scope.lower()
+    return lambda record: any(str(record.get(level, '')).lower() == bare for level in SCOPE_LEVELS)
+
+def iter_csv(rows: Iterable[Dict], fieldnames: List[str],
+             chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """Yield a CSV document in chunks of ``chunk_rows`` rows"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail
+
+def iter_geojson(collection: Dict, features: Iterable[Dict],
+                 chunk_features: int = GEOJSON_CHUNK_FEATURES) -> Iterator[str]:
+    """Yield a FeatureCollection in chunks, keeping its non-feature members
+
+    ``metadata`` is written after the features so its ``total_records``
+    (when present) counts the features actually streamed.
+    """
+    head = {key: value for key, value in collection.items() if key not in ('features', 'metadata')}
+    head.setdefault('type', 'FeatureCollection')
+    yield json.dumps(head)[:-1] + ', "features": ['
+
+    batch = []
+    count = 0
+    for feature in features:
+        batch.append(json.dumps(feature))
+        if len(batch) >= chunk_features:
+            yield (', ' if count else '') + ', '.join(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        yield (', ' if count else '') + ', '.join(batch)
+        count += len(batch)
+
+    metadata = collection.get('metadata')
+    if metadata is None:
+        yield ']}'
+        return
+    if isinstance(metadata, dict) and 'total_records' in metadata:
+        metadata = dict(metadata, total_records=count)
+    yield '], "metadata": ' + json.dumps(metadata) + '}'
+
+def gzip_chunks(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def streaming_response(chunks: Iterable[str], mimetype: str, filename: str,
+                       gzip: bool = False) -> Response:
+    """Wrap text chunks in a streamed attachment response"""
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    if gzip:
+        body = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    else:
+        body = (chunk.encode('utf-8') for chunk in chunks)
+
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
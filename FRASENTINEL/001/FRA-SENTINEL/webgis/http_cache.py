@@ -0,0 +1,92 @@
+"""
+HTTP Caching for FRA-SENTINEL
+ETag / If-None-Match handling for the static GIS layer endpoints
+Layers are serialized once per data version and answered with 304 when unchanged
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import Response, request
+
+# Browsers and nginx may reuse a layer for a minute, then revalidate with its ETag
+REVALIDATE = 'public, max-age=60'
+
+# For URLs that embed a data version and therefore never change
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+def make_etag(*parts) -> str:
+    """Strong ETag value hashed from bytes or string-convertible parts"""
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def not_modified(etag: str, cache_control: str, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """A 304 response if the request's If-None-Match matches ``etag``, else None"""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = Response(status=304, headers=headers)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def conditional_response(body: bytes, mimetype: str, etag: str, cache_control: str = REVALIDATE,
+                         headers: Optional[Dict[str, str]] = None) -> Response:
+    """Full response carrying ``etag``, or a 304 when the client already has it"""
+    response = not_modified(etag, cache_control, headers)
+    if response is not None:
+        return response
+
+    response = Response(body, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+class JsonLayerCache:
+    """Serialized JSON layers with content-hash ETags, one body per data version
+
+    Each named layer has an integer data version. A layer is serialized the
+    first time it is requested at a version and reused until ``invalidate``
+    bumps the version, so repeat requests cost neither a ``json.dumps`` nor
+    a hash.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[int, bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def version(self, name: str) -> int:
+        return self._versions.get(name, 1)
+
+    def get(self, name: str, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """Body and ETag of a layer, serializing ``build()`` on a version change"""
+        version = self.version(name)
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1], entry[2]
+
+        body = json.dumps(build(), separators=(',', ':')).encode('utf-8')
+        etag = make_etag(body)
+        with self._lock:
+            if self.version(name) == version:
+                self._entries[name] = (version, body, etag)
+        return body, etag
+
+    def invalidate(self, name: str) -> int:
+        """Bump a layer's version after its data changed; returns the new version"""
+        with self._lock:
+            version = self.version(name) + 1
+            self._versions[name] = version
+            self._entries.pop(name, None)
+        return version
+
+    def response(self, name: str, build: Callable[[], Any], cache_control: str = REVALIDATE) -> Response:
+        """JSON response for a layer, or a 304 when the client's copy is current"""
+        body, etag = self.get(name, build)
+        return conditional_response(body, 'application/json', etag, cache_control)
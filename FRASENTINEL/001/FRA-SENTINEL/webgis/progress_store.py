@@ -0,0 +1,133 @@
+"""
+Columnar Progress Store for FRA-SENTINEL
+NumPy-backed rollups for /api/progress with precomputed group-by indexes
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from dataset_registry import CsvDataset, dataset_registry
+
+SCOPES = ('state', 'district', 'block', 'village')
+CLAIM_KINDS = ('ifr', 'cr', 'cfr')
+TOP_PENDING_LIMIT = 10
+
+class ProgressStore:
+    """Column arrays and group-by indexes over one progress CSV
+
+    Counts are stored as int64 arrays (``ifr_total``, ``ifr_granted``, ...)
+    and every state/district/block/village value maps to the array of row
+    positions it covers, so a scope filter is a single fancy-index.
+    """
+
+    def __init__(self, dataset: CsvDataset):
+        rows = dataset.typed_rows
+        self.size = len(rows)
+        self.labels: Dict[str, np.ndarray] = {
+            scope: np.array([row[scope] for row in rows], dtype=object)
+            for scope in SCOPES
+        }
+        self.counts: Dict[str, np.ndarray] = {}
+        for kind in CLAIM_KINDS:
+            for suffix in ('total', 'granted'):
+                name = f"{kind}_{suffix}"
+                self.counts[name] = np.fromiter((row[name] for row in rows),
+                                                dtype=np.int64, count=self.size)
+
+        self.pending: Dict[str, np.ndarray] = {
+            kind: self.counts[f"{kind}_total"] - self.counts[f"{kind}_granted"]
+            for kind in CLAIM_KINDS
+        }
+        self.total_pending = sum(self.pending.values())
+        self.groups: Dict[str, Dict[str, np.ndarray]] = {
+            scope: self._group_index(self.labels[scope]) for scope in SCOPES
+        }
+
+    @staticmethod
+    def _group_index(labels: np.ndarray) -> Dict[str, np.ndarray]:
+        """Map each distinct label to the sorted row positions holding it"""
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        if not len(order):
+            return {}
+        boundaries = np.flatnonzero(sorted_labels[1:] != sorted_labels[:-1]) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(order)]))
+        return {
+            sorted_labels[start]: np.sort(order[start:end])
+            for start, end in zip(starts, ends)
+        }
+
+    def select(self, scope: str, id_param: str) -> Optional[np.ndarray]:
+        """Row positions for a scope filter; None means all rows"""
+        if scope in self.groups and id_param:
+            return self.groups[scope].get(id_param, np.empty(0, dtype=np.intp))
+        return None
+
+    def rollup(self, scope: str, id_param: str) -> Dict:
+        """Aggregates, grant rates and top pending villages for a scope"""
+        rows = self.select(scope, id_param)
+
+        def column(values: np.ndarray) -> np.ndarray:
+            return values if rows is None else values[rows]
+
+        aggregates = {name: int(column(values).sum()) for name, values in self.counts.items()}
+        rates = {}
+        for kind in CLAIM_KINDS:
+            total = aggregates[f"{kind}_total"]
+            granted = aggregates[f"{kind}_granted"]
+            rates[f"{kind}_rate"] = round((granted / total * 100) if total > 0 else 0, 1)
+
+        return {
+            "aggregates": aggregates,
+            "rates": rates,
+            "top_pending_villages": self.top_pending(rows),
+            "total_units": self.size if rows is None else int(len(rows))
+        }
+
+    def top_pending(self, rows: Optional[np.ndarray], limit: int = TOP_PENDING_LIMIT) -> List[Dict]:
+        """Villages with the most pending claims, ties kept in file order
+
+        Uses a partial selection (``np.partition``) instead of sorting every
+        row; only the ``limit`` winners are sorted.
+        """
+        positions = np.arange(self.size) if rows is None else rows
+        totals = self.total_pending[positions]
+        keep = totals > 0
+        positions, totals = positions[keep], totals[keep]
+
+        if len(positions) > limit:
+            kth = np.partition(totals, len(totals) - limit)[len(totals) - limit]
+            above = totals > kth
+            ties = np.flatnonzero(totals == kth)[:limit - int(above.sum())]
+            chosen = np.concatenate((np.flatnonzero(above), ties))
+            positions, totals = positions[chosen], totals[chosen]
+
+        order = np.lexsort((positions, -totals))
+        result = []
+        for index in positions[order]:
+            result.append({
+                "village": self.labels['village'][index],
+                "district": self.labels['district'][index],
+                "state": self.labels['state'][index],
+                "total_pending": int(self.total_pending[index]),
+                "ifr_pending": int(self.pending['ifr'][index]),
+                "cr_pending": int(self.pending['cr'][index]),
+                "cfr_pending": int(self.pending['cfr'][index])
+            })
+        return result
+
+_stores: Dict[str, tuple] = {}
+_stores_lock = threading.Lock()
+
+def get_progress_store(rel_path: str = 'data/progress_demo.csv') -> ProgressStore:
+    """Columnar store for a progress CSV, rebuilt when the registry reloads it"""
+    dataset = dataset_registry.load_csv(rel_path)
+    with _stores_lock:
+        cached = _stores.get(rel_path)
+        if cached is None or cached[0] is not dataset:
+            cached = (dataset, ProgressStore(dataset))
+            _stores[rel_path] = cached
+        return cached[1]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test Atlas Index
+Tests for the precomputed FRA Atlas rollup index
+"""
+
+import copy
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from atlas_index import AtlasIndex
+
+def _holder(holder_id, area, status):
+    return {
+        "id": holder_id,
+        "name": f"Holder {holder_id}",
+        "tribal_group": "Bhil",
+        "claim_type": "IFR",
+        "area_hectares": area,
+        "status": status,
+        "coordinates": [75.6, 21.8]
+    }
+
+def _village(*holders):
+    return {
+        "patta_holders": list(holders),
+        "forest_cover": 50.0,
+        "water_bodies": 1,
+        "agricultural_land": 20.0,
+        "coordinates": [75.6, 21.8]
+    }
+
+SAMPLE_ATLAS = {
+    "states": {
+        "Madhya Pradesh": {
+            "districts": {
+                "Khargone": {
+                    "blocks": {
+                        "Khargone": {
+                            "villages": {
+                                "Khargone": _village(
+                                    _holder("A1", 2.5, "Approved"),
+                                    _holder("A2", 1.0, "Pending")
+                                ),
+                                "Bhikangaon": _village(_holder("A3", 4.0, "Approved"))
+                            }
+                        }
+                    }
+                },
+                "Jhabua": {
+                    "blocks": {
+                        "Jhabua": {"villages": {"Jhabua": _village()}}
+                    }
+                }
+            }
+        },
+        "Odisha": {
+            "districts": {
+                "Koraput": {
+                    "blocks": {
+                        "Koraput": {
+                            "villages": {"Koraput": _village(_holder("B1", 5.2, "Verified"))}
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+class TestAtlasIndex(unittest.TestCase):
+    """Test atlas rollups and incremental updates"""
+
+    def setUp(self):
+        self.atlas = copy.deepcopy(SAMPLE_ATLAS)
+        self.index = AtlasIndex(self.atlas)
+
+    def test_rollups_per_level(self):
+        """Test counts, areas and status histograms at every level"""
+        root = self.index.get(())
+        self.assertEqual(root.patta_count, 4)
+        self.assertAlmostEqual(root.area_hectares, 12.7)
+        self.assertEqual(root.status_counts, {"Approved": 2, "Pending": 1, "Verified": 1})
+
+        state = self.index.get(("Madhya Pradesh",))
+        self.assertEqual(state.patta_count, 3)
+        self.assertAlmostEqual(state.area_hectares, 7.5)
+
+        village = self.index.get(("Madhya Pradesh", "Khargone", "Khargone", "Khargone"))
+        self.assertEqual(village.patta_count, 2)
+        self.assertEqual(village.status_counts, {"Approved": 1, "Pending": 1})
+
+    def test_children_preserve_tree_order(self):
+        """Test that children are listed in atlas order, including empty nodes"""
+        names = [name for name, _ in self.index.get_children(("Madhya Pradesh",))]
+        self.assertEqual(names, ["Khargone", "Jhabua"])
+        self.assertEqual(self.index.child_count(("Madhya Pradesh",)), 2)
+        self.assertEqual(self.index.get(("Madhya Pradesh", "Jhabua")).patta_count, 0)
+        self.assertIsNone(self.index.get(("Kerala",)))
+
+    def test_add_patta_holder(self):
+        """Test that adding a holder updates the tree and every ancestor"""
+        self.index.add_patta_holder("Odisha", "Koraput", "Koraput", "Koraput",
+                                    _holder("B2", 1.5, "Pending"))
+
+        self.assertEqual(len(self.atlas["states"]["Odisha"]["districts"]["Koraput"]
+                             ["blocks"]["Koraput"]["villages"]["Koraput"]["patta_holders"]), 2)
+        self.assertEqual(self.index.get(("Odisha",)).patta_count, 2)
+        self.assertEqual(self.index.get(()).status_counts["Pending"], 2)
+
+    def test_add_patta_holder_creates_missing_levels(self):
+        """Test that a holder in a new village creates the missing path"""
+        self.index.add_patta_holder("Odisha", "Rayagada", "Bissam", "Kumbhikota",
+                                    _holder("B3", 3.0, "Approved"))
+
+        self.assertIn("Rayagada", self.atlas["states"]["Odisha"]["districts"])
+        self.assertEqual(self.index.child_count(("Odisha",)), 2)
+        self.assertAlmostEqual(self.index.get(("Odisha", "Rayagada")).area_hectares, 3.0)
+
+        with self.assertRaises(ValueError):
+            self.index.add_patta_holder("Odisha", "Rayagada", "Bissam", "Kumbhikota",
+                                        _holder("B3", 3.0, "Approved"))
+
+    def test_update_patta_holder(self):
+        """Test that status and area changes move between histogram buckets"""
+        self.index.update_patta_holder("A2", {"status": "Approved", "area_hectares": 2.0})
+
+        root = self.index.get(())
+        self.assertEqual(root.status_counts, {"Approved": 3, "Verified": 1})
+        self.assertAlmostEqual(root.area_hectares, 13.7)
+        self.assertIsNone(self.index.update_patta_holder("missing", {"status": "Approved"}))
+
+    def test_remove_patta_holder(self):
+        """Test removing a holder"""
+        self.index.remove_patta_holder("B1")
+        self.assertEqual(self.index.get(("Odisha",)).patta_count, 0)
+        self.assertNotIn("Verified", self.index.get(()).status_counts)
+
+    def test_rebuild_matches_incremental_state(self):
+        """Test that a full rebuild agrees with incremental updates"""
+        self.index.add_patta_holder("Madhya Pradesh", "Jhabua", "Jhabua", "Jhabua",
+                                    _holder("A4", 0.5, "Rejected"))
+        self.index.update_patta_holder("A1", {"status": "Rejected"})
+        incremental = copy.deepcopy(self.index.aggregates)
+
+        self.index.rebuild()
+        self.assertEqual(set(incremental), set(self.index.aggregates))
+        for path, aggregate in incremental.items():
+            rebuilt = self.index.aggregates[path]
+            self.assertEqual(aggregate.patta_count, rebuilt.patta_count)
+            self.assertAlmostEqual(aggregate.area_hectares, rebuilt.area_hectares)
+            self.assertEqual(aggregate.status_counts, rebuilt.status_counts)
+
+if __name__ == '__main__':
+    unittest.main()
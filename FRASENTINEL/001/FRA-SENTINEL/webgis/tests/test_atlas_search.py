@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test Atlas Search
+Tests for the n-gram inverted index behind /api/fra-atlas/search
+"""
+
+import copy
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from atlas_index import AtlasIndex
+from atlas_search import AtlasSearchIndex, normalize_text
+
+def _holder(holder_id, name, tribal_group, claim_type, status):
+    return {
+        "id": holder_id,
+        "name": name,
+        "tribal_group": tribal_group,
+        "claim_type": claim_type,
+        "area_hectares": 1.0,
+        "status": status,
+        "coordinates": [75.6, 21.8]
+    }
+
+def _atlas(villages):
+    return {
+        "states": {
+            "Tamil Nadu": {
+                "districts": {
+                    "Nilgiris": {
+                        "blocks": {
+                            "Gudalur": {
+                                "villages": {
+                                    name: {
+                                        "patta_holders": holders,
+                                        "forest_cover": 0.0,
+                                        "water_bodies": 0,
+                                        "agricultural_land": 0.0,
+                                        "coordinates": [76.5, 11.5]
+                                    }
+                                    for name, holders in villages.items()
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+SAMPLE_ATLAS = _atlas({
+    "Gudalur": [
+        _holder("T1", "Ram Singh", "Bhil", "IFR", "Approved"),
+        _holder("T2", "Sita Ramesh", "Gond", "CR", "Pending"),
+        _holder("T3", "முருகன்", "Irula", "IFR", "Pending")
+    ],
+    "Ramnagar": [
+        _holder("T4", "Lakshmi Devi", "Kurumba", "CFR", "Verified"),
+        _holder("T5", "राम प्रसाद", "Bhil", "IFR", "Approved")
+    ]
+})
+
+class TestAtlasSearchIndex(unittest.TestCase):
+    """Test search matching, filters, ranking and pagination"""
+
+    def setUp(self):
+        self.atlas = copy.deepcopy(SAMPLE_ATLAS)
+        self.index = AtlasSearchIndex(self.atlas)
+
+    def _ids(self, **kwargs):
+        return [r["patta_id"] for r in self.index.search(**kwargs)["results"]]
+
+    def test_substring_semantics(self):
+        """Test case-insensitive substring matches across all fields"""
+        self.assertEqual(set(self._ids(query="ram")), {"T1", "T2", "T4", "T5"})
+        self.assertEqual(self._ids(query="AKSHM"), ["T4"])
+        self.assertEqual(self._ids(query="zzz"), [])
+
+    def test_empty_query_returns_everything_in_atlas_order(self):
+        """Test that an empty query lists every holder"""
+        self.assertEqual(self._ids(query=""), ["T1", "T2", "T3", "T4", "T5"])
+
+    def test_indic_scripts(self):
+        """Test Tamil and Devanagari queries, including zero-width joiners"""
+        self.assertEqual(self._ids(query="முருக"), ["T3"])
+        self.assertEqual(self._ids(query="राम"), ["T5"])
+        self.assertEqual(self._ids(query="रा\u200dम"), ["T5"])
+        self.assertEqual(normalize_text("  Ram\u200c  SINGH "), "ram singh")
+
+    def test_ranking(self):
+        """Test that exact and prefix matches rank above inner substrings"""
+        ids = self._ids(query="ram")
+        # Name prefix matches outrank word-prefix and village-only matches
+        self.assertEqual(ids[0], "T1")
+        self.assertLess(ids.index("T2"), ids.index("T4"))
+
+    def test_status_and_type_filters(self):
+        """Test status buckets, claim type buckets and field restriction"""
+        self.assertEqual(self._ids(query="", status_filter="pending"), ["T2", "T3"])
+        self.assertEqual(self._ids(query="", filter_type="IFR", status_filter="approved"),
+                         ["T1", "T5"])
+        self.assertEqual(self._ids(query="ram", filter_type="village"), ["T4", "T5"])
+        self.assertEqual(self._ids(query="bhil", filter_type="tribal_group"), ["T1", "T5"])
+
+    def test_pagination(self):
+        """Test page slicing and totals"""
+        first = self.index.search("", page=1, per_page=2)
+        second = self.index.search("", page=3, per_page=2)
+        self.assertEqual(first["total"], 5)
+        self.assertTrue(first["has_more"])
+        self.assertEqual([r["patta_id"] for r in second["results"]], ["T5"])
+        self.assertFalse(second["has_more"])
+
+    def test_follows_atlas_index_updates(self):
+        """Test that atlas index mutations are reflected in search results"""
+        atlas_index = AtlasIndex(self.atlas)
+        atlas_index.listeners.append(self.index)
+
+        atlas_index.add_patta_holder("Tamil Nadu", "Nilgiris", "Gudalur", "Gudalur",
+                                     _holder("T6", "Ramu Naicker", "Irula", "CR", "Pending"))
+        self.assertIn("T6", self._ids(query="naick"))
+
+        atlas_index.update_patta_holder("T6", {"status": "Approved"})
+        self.assertIn("T6", self._ids(query="naick", status_filter="approved"))
+        self.assertNotIn("T6", self._ids(query="", status_filter="pending"))
+
+        atlas_index.remove_patta_holder("T6")
+        self.assertEqual(self._ids(query="naick"), [])
+        self.assertEqual(len(self.index), 5)
+
+if __name__ == '__main__':
+    unittest.main()
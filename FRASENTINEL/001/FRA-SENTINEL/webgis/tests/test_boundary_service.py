@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test Boundary Service
+Tests for the zoom-simplified /api/boundaries layers
+"""
+
+import gzip
+import json
+import math
+import sys
+import unittest
+from pathlib import Path
+
+from flask import Flask
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from boundary_service import (BOUNDARY_ZOOM_BANDS, BoundaryService, band_decimals,
+                              simplify_line, zoom_band)
+
+def _border():
+    """A wiggly north-south border along lon 80 with 400 vertices"""
+    return [[80.0 + 0.02 * math.sin(i / 7.0) + 0.0005 * (i % 3), 20.0 + i * 0.005] for i in range(400)]
+
+def _feature(name, ring):
+    return {'type': 'Feature', 'properties': {'name': name},
+            'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+
+def _layers():
+    border = _border()
+    west = border + [[78.0, border[-1][1]], [78.0, 20.0], border[0]]
+    east = border[::-1] + [[82.0, 20.0], [82.0, border[-1][1]], border[-1]]
+    tiny = [[85.0, 21.0], [85.0001, 21.0], [85.0001, 21.0001], [85.0, 21.0]]
+    return {
+        'districts': {
+            'type': 'FeatureCollection',
+            'features': [_feature('West', west), _feature('East', east), _feature('Tiny', tiny)],
+            'metadata': {'source': 'test'}
+        }
+    }
+
+class TestBoundaryService(unittest.TestCase):
+    """Test simplification, quantization, bbox filtering and caching"""
+
+    def setUp(self):
+        self.service = BoundaryService(_layers())
+
+    def _features(self, zoom=None, bbox=None):
+        body, _, _ = self.service.body('districts', zoom, bbox)
+        return json.loads(body)['features']
+
+    def test_zoom_bands(self):
+        """Test zoom to band mapping"""
+        self.assertEqual(zoom_band(0), 0)
+        self.assertEqual(zoom_band(BOUNDARY_ZOOM_BANDS[0]), 0)
+        self.assertEqual(zoom_band(BOUNDARY_ZOOM_BANDS[0] + 1), 1)
+        self.assertEqual(zoom_band(18), len(BOUNDARY_ZOOM_BANDS))
+        self.assertEqual(zoom_band(None), len(BOUNDARY_ZOOM_BANDS))
+
+    def test_simplify_line_keeps_ends(self):
+        """Test Douglas-Peucker on a straight, dense line"""
+        line = [(float(i), 0.0) for i in range(50)]
+        self.assertEqual(simplify_line(line, 0.1), [(0.0, 0.0), (49.0, 0.0)])
+        self.assertEqual(simplify_line(line, 0.0), line)
+
+    def test_shared_border_stays_shared(self):
+        """Test that neighbours simplify their common border identically"""
+        full = self._features()
+        self.assertEqual(len(full[0]['geometry']['coordinates'][0]), 403)
+
+        for zoom in (3, 6, 9):
+            west, east, _ = self._features(zoom)
+            west_ring = west['geometry']['coordinates'][0]
+            east_ring = east['geometry']['coordinates'][0]
+            self.assertLess(len(west_ring), 403)
+
+            west_border = {tuple(point) for point in west_ring if point[0] > 79.0}
+            east_border = {tuple(point) for point in east_ring if point[0] < 81.0}
+            self.assertEqual(west_border, east_border)
+
+    def test_quantized_coordinates(self):
+        """Test that coordinates are rounded to the band's grid"""
+        decimals = band_decimals(0)
+        for feature in self._features(2)[:2]:
+            for lon, lat in feature['geometry']['coordinates'][0]:
+                self.assertEqual(lon, round(lon, decimals))
+                self.assertEqual(lat, round(lat, decimals))
+
+    def test_small_polygons_survive(self):
+        """Test that polygons smaller than the tolerance keep a valid ring"""
+        tiny = self._features(1)[2]['geometry']['coordinates'][0]
+        self.assertGreaterEqual(len(tiny), 4)
+        self.assertEqual(tiny[0], tiny[-1])
+
+    def test_bbox_filter(self):
+        """Test that bbox queries return only intersecting features"""
+        names = [feature['properties']['name'] for feature in self._features(8, [81.0, 20.5, 81.5, 21.0])]
+        self.assertEqual(names, ['East'])
+        self.assertEqual(self._features(8, [70.0, 10.0, 71.0, 11.0]), [])
+
+        body, _, _ = self.service.body('districts', 8, [70.0, 10.0, 71.0, 11.0])
+        self.assertEqual(json.loads(body)['metadata'], {'source': 'test'})
+
+    def test_bodies_are_precomputed(self):
+        """Test that bands are serialized and compressed once"""
+        body, gzipped, etag = self.service.body('districts', 5)
+        again, gzipped_again, etag_again = self.service.body('districts', 6)
+        self.assertIs(body, again)
+        self.assertIs(gzipped, gzipped_again)
+        self.assertEqual(gzip.decompress(gzipped), body)
+        self.assertNotEqual(etag, self.service.body('districts', 12)[2])
+
+    def test_response(self):
+        """Test gzip negotiation and 304 revalidation"""
+        app = Flask(__name__)
+        app.add_url_rule('/districts', 'districts',
+                         lambda: self.service.response('districts'))
+        client = app.test_client()
+
+        response = client.get('/districts', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))['features']), 3)
+
+        plain = client.get('/districts')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertNotEqual(plain.headers['ETag'], response.headers['ETag'])
+
+        revalidated = client.get('/districts', headers={'If-None-Match': plain.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+if __name__ == '__main__':
+    unittest.main()
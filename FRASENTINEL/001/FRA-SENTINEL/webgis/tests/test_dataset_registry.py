@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test Dataset Registry
+Tests for the mtime-invalidated JSON/CSV dataset cache
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dataset_registry import DatasetRegistry
+
+class TestDatasetRegistry(unittest.TestCase):
+    """Test load-once caching and reload on change"""
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.registry = DatasetRegistry(self.base_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def _write(self, name, content, mtime=None):
+        path = os.path.join(self.base_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_json_loaded_once(self):
+        """Test that repeated loads are served from the cache"""
+        self._write('metrics.json', json.dumps({'docs': 47}))
+
+        first = self.registry.load_json('metrics.json')
+        second = self.registry.load_json('metrics.json')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.registry.get_stats()['misses'], 1)
+        self.assertEqual(self.registry.get_stats()['hits'], 1)
+
+    def test_reload_on_mtime_change(self):
+        """Test that a modified file is re-parsed"""
+        self._write('metrics.json', json.dumps({'docs': 47}), mtime=1_000_000)
+        self.registry.load_json('metrics.json')
+
+        self._write('metrics.json', json.dumps({'docs': 48}), mtime=2_000_000)
+        self.assertEqual(self.registry.load_json('metrics.json'), {'docs': 48})
+        self.assertEqual(self.registry.get_stats()['reloads'], 1)
+
+    def test_missing_file(self):
+        """Test that missing files raise FileNotFoundError and are not cached"""
+        with self.assertRaises(FileNotFoundError):
+            self.registry.load_json('missing.json')
+
+        path = self._write('metrics.json', '{}')
+        self.registry.load_json('metrics.json')
+        os.remove(path)
+        with self.assertRaises(FileNotFoundError):
+            self.registry.load_json('metrics.json')
+        self.assertEqual(self.registry.get_stats()['cached_files'], 0)
+
+    def test_csv_typed_columns(self):
+        """Test that progress columns are converted once at parse time"""
+        self._write('progress.csv',
+                    "state,village,ifr_total,ifr_granted,total_area_vested\n"
+                    "Odisha,Koraput,15,12,125.5\n")
+
+        dataset = self.registry.load_csv('progress.csv')
+
+        self.assertEqual(dataset.fieldnames,
+                         ['state', 'village', 'ifr_total', 'ifr_granted', 'total_area_vested'])
+        self.assertEqual(dataset.rows[0]['ifr_total'], '15')
+        self.assertEqual(dataset.typed_rows[0]['ifr_total'], 15)
+        self.assertEqual(dataset.typed_rows[0]['total_area_vested'], 125.5)
+        self.assertEqual(dataset.typed_rows[0]['village'], 'Koraput')
+
+    def test_shipped_datasets(self):
+        """Test the registry against the real webgis data files"""
+        registry = DatasetRegistry(str(PROJECT_ROOT))
+
+        progress = registry.load_csv('data/progress_demo.csv')
+        self.assertGreater(len(progress.typed_rows), 0)
+        self.assertIsInstance(progress.typed_rows[0]['cfr_granted'], int)
+
+        catalog = registry.load_json('data/dss_catalog.json')
+        self.assertIn('schemes', catalog)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test Export Streams
+Tests for the chunked CSV/GeoJSON export writers
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from export_streams import gzip_chunks, iter_csv, iter_geojson, scope_filter
+
+class TestExportStreams(unittest.TestCase):
+    """Test streaming writers and scope filtering"""
+
+    def test_csv_chunks(self):
+        """Test that CSV output is chunked and round-trips"""
+        rows = ({'village': f'V{i}', 'count': i} for i in range(1050))
+        chunks = list(iter_csv(rows, ['village', 'count'], chunk_rows=500))
+
+        # header + 500 rows, 500 rows, 50 rows
+        self.assertEqual(len(chunks), 3)
+        parsed = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual(len(parsed), 1050)
+        self.assertEqual(parsed[-1], {'village': 'V1049', 'count': '1049'})
+
+    def test_csv_header_only(self):
+        """Test that an empty export still has a header"""
+        self.assertEqual(''.join(iter_csv([], ['state'])), 'state\r\n')
+
+    def test_geojson_round_trip(self):
+        """Test that streamed GeoJSON parses and keeps collection members"""
+        collection = {
+            'type': 'FeatureCollection',
+            'features': [],
+            'metadata': {'source': 'test'}
+        }
+        features = [
+            {'type': 'Feature', 'properties': {'village': f'V{i}'},
+             'geometry': {'type': 'Point', 'coordinates': [75.0, 21.0]}}
+            for i in range(5)
+        ]
+
+        parsed = json.loads(''.join(iter_geojson(collection, iter(features), chunk_features=2)))
+        self.assertEqual(parsed['features'], features)
+        self.assertEqual(parsed['metadata'], {'source': 'test'})
+
+        empty = json.loads(''.join(iter_geojson(collection, iter([]))))
+        self.assertEqual(empty['features'], [])
+
+    def test_geojson_total_records(self):
+        """Test that total_records counts the streamed features, not the source collection"""
+        features = [{'type': 'Feature', 'properties': {'village': f'V{i}'}, 'geometry': None}
+                    for i in range(4)]
+        collection = {'type': 'FeatureCollection', 'features': features,
+                      'metadata': {'total_records': 4, 'last_updated': '2025-09-16'}}
+
+        parsed = json.loads(''.join(iter_geojson(collection, iter(features[:3]), chunk_features=2)))
+        self.assertEqual(len(parsed['features']), 3)
+        self.assertEqual(parsed['metadata'], {'total_records': 3, 'last_updated': '2025-09-16'})
+
+        empty = json.loads(''.join(iter_geojson(collection, iter([]))))
+        self.assertEqual(empty['metadata']['total_records'], 0)
+
+    def test_gzip_chunks(self):
+        """Test incremental gzip compression"""
+        chunks = ['state,village\r\n'] + ['Odisha,Koraput\r\n'] * 100
+        compressed = b''.join(gzip_chunks(iter(chunks)))
+        self.assertEqual(gzip.decompress(compressed).decode('utf-8'), ''.join(chunks))
+
+    def test_scope_filter(self):
+        """Test all / level-qualified / bare scope values"""
+        record = {'state': 'Odisha', 'district': 'Koraput', 'block': 'Koraput', 'village': 'Jeypore'}
+
+        self.assertTrue(scope_filter('all')(record))
+        self.assertTrue(scope_filter('')(record))
+        self.assertTrue(scope_filter('odisha')(record))
+        self.assertTrue(scope_filter('village:Jeypore')(record))
+        self.assertFalse(scope_filter('district:Jeypore')(record))
+        self.assertFalse(scope_filter('Khargone')(record))
+
+    def test_scope_level_names(self):
+        """Test breadcrumb levels sent by the dashboard (scope=state) and the id parameter"""
+        record = {'state': 'Odisha', 'district': 'Koraput', 'block': 'Koraput', 'village': 'Jeypore'}
+
+        for level in ('state', 'district', 'block', 'village', 'State'):
+            self.assertTrue(scope_filter(level)(record), level)
+        self.assertTrue(scope_filter('state', 'odisha')(record))
+        self.assertFalse(scope_filter('state', 'Madhya Pradesh')(record))
+        self.assertTrue(scope_filter('village', 'Jeypore')(record))
+        self.assertFalse(scope_filter('district', 'Jeypore')(record))
+        self.assertTrue(scope_filter('state:')(record))
+
+if __name__ == '__main__':
+    unittest.main()
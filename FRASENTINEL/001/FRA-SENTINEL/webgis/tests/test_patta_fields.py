@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test Patta Fields
+Tests for the precompiled Patta OCR field parser
+"""
+
+import re
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from patta_fields import (DISTRICT, SURVEY_NUMBER, FieldPatterns, PattaFieldParser,
+                          required_literal)
+
+PATTA_1 = ("மாவட்டம் : கடலூர் வட்டம் : குறிஞ்சிப்பாடி Arugampattu பட்டா எண் : 366 "
+           "1. இராமச்சந்திரன் மனைவி ஆனந்தபிரியா புல எண் 8 0 - 19.50 1.08 தீர்வை: 2.40 "
+           "ANNADURAI P 12/05/2019 10:11:12:PM RTR1234/2019")
+
+PATTA_2 = ("பெரம்பலூர் (வடக்கு) பட்டா எண் 2423 1. துரைசாமி நாடார் மகன் சுயம்பு(எ)லிங்கராஜ் "
+           "0.28.1 22-09-2017 10-10-2024 2017/0105/16/018690 - 2017/16/03/001156SD "
+           "eservices.tn.gov.in")
+
+def ordered_search(patterns, text):
+    """Reference: re.search over the pattern strings in priority order"""
+    for index, source in enumerate(patterns.sources):
+        match = re.search(source, text, patterns.flags)
+        if match:
+            return index, match.span()
+    return None
+
+class TestPattaFields(unittest.TestCase):
+    """Test pattern priority, extracted fields and thread safety"""
+
+    def setUp(self):
+        self.parser = PattaFieldParser()
+
+    def test_priority_matches_ordered_search(self):
+        """Test that literal-gated alternatives keep list-order priority"""
+        patterns = FieldPatterns([(r"B(\d)", None), (r"a(\d)", None), (r"\d", "digit")])
+        for text in ("a1 b2", "b2 a1", "7 a1", "7", "none", "x A1", "\u017fb3"):
+            found = patterns.search(text)
+            expected = ordered_search(patterns, text)
+            self.assertEqual((found[0], found[1].span()) if found else None, expected, text)
+
+        self.assertEqual(patterns.value("a1 b2"), "2")
+        self.assertEqual(patterns.value("7"), "digit")
+        self.assertIsNone(patterns.value("none"))
+
+    def test_required_literal(self):
+        """Test the literal that gates each pattern"""
+        self.assertEqual(required_literal(r"Patta\s*Number[:\s]*(\d+)", re.IGNORECASE), "number")
+        self.assertEqual(required_literal(r"0\.28\.1"), "0.28.1")
+        self.assertEqual(required_literal(r"(\d+\.?\d*)\s*Rupee", re.IGNORECASE), "rupee")
+        self.assertEqual(required_literal(r"abc?de+f"), "ab")
+        self.assertEqual(required_literal(r"(abc)?d"), "")
+        self.assertEqual(required_literal(r"abc|d"), "")
+        self.assertEqual(required_literal(r"[abc]\d"), "")
+
+        # ']' escaped, first in the class or first after '^' does not end the class
+        self.assertEqual(required_literal(r"a[\]]bc"), "bc")
+        self.assertEqual(required_literal(r"[]x]yz"), "yz")
+        self.assertEqual(required_literal(r"[^]]q"), "q")
+        self.assertEqual(required_literal(r"ab[\\]cd"), "ab")
+        for source, text in ((r"a[\]]bc", "a]bc"), (r"[^]]qq", "xqq"), (r"ab[\\]cd", "ab\\cd")):
+            self.assertEqual(FieldPatterns([(source, "hit")], flags=0).value(text), "hit", source)
+
+    def test_ignorecase_special_letters(self):
+        """Test letters that IGNORECASE matches but lower() does not fold"""
+        self.assertEqual(SURVEY_NUMBER.value("\u017furvey No: 42"), "42")
+        self.assertEqual(DISTRICT.value("D\u0131strict: Kadalur"), "Kadalur")
+        self.assertEqual(DISTRICT.value("Cuddalore"), "Cuddalore")
+
+    def test_field_patterns(self):
+        """Test captured and fixed field values"""
+        self.assertEqual(DISTRICT.value("District: Cuddalore"), "Cuddalore")
+        self.assertEqual(DISTRICT.value("பெரம்பலூர்"), "Perambalur")
+        self.assertEqual(SURVEY_NUMBER.value("Survey No: 42 and 8"), "42")
+        self.assertEqual(SURVEY_NUMBER.value("block 8"), "8")
+
+    def test_patta_1(self):
+        """Test a patta 1 style document"""
+        data = self.parser.parse(PATTA_1)
+        self.assertEqual(data["district"], "கடலூர் வட்டம்")
+        self.assertEqual(data["patta_number"], "366")
+        self.assertEqual(data["owner_name"], "ஆனந்தபிரியா")
+        self.assertEqual(data["relationship"], "Wife of இராமச்சந்திரன்")
+        self.assertEqual(data["survey_number"], "8")
+        self.assertEqual(data["acres"], ["19.50", "1.08"])
+        self.assertEqual(data["signed_by"], "Annadurai P, Tahsildar")
+        self.assertEqual(data["signed_on"], "12/05/2019 10:11:12:PM")
+        self.assertEqual(data["reference_number"], "RTR1234/2019")
+
+    def test_patta_2(self):
+        """Test a patta 2 style document and its defaults"""
+        data = self.parser.parse(PATTA_2)
+        self.assertEqual(data["village"], "Perambalur (West)")
+        self.assertEqual(data["patta_number"], "2423")
+        self.assertEqual(data["owner_name"], "Duraisamy Nadar")
+        self.assertEqual(data["relationship"], "Son of Subbai Venkataraj")
+        self.assertEqual(data["survey_number"], "319")
+        self.assertEqual(data["sub_division"], "9B1")
+        self.assertEqual(data["extent"], ["0.28.1", "0.10"])
+        self.assertEqual(data["last_verified"], "10-10-2024 10:23:30 AM")
+        self.assertEqual(data["document_ref"], "2017/0105/16/018690 - 2017/16/03/001156SD")
+        self.assertEqual(data["verification_url"], "https://eservices.tn.gov.in")
+
+    def test_concurrent_parsing(self):
+        """Test that one parser gives the same results from many threads"""
+        documents = [PATTA_1, PATTA_2] * 50
+        expected = [self.parser.parse(text) for text in documents]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            self.assertEqual(list(pool.map(self.parser.parse, documents)), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test Progress Store
+Tests for the columnar /api/progress rollup engine
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dataset_registry import CsvDataset, DatasetRegistry
+from progress_store import ProgressStore
+
+COUNT_COLUMNS = ['ifr_total', 'ifr_granted', 'cr_total', 'cr_granted', 'cfr_total', 'cfr_granted']
+
+def reference_rollup(rows, scope, id_param):
+    """Row-by-row rollup matching the original api_progress implementation"""
+    filtered = rows
+    if scope in ('state', 'district', 'block', 'village') and id_param:
+        filtered = [row for row in rows if row[scope] == id_param]
+
+    aggregates = {name: sum(row[name] for row in filtered) for name in COUNT_COLUMNS}
+    pending = []
+    for row in filtered:
+        ifr = row['ifr_total'] - row['ifr_granted']
+        cr = row['cr_total'] - row['cr_granted']
+        cfr = row['cfr_total'] - row['cfr_granted']
+        if ifr + cr + cfr > 0:
+            pending.append({
+                "village": row['village'], "district": row['district'], "state": row['state'],
+                "total_pending": ifr + cr + cfr,
+                "ifr_pending": ifr, "cr_pending": cr, "cfr_pending": cfr
+            })
+    pending.sort(key=lambda x: x['total_pending'], reverse=True)
+    return aggregates, pending[:10], len(filtered)
+
+def make_dataset(rows):
+    fieldnames = ['state', 'district', 'block', 'village'] + COUNT_COLUMNS
+    return CsvDataset(fieldnames=fieldnames, rows=[], typed_rows=rows)
+
+class TestProgressStore(unittest.TestCase):
+    """Test vectorized rollups against the row-by-row reference"""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.rows = []
+        for i in range(400):
+            total = rng.randint(0, 6)
+            self.rows.append({
+                'state': rng.choice(['Odisha', 'Madhya Pradesh', 'Jharkhand']),
+                'district': f"D{rng.randint(0, 9)}",
+                'block': f"B{rng.randint(0, 29)}",
+                'village': f"V{i}",
+                'ifr_total': total, 'ifr_granted': rng.randint(0, total),
+                'cr_total': total, 'cr_granted': total,
+                'cfr_total': 2, 'cfr_granted': rng.randint(0, 2)
+            })
+        self.store = ProgressStore(make_dataset(self.rows))
+
+    def test_matches_reference_for_every_scope(self):
+        """Test aggregates, top pending (including ties) and unit counts"""
+        cases = [('state', ''), ('all', 'Odisha'), ('village', 'V5'), ('village', 'missing')]
+        for scope in ('state', 'district', 'block'):
+            for value in sorted({row[scope] for row in self.rows}):
+                cases.append((scope, value))
+
+        for scope, id_param in cases:
+            aggregates, top_pending, total_units = reference_rollup(self.rows, scope, id_param)
+            rollup = self.store.rollup(scope, id_param)
+            self.assertEqual(rollup['aggregates'], aggregates, (scope, id_param))
+            self.assertEqual(rollup['top_pending_villages'], top_pending, (scope, id_param))
+            self.assertEqual(rollup['total_units'], total_units, (scope, id_param))
+
+    def test_rates(self):
+        """Test grant rate rounding and zero totals"""
+        rows = [
+            {'state': 'Odisha', 'district': 'Koraput', 'block': 'K', 'village': 'A',
+             'ifr_total': 3, 'ifr_granted': 2, 'cr_total': 0, 'cr_granted': 0,
+             'cfr_total': 4, 'cfr_granted': 4}
+        ]
+        rollup = ProgressStore(make_dataset(rows)).rollup('state', 'Odisha')
+        self.assertEqual(rollup['rates'], {'ifr_rate': 66.7, 'cr_rate': 0, 'cfr_rate': 100.0})
+
+    def test_shipped_progress_csv(self):
+        """Test the store against the bundled progress_demo.csv"""
+        dataset = DatasetRegistry(str(PROJECT_ROOT)).load_csv('data/progress_demo.csv')
+        store = ProgressStore(dataset)
+        aggregates, top_pending, total_units = reference_rollup(dataset.typed_rows, 'state', '')
+
+        rollup = store.rollup('state', '')
+        self.assertEqual(rollup['aggregates'], aggregates)
+        self.assertEqual(rollup['top_pending_villages'], top_pending)
+        self.assertEqual(rollup['total_units'], total_units)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,15 +5,31 @@ Supports both PostGIS and SQLite backends
 """
 
 import os
+import gzip
 import math
 import json
+import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
-from flask import Blueprint, request, Response, jsonify
+from flask import Blueprint, request, Response, jsonify, redirect, url_for
 from PIL import Image, ImageDraw, ImageFont
+import numpy as np
 import io
 import base64
 
+from .mbtiles import MBTilesStore
+from .mvt import BUFFER as MVT_BUFFER, EXTENT as MVT_EXTENT, encode_tile
+from .spatial_index import TileDataSource
+from .clustering import CLUSTER_MAX_ZOOM, ClusterIndex
+from .projection import TileProjector
+
+try:
+    from http_cache import IMMUTABLE, REVALIDATE, make_etag, not_modified
+except ImportError:  # imported as webgis.tiles
+    from webgis.http_cache import IMMUTABLE, REVALIDATE, make_etag, not_modified
+
 logger = logging.getLogger(__name__)
 
 # Create blueprint
@@ -23,6 +39,21 @@ tile_bp = Blueprint('tiles', __name__, url_prefix='/api/tiles')
 TILE_SIZE = 256
 MAX_ZOOM = 18
 MIN_ZOOM = 1
+TILE_LAYERS = ('ifr', 'cr', 'cfr', 'villages', 'assets')
+PATTA_LAYERS = ('ifr', 'cr', 'cfr')
+CLUSTER_LAYERS = PATTA_LAYERS + ('all',)
+
+# Seconds a built cluster index is reused before it is rebuilt from the data source
+CLUSTER_REFRESH_INTERVAL = 60.0
+CLUSTER_MARKER_MAX_RADIUS = 20
+
+# Raster polygons are clipped this many pixels outside the tile, so the
+# clip edges (and their outlines) never show inside it
+RASTER_BUFFER = 4
+
+# Point tiles switch to dense stamping once the sprite pixels to scatter
+# exceed this multiple of the tile's pixel count
+DENSE_STAMP_RATIO = 0.5
 
 def deg2num(lat_deg: float, lon_deg: float, zoom: int) -> Tuple[int, int]:
     """Convert lat/lon to tile coordinates"""
@@ -54,6 +85,12 @@ class TileRenderer:
             'agriculture': (255, 215, 0, 150), # Gold
             'homestead': (255, 165, 0, 150) # Orange
         }
+        # Database-backed feature lookups; demo features are served while unset
+        self.data_source: Optional[TileDataSource] = None
+        self._clusters: Dict[str, Tuple[ClusterIndex, float]] = {}
+        self._cluster_lock = threading.Lock()
+        self._label_font = ImageFont.load_default()
+        self._sprites: Dict[Tuple[Tuple[int, ...], int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
     
     def render_patta_holders_tile(self, z: int, x: int, y: int, layer: str = 'ifr') -> Image.Image:
         """Render patta holders tile"""
@@ -64,29 +101,173 @@ class TileRenderer:
         # Get tile bounds
         lat_min, lon_min = num2deg(x, y + 1, z)
         lat_max, lon_max = num2deg(x + 1, y, z)
+        projector = TileProjector(z, x, y, TILE_SIZE)
+        
+        # Low zooms draw one marker per cluster (padded so markers on tile edges are not cut)
+        pad_lat = (lat_max - lat_min) * CLUSTER_MARKER_MAX_RADIUS / TILE_SIZE
+        pad_lon = (lon_max - lon_min) * CLUSTER_MARKER_MAX_RADIUS / TILE_SIZE
+        clusters = self.get_patta_clusters(layer, lat_min - pad_lat, lon_min - pad_lon,
+                                           lat_max + pad_lat, lon_max + pad_lon, z)
+        if clusters is not None:
+            self._draw_clusters(draw, clusters, layer, z, projector)
+            return tile
         
         # Query patta holders in tile bounds
         patta_holders = self._get_patta_holders_in_bounds(lat_min, lon_min, lat_max, lon_max, layer)
+        if not patta_holders:
+            return tile
         
-        # Render points
-        for holder in patta_holders:
-            # Convert lat/lon to pixel coordinates
-            px, py = self._latlon_to_pixel(
-                holder['latitude'], holder['longitude'],
-                lat_min, lon_min, lat_max, lon_max
-            )
-            
-            # Draw circle for patta holder
-            color = self.colors.get(layer, (255, 0, 0, 180))
-            radius = max(2, min(8, 12 - z))  # Size based on zoom level
+        lats = np.fromiter((holder['latitude'] for holder in patta_holders), dtype=np.float64, count=len(patta_holders))
+        lons = np.fromiter((holder['longitude'] for holder in patta_holders), dtype=np.float64, count=len(patta_holders))
+        
+        # Draw circle for each patta holder, sized by zoom level
+        color = self.colors.get(layer, (255, 0, 0, 180))
+        radius = max(2, min(8, 12 - z))
+        pixels = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+        self._stamp_points(pixels, lats, lons, projector, color, radius)
+        
+        return Image.fromarray(pixels)
+    
+    def _point_sprite(self, color: Tuple[int, ...], radius: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row offsets, column offsets and RGBA values of a circle marker's painted pixels
+        
+        The circle is drawn once with PIL (fill plus white outline) so
+        stamped markers look exactly like individually drawn ones.
+        """
+        key = (tuple(color), radius)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            size = 2 * radius + 1
+            image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            ImageDraw.Draw(image).ellipse([0, 0, size - 1, size - 1], fill=color, outline=(255, 255, 255, 255))
+            rgba = np.asarray(image)
+            rows, cols = np.nonzero(rgba[:, :, 3])
+            sprite = self._sprites[key] = (rows - radius, cols - radius, rgba[rows, cols])
+        return sprite
+    
+    def _stamp_points(self, pixels: np.ndarray, lats: np.ndarray, lons: np.ndarray,
+                      projector: TileProjector, color: Tuple[int, ...], radius: int):
+        """Project points with array math and stamp a circle sprite at each into ``pixels``
+        
+        Later points overwrite earlier ones, as with successive draw calls.
+        Sparse tiles scatter every sprite pixel of every point; dense tiles
+        instead take, per tile pixel, the last point whose sprite covers it,
+        which costs one pass over the tile per sprite pixel however many
+        points there are.
+        """
+        height, width = pixels.shape[:2]
+        px, py = projector.project_many(lons, lats)
+        px, py = px.astype(np.int64), py.astype(np.int64)
+        
+        d_rows, d_cols, values = self._point_sprite(color, radius)
+        if len(px) * len(values) > DENSE_STAMP_RATIO * height * width:
+            self._stamp_dense(pixels, px, py, d_rows, d_cols, values, radius)
+            return
+        
+        rows = (py[:, None] + d_rows[None, :]).ravel()
+        cols = (px[:, None] + d_cols[None, :]).ravel()
+        inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+        
+        # Flat-index assignment follows point order, so the last point stamped wins
+        words = np.ascontiguousarray(values).view(np.uint32).ravel()
+        pixels.view(np.uint32).reshape(-1)[rows[inside] * width + cols[inside]] = np.tile(words, len(px))[inside]
+    
+    @staticmethod
+    def _stamp_dense(pixels: np.ndarray, px: np.ndarray, py: np.ndarray, d_rows: np.ndarray,
+                     d_cols: np.ndarray, values: np.ndarray, radius: int):
+        """Stamp many points by shifting a grid of point codes once per sprite pixel"""
+        height, width = pixels.shape[:2]
+        stride = width + 2 * radius
+        sprite_size = len(values)
+        visible = np.nonzero((px >= -radius) & (px < width + radius) &
+                             (py >= -radius) & (py < height + radius))[0]
+        code_type = np.int32 if (len(px) + 1) * sprite_size < 2 ** 31 else np.int64
+        
+        # (id + 1) * sprite_size at each point centre in a grid padded by the
+        # radius, 0 where there is none; later points overwrite earlier ones
+        centres = np.zeros((height + 2 * radius) * stride + 2 * radius, dtype=code_type)
+        centres[(py[visible] + radius) * stride + px[visible] + radius] = (visible + 1) * sprite_size
+        
+        # Tile pixel (r, c) takes sprite pixel k from a centre at (r - dr, c - dc).
+        # Rows keep the padded stride so each shift is one contiguous slice;
+        # adding k keeps codes unique and the maximum is the last point drawn.
+        owner = np.zeros(height * stride, dtype=code_type)
+        shifted = np.empty_like(owner)
+        for k, (d_row, d_col) in enumerate(zip(d_rows, d_cols)):
+            start = (radius - d_row) * stride + radius - d_col
+            np.add(centres[start:start + height * stride], k, out=shifted)
+            np.maximum(owner, shifted, out=owner)
+        owner = owner.reshape(height, stride)[:, :width]
+        
+        # Write whole RGBA pixels as 32-bit words
+        words = np.ascontiguousarray(values).view(np.uint32).ravel()
+        np.copyto(pixels.view(np.uint32)[:, :, 0], words[owner % sprite_size], where=owner >= sprite_size)
+    
+    def _draw_clusters(self, draw: ImageDraw.ImageDraw, clusters: List[Dict], layer: str, z: int,
+                       projector: TileProjector):
+        """Draw cluster markers sized by count, labelled with their counts"""
+        color = self.colors.get(layer, (255, 0, 0, 180))
+        for cluster in clusters:
+            px, py = projector.project(cluster['longitude'], cluster['latitude'])
+            px, py = int(px), int(py)
+            count = cluster['count']
+            if count == 1:
+                radius = max(2, min(8, 12 - z))
+            else:
+                radius = min(CLUSTER_MARKER_MAX_RADIUS, 8 + 2 * int(math.log2(count)))
             
             draw.ellipse(
                 [px - radius, py - radius, px + radius, py + radius],
                 fill=color,
                 outline=(255, 255, 255, 255)
             )
+            
+            if count > 1:
+                label = str(count) if count < 1000 else f"{count // 1000}k"
+                left, top, right, bottom = draw.textbbox((0, 0), label, font=self._label_font)
+                draw.text(
+                    (px - (right - left) / 2 - left, py - (bottom - top) / 2 - top),
+                    label, fill=(255, 255, 255, 255), font=self._label_font
+                )
+    
+    def cluster_index(self, layer: str) -> Optional[ClusterIndex]:
+        """Point clusters of a patta layer (``all`` for every claim type)
         
-        return tile
+        Built from the data source and reused for CLUSTER_REFRESH_INTERVAL
+        seconds; None while tiles are served from demo features.
+        """
+        if self.data_source is None or layer not in CLUSTER_LAYERS:
+            return None
+        
+        with self._cluster_lock:
+            cached = self._clusters.get(layer)
+            if cached is not None and time.monotonic() - cached[1] < CLUSTER_REFRESH_INTERVAL:
+                return cached[0]
+            
+            layers = PATTA_LAYERS if layer == 'all' else (layer,)
+            records = [record for name in layers for record in self.data_source.records(name)]
+            index = ClusterIndex().load(records)
+            self._clusters[layer] = (index, time.monotonic())
+            return index
+    
+    def clear_clusters(self, layer: Optional[str] = None):
+        """Drop built cluster indexes so the next request rebuilds them"""
+        with self._cluster_lock:
+            if layer is None:
+                self._clusters.clear()
+            else:
+                self._clusters.pop(layer, None)
+                self._clusters.pop('all', None)
+    
+    def get_patta_clusters(self, layer: str, lat_min: float, lon_min: float,
+                           lat_max: float, lon_max: float, zoom: int) -> Optional[List[Dict]]:
+        """Clusters to draw at a clustered zoom, or None to draw individual points"""
+        if zoom > CLUSTER_MAX_ZOOM:
+            return None
+        index = self.cluster_index(layer)
+        if index is None:
+            return None
+        return index.get_clusters(lon_min, lat_min, lon_max, lat_max, zoom)
     
     def render_village_boundaries_tile(self, z: int, x: int, y: int) -> Image.Image:
         """Render village boundaries tile"""
@@ -99,19 +280,15 @@ class TileRenderer:
         
         # Query villages in tile bounds
         villages = self._get_villages_in_bounds(lat_min, lon_min, lat_max, lon_max)
+        projector = TileProjector(z, x, y, TILE_SIZE)
         
         # Render village boundaries
         for village in villages:
             if village.get('geometry'):
                 # Convert polygon coordinates to pixel coordinates
-                polygon_pixels = self._polygon_to_pixels(
-                    village['geometry'], lat_min, lon_min, lat_max, lon_max
-                )
-                
-                if polygon_pixels:
-                    # Draw polygon
-                    color = self.colors['village']
-                    draw.polygon(polygon_pixels, fill=color, outline=(255, 255, 255, 255))
+                for rings in self._polygon_to_pixels(village['geometry'], projector):
+                    self._fill_polygon(tile, draw, rings, self.colors['village'],
+                                       outline=(255, 255, 255, 255))
         
         return tile
     
@@ -126,63 +303,126 @@ class TileRenderer:
         
         # Query asset mapping data in tile bounds
         assets = self._get_asset_mapping_in_bounds(lat_min, lon_min, lat_max, lon_max)
+        projector = TileProjector(z, x, y, TILE_SIZE)
         
         # Render asset polygons
         for asset in assets:
             if asset.get('geometry'):
-                polygon_pixels = self._polygon_to_pixels(
-                    asset['geometry'], lat_min, lon_min, lat_max, lon_max
-                )
+                # Determine color based on land use
+                land_use = asset.get('land_use', 'forest')
+                color = self.colors.get(land_use, self.colors['forest'])
                 
-                if polygon_pixels:
-                    # Determine color based on land use
-                    land_use = asset.get('land_use', 'forest')
-                    color = self.colors.get(land_use, self.colors['forest'])
-                    
-                    draw.polygon(polygon_pixels, fill=color)
+                for rings in self._polygon_to_pixels(asset['geometry'], projector):
+                    self._fill_polygon(tile, draw, rings, color)
         
         return tile
     
-    def _latlon_to_pixel(self, lat: float, lon: float, lat_min: float, lon_min: float, 
-                        lat_max: float, lon_max: float) -> Tuple[int, int]:
-        """Convert lat/lon to pixel coordinates within tile"""
-        x = int((lon - lon_min) / (lon_max - lon_min) * TILE_SIZE)
-        y = int((lat_max - lat) / (lat_max - lat_min) * TILE_SIZE)
-        return (x, y)
-    
-    def _polygon_to_pixels(self, geometry: Dict, lat_min: float, lon_min: float, 
-                          lat_max: float, lon_max: float) -> List[Tuple[int, int]]:
-        """Convert polygon geometry to pixel coordinates"""
-        if geometry.get('type') != 'Polygon':
-            return []
+    def has_data_in_bounds(self, layer: str, lat_min: float, lon_min: float,
+                           lat_max: float, lon_max: float) -> bool:
+        """Whether a layer has any features inside the bounds (used to skip empty tiles)"""
+        if layer in ['ifr', 'cr', 'cfr']:
+            return bool(self._get_patta_holders_in_bounds(lat_min, lon_min, lat_max, lon_max, layer))
+        if layer == 'villages':
+            return bool(self._get_villages_in_bounds(lat_min, lon_min, lat_max, lon_max))
+        if layer == 'assets':
+            return bool(self._get_asset_mapping_in_bounds(lat_min, lon_min, lat_max, lon_max))
+        return False
+    
+    def get_features_in_bounds(self, layer: str, lat_min: float, lon_min: float,
+                               lat_max: float, lon_max: float, zoom: Optional[int] = None) -> List[Dict]:
+        """GeoJSON features of a layer within the bounds, for vector tiles
         
-        coordinates = geometry.get('coordinates', [])
-        if not coordinates:
-            return []
+        With a ``zoom`` at which patta holders are clustered, each feature
+        is a cluster carrying its count, area sum and per-claim-type counts.
+        """
+        clusters = None
+        if layer in ['ifr', 'cr', 'cfr'] and zoom is not None:
+            clusters = self.get_patta_clusters(layer, lat_min, lon_min, lat_max, lon_max, zoom)
+        if clusters is not None:
+            features = []
+            for cluster in clusters:
+                properties = dict(cluster.get('properties') or {})
+                properties.update({'cluster': cluster['cluster'], 'count': cluster['count'],
+                                   'area_hectares': cluster['area_hectares']})
+                properties.update({f"count_{claim_type}": count
+                                   for claim_type, count in cluster['claim_types'].items()})
+                features.append({
+                    'type': 'Feature',
+                    'id': cluster['id'],
+                    'geometry': {'type': 'Point', 'coordinates': [cluster['longitude'], cluster['latitude']]},
+                    'properties': properties
+                })
+            return features
         
-        # Get exterior ring
-        exterior_ring = coordinates[0]
-        pixels = []
+        if layer in ['ifr', 'cr', 'cfr']:
+            return [
+                {
+                    'type': 'Feature',
+                    'geometry': {'type': 'Point', 'coordinates': [holder['longitude'], holder['latitude']]},
+                    'properties': {key: value for key, value in holder.items()
+                                   if key not in ('latitude', 'longitude')}
+                }
+                for holder in self._get_patta_holders_in_bounds(lat_min, lon_min, lat_max, lon_max, layer)
+            ]
+        if layer == 'villages':
+            records = self._get_villages_in_bounds(lat_min, lon_min, lat_max, lon_max)
+        elif layer == 'assets':
+            records = self._get_asset_mapping_in_bounds(lat_min, lon_min, lat_max, lon_max)
+        else:
+            return []
+        return [
+            {
+                'type': 'Feature',
+                'geometry': record['geometry'],
+                'properties': {key: value for key, value in record.items() if key != 'geometry'}
+            }
+            for record in records if record.get('geometry')
+        ]
+    
+    def _polygon_to_pixels(self, geometry: Dict, projector: TileProjector) -> List[List[List[int]]]:
+        """Convert (multi)polygon geometry to pixel coordinates
         
-        for coord in exterior_ring:
-            if len(coord) >= 2:
-                lon, lat = coord[0], coord[1]
-                px, py = self._latlon_to_pixel(lat, lon, lat_min, lon_min, lat_max, lat_max)
-                pixels.append((px, py))
+        Returns one list of rings per polygon (exterior first, then holes),
+        each ring a flat ``[x0, y0, x1, y1, ...]`` list clipped to the tile
+        plus RASTER_BUFFER.
+        """
+        return [
+            [np.floor(ring).astype(np.int64).ravel().tolist() for ring in rings]
+            for rings in projector.project_polygons(geometry, RASTER_BUFFER)
+        ]
+    
+    @staticmethod
+    def _fill_polygon(tile: Image.Image, draw: ImageDraw.ImageDraw, rings: List[List[int]],
+                      fill: Tuple[int, ...], outline: Optional[Tuple[int, ...]] = None):
+        """Draw a polygon; holes are cut out through a mask"""
+        if len(rings) == 1:
+            draw.polygon(rings[0], fill=fill, outline=outline)
+            return
         
-        return pixels
+        mask = Image.new('L', tile.size, 0)
+        mask_draw = ImageDraw.Draw(mask)
+        mask_draw.polygon(rings[0], fill=255)
+        for hole in rings[1:]:
+            mask_draw.polygon(hole, fill=0)
+        tile.paste(fill, None, mask)
+        if outline is not None:
+            for ring in rings:
+                draw.polygon(ring, outline=outline)
     
     def _get_patta_holders_in_bounds(self, lat_min: float, lon_min: float, 
                                    lat_max: float, lon_max: float, layer: str) -> List[Dict]:
         """Get patta holders within tile bounds"""
-        # This would query the database in a real implementation
-        # For demo, return sample data
+        if self.data_source is not None:
+            return self.data_source.query(layer, lat_min, lon_min, lat_max, lon_max)
+        
+        # Demo sample data until configure_tile_data() attaches the database
         return [
             {
                 'latitude': (lat_min + lat_max) / 2,
                 'longitude': (lon_min + lon_max) / 2,
                 'claim_type': layer.upper(),
                 'holder_name': 'Sample Holder',
+                'status': 'granted',
                 'area_hectares': 2.5
             }
         ]
@@ -190,8 +430,10 @@ class TileRenderer:
     def _get_villages_in_bounds(self, lat_min: float, lon_min: float, 
                               lat_max: float, lon_max: float) -> List[Dict]:
         """Get villages within tile bounds"""
-        # This would query the database in a real implementation
-        # For demo, return sample data
+        if self.data_source is not None:
+            return self.data_source.query('villages', lat_min, lon_min, lat_max, lon_max)
+        
+        # Demo sample data until configure_tile_data() attaches the database
         return [
             {
                 'name': 'Sample Village',
@@ -211,8 +453,10 @@ class TileRenderer:
     def _get_asset_mapping_in_bounds(self, lat_min: float, lon_min: float, 
                                     lat_max: float, lon_max: float) -> List[Dict]:
         """Get asset mapping data within tile bounds"""
-        # This would query the database in a real implementation
-        # For demo, return sample data
+        if self.data_source is not None:
+            return self.data_source.query('assets', lat_min, lon_min, lat_max, lon_max)
+        
+        # Demo sample data until configure_tile_data() attaches the database
         return [
             {
                 'land_use': 'forest',
@@ -232,49 +476,77 @@ class TileRenderer:
 # Global tile renderer
 tile_renderer = TileRenderer()
 
+def configure_tile_data(db_manager) -> bool:
+    """Render tiles from the database's spatial tables instead of demo features"""
+    data_source = TileDataSource(db_manager)
+    if not data_source.available():
+        logger.info("No spatial tables found, tiles keep using demo features")
+        return False
+    
+    data_source.on_change = layers_changed
+    tile_renderer.data_source = data_source
+    logger.info(f"Tiles backed by the database ({'PostGIS' if db_manager.is_postgis else 'grid index'})")
+    return True
+
 @tile_bp.route('/<layer>/<int:z>/<int:x>/<int:y>.png')
 def get_tile(layer: str, z: int, x: int, y: int):
     """Get map tile"""
-    try:
-        # Validate zoom level
-        if z < MIN_ZOOM or z > MAX_ZOOM:
-            return Response("Invalid zoom level", status=400)
-        
-        # Render tile based on layer type
-        if layer in ['ifr', 'cr', 'cfr']:
-            tile = tile_renderer.render_patta_holders_tile(z, x, y, layer)
-        elif layer == 'villages':
-            tile = tile_renderer.render_village_boundaries_tile(z, x, y)
-        elif layer == 'assets':
-            tile = tile_renderer.render_asset_mapping_tile(z, x, y)
-        else:
-            return Response("Invalid layer", status=400)
-        
-        # Convert to PNG bytes
-        img_buffer = io.BytesIO()
-        tile.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        return Response(
-            img_buffer.getvalue(),
-            mimetype='image/png',
-            headers={
-                'Cache-Control': 'public, max-age=3600',  # Cache for 1 hour
-                'Access-Control-Allow-Origin': '*'
-            }
-        )
+    # Validate zoom level
+    if z < MIN_ZOOM or z > MAX_ZOOM:
+        return Response("Invalid zoom level", status=400)
+    if layer not in TILE_LAYERS:
+        return Response("Invalid layer", status=400)
     
+    try:
+        return tile_response(layer, 'png', z, x, y, tile_version(layer), REVALIDATE)
     except Exception as e:
         logger.error(f"Tile rendering error: {e}")
         return Response("Tile rendering failed", status=500)
 
+@tile_bp.route('/<layer>/v<int:version>/<int:z>/<int:x>/<int:y>.<any(png, mvt):fmt>')
+def get_versioned_tile(layer: str, version: int, z: int, x: int, y: int, fmt: str):
+    """Get map tile at a layer data version
+    
+    The URL changes whenever the layer is invalidated, so the tile is
+    served as immutable. Requests for an outdated version are redirected
+    to the current one.
+    """
+    if z < MIN_ZOOM or z > MAX_ZOOM:
+        return Response("Invalid zoom level", status=400)
+    if layer not in TILE_LAYERS:
+        return Response("Invalid layer", status=400)
+    
+    current = tile_version(layer)
+    if current is None:
+        cache_control = REVALIDATE
+    elif version != current:
+        response = redirect(url_for('tiles.get_versioned_tile', layer=layer, version=current,
+                                    z=z, x=x, y=y, fmt=fmt))
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    else:
+        cache_control = IMMUTABLE
+    
+    try:
+        return tile_response(layer, fmt, z, x, y, current, cache_control)
+    except Exception as e:
+        logger.error(f"Versioned tile error for {layer}/v{version}/{z}/{x}/{y}.{fmt}: {e}")
+        return Response("Tile rendering failed", status=500)
+
 @tile_bp.route('/info')
 def get_tile_info():
-    """Get tile server information"""
-    return jsonify({
+    """Get tile server information
+    
+    ``versions`` changes whenever a layer is invalidated, so this response
+    is always revalidated; the versioned tile URLs it points to are not.
+    """
+    response = jsonify({
         'tile_size': TILE_SIZE,
         'min_zoom': MIN_ZOOM,
         'max_zoom': MAX_ZOOM,
+        'formats': ['png', 'mvt'],
+        'versions': {layer: tile_version(layer) for layer in TILE_LAYERS},
+        'tile_url': f"{tile_bp.url_prefix}/{{layer}}/v{{version}}/{{z}}/{{x}}/{{y}}.{{format}}",
         'layers': {
             'ifr': 'Individual Forest Rights',
             'cr': 'Community Rights',
@@ -285,6 +557,8 @@ def get_tile_info():
         'attribution': 'FRA-SENTINEL',
         'bounds': [-180, -85, 180, 85]
     })
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @tile_bp.route('/<layer>/bounds')
 def get_layer_bounds(layer: str):
@@ -300,141 +574,372 @@ def get_layer_bounds(layer: str):
 
 # Tile cache management
 class TileCache:
-    """Simple in-memory tile cache"""
+    """Thread-safe in-memory LRU tile cache with a byte budget
+    
+    Tiles are kept in an OrderedDict in recency order, so get/set and
+    eviction are O(1). The cache is bounded by total tile bytes
+    (``max_bytes``) rather than tile count, optionally by entry count
+    (``max_size``), and each layer can be given its own byte quota.
+    """
     
-    def __init__(self, max_size: int = 1000):
-        self.cache: Dict[str, bytes] = {}
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_size: Optional[int] = None,
+                 layer_quotas: Optional[Dict[str, int]] = None):
+        self.cache: 'OrderedDict[str, bytes]' = OrderedDict()
+        self.max_bytes = max_bytes
         self.max_size = max_size
-        self.access_times: Dict[str, float] = {}
+        self.layer_quotas: Dict[str, int] = dict(layer_quotas or {})
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._layer_entries: Dict[str, 'OrderedDict[str, None]'] = {}
+        self._layer_bytes: Dict[str, int] = {}
+        self._key_layers: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def layer_for_key(key: str) -> str:
+        """Layer name of a ``<layer>_<z>_<x>_<y>`` cache key"""
+        return key.split('_', 1)[0]
     
     def get(self, key: str) -> Optional[bytes]:
         """Get tile from cache"""
-        if key in self.cache:
-            self.access_times[key] = time.time()
-            return self.cache[key]
-        return None
+        with self._lock:
+            value = self.cache.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            
+            self.cache.move_to_end(key)
+            self._layer_entries[self._key_layers[key]].move_to_end(key)
+            self.hits += 1
+            return value
     
-    def set(self, key: str, value: bytes):
+    def set(self, key: str, value: bytes, layer: Optional[str] = None):
         """Set tile in cache"""
-        if len(self.cache) >= self.max_size:
-            self._evict_oldest()
-        
-        self.cache[key] = value
-        self.access_times[key] = time.time()
-    
-    def _evict_oldest(self):
-        """Evict oldest accessed tile"""
-        if not self.access_times:
+        layer = layer or self.layer_for_key(key)
+        size = len(value)
+        quota = self.layer_quotas.get(layer)
+        if size > self.max_bytes or (quota is not None and size > quota):
             return
         
-        oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-        del self.cache[oldest_key]
-        del self.access_times[oldest_key]
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
+            
+            self.cache[key] = value
+            self._key_layers[key] = layer
+            self._layer_entries.setdefault(layer, OrderedDict())[key] = None
+            self._layer_bytes[layer] = self._layer_bytes.get(layer, 0) + size
+            self.current_bytes += size
+            
+            if quota is not None:
+                entries = self._layer_entries[layer]
+                while self._layer_bytes[layer] > quota:
+                    self._evict(next(iter(entries)))
+            
+            while self.current_bytes > self.max_bytes or (self.max_size is not None and len(self.cache) > self.max_size):
+                self._evict(next(iter(self.cache)))
+    
+    def delete_layer(self, layer: str) -> int:
+        """Drop every cached tile of a layer"""
+        with self._lock:
+            keys = list(self._layer_entries.get(layer, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+    
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self._layer_entries.clear()
+            self._layer_bytes.clear()
+            self._key_layers.clear()
+            self.current_bytes = 0
+    
+    def _remove(self, key: str):
+        """Unlink a key from the global and layer orders (caller holds the lock)"""
+        size = len(self.cache.pop(key))
+        layer = self._key_layers.pop(key)
+        del self._layer_entries[layer][key]
+        self._layer_bytes[layer] -= size
+        self.current_bytes -= size
+    
+    def _evict(self, key: str):
+        self._remove(key)
+        self.evictions += 1
+    
+    def get_stats(self) -> Dict:
+        """Hit/miss/eviction counters and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.cache),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'layers': {
+                    layer: {'entries': len(self._layer_entries[layer]), 'bytes': layer_bytes,
+                            'quota': self.layer_quotas.get(layer)}
+                    for layer, layer_bytes in self._layer_bytes.items()
+                }
+            }
 
 # Global tile cache
-tile_cache = TileCache()
+tile_cache = TileCache(max_bytes=int(os.getenv('TILE_CACHE_BYTES', 64 * 1024 * 1024)))
+
+@tile_bp.route('/cache/stats')
+def get_tile_cache_stats():
+    """Get tile cache statistics"""
+    return jsonify(tile_cache.get_stats())
+
+# Persistent L2 tile store shared by all processes
+tile_store = MBTilesStore(os.getenv(
+    'TILE_STORE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tiles')
+))
+
+# Last layer version each process served, to notice bumps made by other processes
+_seen_versions: Dict[str, int] = {}
+
+def tile_version(layer: str) -> Optional[int]:
+    """Current data version of a layer; None when the tile store is unavailable"""
+    try:
+        version = tile_store.layer_version(layer)
+    except Exception as e:
+        logger.warning(f"Tile store unavailable for {layer}: {e}")
+        return None
+    
+    seen = _seen_versions.get(layer)
+    _seen_versions[layer] = version
+    if seen is not None and seen != version and tile_renderer.data_source is not None:
+        # Bumped elsewhere: index the new rows before rendering at the new version
+        tile_renderer.data_source.refresh(force=True)
+    return version
+
+def tile_etag(layer: str, representation: str, z: int, x: int, y: int, version: int) -> str:
+    """ETag of a tile at a layer data version, known without rendering the tile"""
+    return make_etag(f"{layer}/{z}/{x}/{y}.{representation}@v{version}")
+
+def tile_response(layer: str, fmt: str, z: int, x: int, y: int, version: Optional[int],
+                  cache_control: str) -> Response:
+    """PNG or vector tile response with an ETag, or a 304 when the client's copy is current
+    
+    With a known layer version the ETag is derived from it, so a
+    revalidation is answered before the tile is looked up or rendered.
+    Without one the ETag falls back to a hash of the tile bytes.
+    """
+    headers = {'Access-Control-Allow-Origin': '*'}
+    representation = fmt
+    if fmt == 'mvt':
+        headers['Vary'] = 'Accept-Encoding'
+        gzipped = request.accept_encodings['gzip'] > 0
+        if gzipped:
+            representation = 'mvt.gz'
+    
+    etag = None
+    if version is not None:
+        etag = tile_etag(layer, representation, z, x, y, version)
+        response = not_modified(etag, cache_control, headers)
+        if response is not None:
+            return response
+    
+    if fmt == 'mvt':
+        tile_bytes, cache_status = get_vector_tile_bytes(layer, z, x, y)
+        if gzipped:
+            headers['Content-Encoding'] = 'gzip'
+        else:
+            tile_bytes = gzip.decompress(tile_bytes)
+        mimetype = 'application/vnd.mapbox-vector-tile'
+    else:
+        tile_bytes, cache_status = get_tile_bytes(layer, z, x, y)
+        mimetype = 'image/png'
+    
+    if etag is None:
+        etag = make_etag(tile_bytes)
+        response = not_modified(etag, cache_control, headers)
+        if response is not None:
+            return response
+    
+    headers['X-Cache'] = cache_status
+    response = Response(tile_bytes, mimetype=mimetype, headers=headers)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def render_tile_png(layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+    """Render a tile to PNG bytes; None for an unknown layer"""
+    if layer in ['ifr', 'cr', 'cfr']:
+        tile = tile_renderer.render_patta_holders_tile(z, x, y, layer)
+    elif layer == 'villages':
+        tile = tile_renderer.render_village_boundaries_tile(z, x, y)
+    elif layer == 'assets':
+        tile = tile_renderer.render_asset_mapping_tile(z, x, y)
+    else:
+        return None
+    
+    img_buffer = io.BytesIO()
+    tile.save(img_buffer, format='PNG')
+    return img_buffer.getvalue()
+
+def get_tile_bytes(layer: str, z: int, x: int, y: int) -> Tuple[Optional[bytes], str]:
+    """Tile PNG from L1 (memory), L2 (MBTiles) or a fresh render
+    
+    Returns the bytes and where they came from: ``HIT``, ``HIT-DISK`` or
+    ``MISS``. L1 keys carry the layer version so tiles cached by this
+    process before another process invalidated the layer are not served.
+    """
+    version = tile_version(layer)
+    cache_key = f"{layer}_{z}_{x}_{y}_v{version}"
+    tile_bytes = tile_cache.get(cache_key)
+    if tile_bytes is not None:
+        return tile_bytes, 'HIT'
+    
+    if version is not None:
+        try:
+            tile_bytes = tile_store.get(layer, z, x, y)
+        except Exception as e:
+            logger.warning(f"Tile store read failed for {layer}/{z}/{x}/{y}: {e}")
+        if tile_bytes is not None:
+            tile_cache.set(cache_key, tile_bytes, layer)
+            return tile_bytes, 'HIT-DISK'
+    
+    tile_bytes = render_tile_png(layer, z, x, y)
+    if tile_bytes is None:
+        return None, 'MISS'
+    
+    tile_cache.set(cache_key, tile_bytes, layer)
+    if version is not None:
+        try:
+            tile_store.put(layer, z, x, y, tile_bytes)
+        except Exception as e:
+            logger.warning(f"Tile store write failed for {layer}/{z}/{x}/{y}: {e}")
+    return tile_bytes, 'MISS'
+
+def render_tile_mvt(layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+    """Encode a layer's features around a tile as a Mapbox Vector Tile; None for an unknown layer"""
+    if layer not in TILE_LAYERS:
+        return None
+    
+    # Query the tile plus its buffer so clipped edges line up across tiles
+    margin = MVT_BUFFER / MVT_EXTENT
+    lat_min, lon_min = num2deg(x - margin, y + 1 + margin, z)
+    lat_max, lon_max = num2deg(x + 1 + margin, y - margin, z)
+    features = tile_renderer.get_features_in_bounds(layer, lat_min, lon_min, lat_max, lon_max, zoom=z)
+    return encode_tile({layer: features}, z, x, y)
+
+def get_vector_tile_bytes(layer: str, z: int, x: int, y: int) -> Tuple[Optional[bytes], str]:
+    """Gzipped vector tile from the L1 cache or a fresh encode, with its X-Cache status"""
+    version = tile_version(layer)
+    cache_key = f"{layer}_{z}_{x}_{y}_v{version}.mvt"
+    tile_bytes = tile_cache.get(cache_key)
+    if tile_bytes is not None:
+        return tile_bytes, 'HIT'
+    
+    tile_bytes = render_tile_mvt(layer, z, x, y)
+    if tile_bytes is None:
+        return None, 'MISS'
+    
+    tile_bytes = gzip.compress(tile_bytes)
+    tile_cache.set(cache_key, tile_bytes, layer)
+    return tile_bytes, 'MISS'
+
+@tile_bp.route('/<layer>/<int:z>/<int:x>/<int:y>.mvt')
+def get_vector_tile(layer: str, z: int, x: int, y: int):
+    """Get vector tile (Mapbox Vector Tile 2.1)
+    
+    Features keep their attributes (claim type, status, area, ...) so
+    clients can style and filter without requesting new tiles.
+    """
+    if layer not in TILE_LAYERS:
+        return Response("Invalid layer", status=400)
+    if z < MIN_ZOOM or z > MAX_ZOOM:
+        return Response("Invalid zoom level", status=400)
+    
+    try:
+        return tile_response(layer, 'mvt', z, x, y, tile_version(layer), REVALIDATE)
+    except Exception as e:
+        logger.error(f"Vector tile encoding error: {e}")
+        return Response("Tile encoding failed", status=500)
+
+def invalidate_layer(layer: str) -> int:
+    """Invalidate a layer's cached tiles after its data changed"""
+    version = tile_store.invalidate(layer)
+    tile_cache.delete_layer(layer)
+    tile_renderer.clear_clusters(layer)
+    return version
+
+def layers_changed(marks: Dict[str, int]):
+    """Invalidate layers whose source tables gained rows (TileDataSource.on_change)
+    
+    ``marks`` maps each layer to its highest row id. Only the first process
+    to see a mark bumps the layer version; the rest just drop their clusters.
+    """
+    for layer, mark in marks.items():
+        tile_renderer.clear_clusters(layer)
+        try:
+            bumped = tile_store.advance(layer, mark)
+        except Exception as e:
+            logger.warning(f"Tile store unavailable for {layer}: {e}")
+            continue
+        if bumped is not None:
+            tile_cache.delete_layer(layer)
 
 # Enhanced tile endpoint with caching
 @tile_bp.route('/cached/<layer>/<int:z>/<int:x>/<int:y>.png')
 def get_cached_tile(layer: str, z: int, x: int, y: int):
     """Get cached map tile"""
-    cache_key = f"{layer}_{z}_{x}_{y}"
-    
-    # Check cache first
-    cached_tile = tile_cache.get(cache_key)
-    if cached_tile:
-        return Response(
-            cached_tile,
-            mimetype='image/png',
-            headers={
-                'Cache-Control': 'public, max-age=3600',
-                'Access-Control-Allow-Origin': '*',
-                'X-Cache': 'HIT'
-            }
-        )
+    if layer not in TILE_LAYERS:
+        return Response("Invalid layer", status=400)
     
-    # Generate tile
     try:
-        if layer in ['ifr', 'cr', 'cfr']:
-            tile = tile_renderer.render_patta_holders_tile(z, x, y, layer)
-        elif layer == 'villages':
-            tile = tile_renderer.render_village_boundaries_tile(z, x, y)
-        elif layer == 'assets':
-            tile = tile_renderer.render_asset_mapping_tile(z, x, y)
-        else:
-            return Response("Invalid layer", status=400)
-        
-        # Convert to PNG bytes
-        img_buffer = io.BytesIO()
-        tile.save(img_buffer, format='PNG')
-        tile_bytes = img_buffer.getvalue()
-        
-        # Cache the tile
-        tile_cache.set(cache_key, tile_bytes)
-        
-        return Response(
-            tile_bytes,
-            mimetype='image/png',
-            headers={
-                'Cache-Control': 'public, max-age=3600',
-                'Access-Control-Allow-Origin': '*',
-                'X-Cache': 'MISS'
-            }
-        )
-    
+        return tile_response(layer, 'png', z, x, y, tile_version(layer), REVALIDATE)
     except Exception as e:
         logger.error(f"Cached tile rendering error: {e}")
         return Response("Tile rendering failed", status=500)
 
+@tile_bp.route('/<layer>/invalidate', methods=['POST'])
+def invalidate_layer_tiles(layer: str):
+    """Drop cached tiles of a layer after its data changed"""
+    if layer not in TILE_LAYERS:
+        return Response("Invalid layer", status=400)
+    
+    return jsonify({'layer': layer, 'version': invalidate_layer(layer)})
+
 # Tile generation utilities
-def generate_tiles_for_layer(layer: str, min_zoom: int = 1, max_zoom: int = 10):
-    """Generate tiles for a layer at multiple zoom levels"""
-    generated_count = 0
-    
-    for z in range(min_zoom, max_zoom + 1):
-        # Calculate tile range for India bounds
-        x_min, y_min = deg2num(37.0, 68.0, z)  # North-east
-        x_max, y_max = deg2num(6.0, 97.0, z)   # South-west
-        
-        for x in range(x_min, x_max + 1):
-            for y in range(y_min, y_max + 1):
-                try:
-                    cache_key = f"{layer}_{z}_{x}_{y}"
-                    
-                    # Generate tile
-                    if layer in ['ifr', 'cr', 'cfr']:
-                        tile = tile_renderer.render_patta_holders_tile(z, x, y, layer)
-                    elif layer == 'villages':
-                        tile = tile_renderer.render_village_boundaries_tile(z, x, y)
-                    elif layer == 'assets':
-                        tile = tile_renderer.render_asset_mapping_tile(z, x, y)
-                    else:
-                        continue
-                    
-                    # Convert to PNG and cache
-                    img_buffer = io.BytesIO()
-                    tile.save(img_buffer, format='PNG')
-                    tile_bytes = img_buffer.getvalue()
-                    
-                    tile_cache.set(cache_key, tile_bytes)
-                    generated_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error generating tile {layer}/{z}/{x}/{y}: {e}")
-    
-    logger.info(f"Generated {generated_count} tiles for layer {layer}")
-    return generated_count
+def generate_tiles_for_layer(layer: str, min_zoom: int = 1, max_zoom: int = 10,
+                             workers: Optional[int] = None, progress_callback=None):
+    """Generate tiles for a layer at multiple zoom levels into the tile store
+    
+    Runs the parallel, resumable seeder over the India bounds and returns
+    the number of tiles rendered.
+    """
+    if layer not in TILE_LAYERS:
+        return 0
+    
+    from .seeding import INDIA_BOUNDS, seed_layer
+    
+    progress = seed_layer(layer, min_zoom, max_zoom, workers=workers, progress_callback=progress_callback)
+    tile_store.set_metadata(layer, {
+        'bounds': ','.join(str(value) for value in INDIA_BOUNDS),
+        'minzoom': min_zoom,
+        'maxzoom': max_zoom
+    })
+    
+    logger.info(f"Generated {progress['tiles_rendered']} tiles for layer {layer}")
+    return progress['tiles_rendered']
 
 if __name__ == "__main__":
     # Test tile generation
-    import time
-    
     start_time = time.time()
     count = generate_tiles_for_layer('ifr', 1, 5)
     end_time = time.time()
     
     print(f"Generated {count} tiles in {end_time - start_time:.2f} seconds")
-    print(f"Cache size: {len(tile_cache.cache)} tiles")
+    print(f"Tile store size: {tile_store.count('ifr')} tiles")
 
 
 
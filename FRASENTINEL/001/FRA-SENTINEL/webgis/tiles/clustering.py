@@ -0,0 +1,173 @@
+"""
+Point Clustering for FRA-SENTINEL Tiles
+Hierarchical, per-zoom clustering of patta holder points (supercluster-style)
+Low-zoom tiles draw one marker per cluster, so their cost follows screen
+pixels rather than record count
+"""
+
+import itertools
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .projection import mercator_lat, mercator_lon, mercator_x, mercator_y
+
+# Points within this many pixels (on a 256px tile) of a seed are merged
+CLUSTER_RADIUS = 40
+
+# Clusters exist up to this zoom; deeper zooms show individual points
+CLUSTER_MAX_ZOOM = 12
+CLUSTER_MIN_ZOOM = 0
+
+TILE_EXTENT = 256
+
+class _Node:
+    """A point or cluster in unit Web-Mercator space"""
+
+    __slots__ = ('id', 'x', 'y', 'count', 'area', 'claims', 'record')
+
+    def __init__(self, node_id: int, x: float, y: float, count: int, area: float,
+                 claims: Dict[str, int], record: Optional[Dict] = None):
+        self.id = node_id
+        self.x = x
+        self.y = y
+        self.count = count
+        self.area = area
+        self.claims = claims
+        self.record = record
+
+class ClusterIndex:
+    """Clusters of point records for every zoom from ``min_zoom`` to ``max_zoom``
+
+    Each level is built from the one below it (``max_zoom + 1`` holds the
+    raw points): every unvisited node absorbs the unvisited nodes within
+    ``radius`` pixels at that zoom, and the cluster sits at their
+    count-weighted centroid with summed counts, areas and claim types.
+    Neighbours are found through a hash grid with radius-sized cells.
+    """
+
+    def __init__(self, radius: int = CLUSTER_RADIUS, min_zoom: int = CLUSTER_MIN_ZOOM,
+                 max_zoom: int = CLUSTER_MAX_ZOOM, extent: int = TILE_EXTENT):
+        self.radius = radius
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.extent = extent
+        self._levels: Dict[int, Tuple[List[_Node], Dict[Tuple[int, int], List[_Node]]]] = {}
+        self._ids = itertools.count()
+
+    def load(self, records: Iterable[Dict]) -> 'ClusterIndex':
+        """Build all levels from records with ``latitude``/``longitude`` (and
+        optionally ``area_hectares`` and ``claim_type``)"""
+        self._ids = itertools.count()
+        nodes = []
+        for record in records:
+            lat, lon = record.get('latitude'), record.get('longitude')
+            if lat is None or lon is None:
+                continue
+            claim_type = record.get('claim_type')
+            nodes.append(_Node(
+                next(self._ids), mercator_x(lon), mercator_y(lat), 1,
+                float(record.get('area_hectares') or 0.0),
+                {claim_type: 1} if claim_type else {}, record
+            ))
+
+        self._levels = {self.max_zoom + 1: (nodes, self._tile_grid(nodes, self.max_zoom + 1))}
+        for zoom in range(self.max_zoom, self.min_zoom - 1, -1):
+            nodes = self._cluster(nodes, zoom)
+            self._levels[zoom] = (nodes, self._tile_grid(nodes, zoom))
+        return self
+
+    @staticmethod
+    def _tile_grid(nodes: List[_Node], zoom: int) -> Dict[Tuple[int, int], List[_Node]]:
+        """Nodes bucketed by the tile they fall in at ``zoom``"""
+        scale = 2 ** zoom
+        grid = defaultdict(list)
+        for node in nodes:
+            grid[(min(int(node.x * scale), scale - 1), min(int(node.y * scale), scale - 1))].append(node)
+        return dict(grid)
+
+    def _cluster(self, nodes: List[_Node], zoom: int) -> List[_Node]:
+        r = self.radius / (self.extent * 2 ** zoom)
+        r_sq = r * r
+        grid = defaultdict(list)
+        for i, node in enumerate(nodes):
+            grid[(int(node.x / r), int(node.y / r))].append(i)
+
+        visited = [False] * len(nodes)
+        clusters = []
+        for i, seed in enumerate(nodes):
+            if visited[i]:
+                continue
+            visited[i] = True
+            members = [seed]
+            cell_x, cell_y = int(seed.x / r), int(seed.y / r)
+            for gx in (cell_x - 1, cell_x, cell_x + 1):
+                for gy in (cell_y - 1, cell_y, cell_y + 1):
+                    for j in grid.get((gx, gy), ()):
+                        if visited[j]:
+                            continue
+                        other = nodes[j]
+                        if (other.x - seed.x) ** 2 + (other.y - seed.y) ** 2 <= r_sq:
+                            visited[j] = True
+                            members.append(other)
+
+            if len(members) == 1:
+                clusters.append(seed)
+                continue
+
+            count = sum(member.count for member in members)
+            claims: Dict[str, int] = {}
+            for member in members:
+                for claim_type, claim_count in member.claims.items():
+                    claims[claim_type] = claims.get(claim_type, 0) + claim_count
+            clusters.append(_Node(
+                next(self._ids),
+                sum(member.x * member.count for member in members) / count,
+                sum(member.y * member.count for member in members) / count,
+                count,
+                sum(member.area for member in members),
+                claims
+            ))
+        return clusters
+
+    def get_clusters(self, lon_min: float, lat_min: float, lon_max: float, lat_max: float,
+                     zoom: int) -> List[Dict]:
+        """Clusters and single points inside a bbox at a zoom level"""
+        level = max(self.min_zoom, min(int(zoom), self.max_zoom + 1))
+        if level not in self._levels:
+            return []
+        nodes, grid = self._levels[level]
+
+        x_min, x_max = mercator_x(lon_min), mercator_x(lon_max)
+        y_min, y_max = mercator_y(lat_max), mercator_y(lat_min)
+        scale = 2 ** level
+        col_min, col_max = max(0, int(x_min * scale)), min(scale - 1, int(x_max * scale))
+        row_min, row_max = max(0, int(y_min * scale)), min(scale - 1, int(y_max * scale))
+
+        if (col_max - col_min + 1) * (row_max - row_min + 1) > len(grid):
+            candidates: Iterable[_Node] = nodes
+        else:
+            candidates = (node for col in range(col_min, col_max + 1) for row in range(row_min, row_max + 1)
+                          for node in grid.get((col, row), ()))
+
+        return [self._to_dict(node) for node in candidates
+                if x_min <= node.x <= x_max and y_min <= node.y <= y_max]
+
+    @staticmethod
+    def _to_dict(node: _Node) -> Dict:
+        cluster = {
+            'id': node.id,
+            'longitude': round(mercator_lon(node.x), 6),
+            'latitude': round(mercator_lat(node.y), 6),
+            'count': node.count,
+            'area_hectares': round(node.area, 4),
+            'claim_types': dict(node.claims),
+            'cluster': node.count > 1
+        }
+        if node.record is not None:
+            cluster['properties'] = {key: value for key, value in node.record.items()
+                                     if key not in ('latitude', 'longitude')}
+        return cluster
+
+    def __len__(self) -> int:
+        level = self._levels.get(self.max_zoom + 1)
+        return len(level[0]) if level else 0
@@ -0,0 +1,229 @@
+"""
+MBTiles Tile Store for FRA-SENTINEL
+Persistent L2 tile storage shared by all web and worker processes
+One MBTiles (SQLite) file per layer, in WAL mode for concurrent readers
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a process trusts its cached copy of a layer version
+VERSION_TTL = 1.0
+
+# Tiles written per transaction by put_many
+WRITE_BATCH_SIZE = 500
+
+LAYER_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+
+class MBTilesStore:
+    """Directory of ``<layer>.mbtiles`` files following the MBTiles 1.3 layout
+
+    Rows use the TMS scheme (``tile_row`` counted from the south) so the
+    files open directly in QGIS, tippecanoe tooling and tile servers. Each
+    layer carries a ``version`` in its metadata table; invalidating a layer
+    bumps the version and drops only that layer's tiles. ``data_mark``
+    records the newest source row the layer's tiles may include.
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)",
+        """CREATE TABLE IF NOT EXISTS tiles (
+            zoom_level INTEGER,
+            tile_column INTEGER,
+            tile_row INTEGER,
+            tile_data BLOB
+        )""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row)",
+    ]
+
+    def __init__(self, directory: str, tile_format: str = 'png'):
+        self.directory = directory
+        self.tile_format = tile_format
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._initialized = set()
+        self._init_lock = threading.Lock()
+
+    def path_for(self, layer: str) -> str:
+        if not LAYER_NAME.match(layer):
+            raise ValueError(f"Invalid layer name: {layer}")
+        return os.path.join(self.directory, f"{layer}.mbtiles")
+
+    def _connection(self, layer: str) -> sqlite3.Connection:
+        """Per-thread, per-layer connection (reopened after a fork)"""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None or self._local.pid != os.getpid():
+            connections = self._local.connections = {}
+            self._local.pid = os.getpid()
+
+        conn = connections.get(layer)
+        if conn is None:
+            self._ensure_layer(layer)
+            conn = sqlite3.connect(self.path_for(layer), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            connections[layer] = conn
+        return conn
+
+    def _ensure_layer(self, layer: str):
+        """Create the layer's MBTiles file and metadata on first use"""
+        with self._init_lock:
+            if layer in self._initialized:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path_for(layer), timeout=30, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)",
+                    [('name', layer), ('format', self.tile_format), ('type', 'overlay'),
+                     ('version', '1'), ('attribution', 'FRA-SENTINEL')]
+                )
+            finally:
+                conn.close()
+            self._initialized.add(layer)
+
+    @staticmethod
+    def _tms_row(z: int, y: int) -> int:
+        return (1 << z) - 1 - y
+
+    def get(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
+        """Stored tile bytes, or None"""
+        row = self._connection(layer).execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, self._tms_row(z, y))
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put(self, layer: str, z: int, x: int, y: int, data: bytes):
+        self.put_many(layer, [(z, x, y, data)])
+
+    def put_many(self, layer: str, tiles: Iterable[Tuple[int, int, int, bytes]]) -> int:
+        """Write tiles in batched transactions; returns the number written
+
+        Writes from this process are serialized so there is a single writer
+        per process; other processes wait on SQLite's busy timeout.
+        """
+        conn = self._connection(layer)
+        written = 0
+        batch = []
+
+        def flush():
+            with self._write_lock:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) "
+                        "VALUES (?, ?, ?, ?)",
+                        batch
+                    )
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+
+        for z, x, y, data in tiles:
+            batch.append((z, x, self._tms_row(z, y), sqlite3.Binary(data)))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                flush()
+                written += len(batch)
+                batch = []
+        if batch:
+            flush()
+            written += len(batch)
+        return written
+
+    def layer_version(self, layer: str) -> int:
+        """Current data version of a layer, re-read at most every VERSION_TTL seconds"""
+        cached = self._versions.get(layer)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < VERSION_TTL:
+            return cached[0]
+
+        row = self._connection(layer).execute("SELECT value FROM metadata WHERE name = 'version'").fetchone()
+        version = int(row[0]) if row else 1
+        self._versions[layer] = (version, now)
+        return version
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection) -> int:
+        """Increment the version and drop the tiles (caller holds a write transaction)"""
+        row = conn.execute("SELECT value FROM metadata WHERE name = 'version'").fetchone()
+        version = (int(row[0]) if row else 1) + 1
+        conn.execute("INSERT OR REPLACE INTO metadata (name, value) VALUES ('version', ?)", (str(version),))
+        conn.execute("DELETE FROM tiles")
+        return version
+
+    def invalidate(self, layer: str) -> int:
+        """Bump a layer's version and drop its stored tiles; returns the new version"""
+        conn = self._connection(layer)
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = self._bump_version(conn)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+        self._versions[layer] = (version, time.monotonic())
+        logger.info(f"Invalidated tile layer {layer}, now at version {version}")
+        return version
+
+    def advance(self, layer: str, data_mark: int) -> Optional[int]:
+        """Invalidate a layer once its source data moves past the stored ``data_mark``
+
+        ``data_mark`` is the highest source row id of the layer. The first
+        process to report a higher mark than the one in the metadata bumps
+        the version; equal or lower marks (other processes catching up, or
+        unchanged data reloaded after a restart) keep the tiles. Returns the
+        new version, or None when the layer was already current.
+        """
+        def stored_mark(conn):
+            row = conn.execute("SELECT value FROM metadata WHERE name = 'data_mark'").fetchone()
+            return int(row[0]) if row else None
+
+        conn = self._connection(layer)
+        current = stored_mark(conn)
+        if current is not None and current >= data_mark:
+            return None
+
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = stored_mark(conn)
+                if current is not None and current >= data_mark:
+                    conn.execute("ROLLBACK")
+                    return None
+                conn.execute("INSERT OR REPLACE INTO metadata (name, value) VALUES ('data_mark', ?)",
+                             (str(data_mark),))
+                version = self._bump_version(conn)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+        self._versions[layer] = (version, time.monotonic())
+        logger.info(f"Tile layer {layer} has rows up to id {data_mark}, now at version {version}")
+        return version
+
+    def set_metadata(self, layer: str, values: Dict[str, str]):
+        """Update MBTiles metadata rows (bounds, minzoom, maxzoom, ...)"""
+        conn = self._connection(layer)
+        with self._write_lock:
+            conn.executemany(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                [(name, str(value)) for name, value in values.items()]
+            )
+
+    def count(self, layer: str) -> int:
+        return self._connection(layer).execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
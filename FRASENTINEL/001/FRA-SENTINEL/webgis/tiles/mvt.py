@@ -0,0 +1,334 @@
+"""
+Mapbox Vector Tiles for FRA-SENTINEL
+Encodes clipped, quantized, zoom-simplified features as MVT 2.1 protobuf tiles
+The few messages in the spec are written directly, without a protobuf dependency
+"""
+
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .projection import TileProjector, clip_ring, simplify_line
+
+# Tile coordinate grid and the margin kept around it so styled strokes and
+# symbols do not get cut at tile edges
+EXTENT = 4096
+BUFFER = 64
+
+# Douglas-Peucker tolerance in tile units (half a pixel on a 256px tile).
+# Tile units shrink on the ground as zoom increases, so low zooms get
+# coarse geometry and high zooms keep their detail.
+SIMPLIFY_TOLERANCE = 8.0
+
+GEOM_POINT = 1
+GEOM_LINESTRING = 2
+GEOM_POLYGON = 3
+
+CMD_MOVE_TO = 1
+CMD_LINE_TO = 2
+CMD_CLOSE_PATH = 7
+
+# Protobuf wire format
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _valid_id(value) -> bool:
+    """Feature ids are uint64 in MVT; features with any other id are encoded without one"""
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < 1 << 64
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+def _uint_field(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(data)) + data
+
+def _packed_field(field: int, values: Sequence[int]) -> bytes:
+    return _bytes_field(field, b''.join(_varint(value) for value in values))
+
+def _encode_value(value) -> bytes:
+    """Layer ``Value`` message for a str/bool/int/float attribute"""
+    if isinstance(value, bool):
+        return _uint_field(7, int(value))
+    if isinstance(value, int):
+        return _uint_field(6, _zigzag(value))
+    if isinstance(value, float):
+        return _varint((3 << 3) | 1) + struct.pack('<d', value)
+    return _bytes_field(1, str(value).encode('utf-8'))
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def _read_fields(data: bytes) -> Iterator[Tuple[int, object]]:
+    """(field number, value) pairs of a message; length-delimited values stay bytes"""
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type == 5:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        yield field, value
+
+def _read_packed(data: bytes) -> List[int]:
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+# Geometry processing
+
+def _ring_area(ring: List[Tuple[int, int]]) -> int:
+    """Twice the signed area; positive for clockwise rings with y pointing down"""
+    return sum(ring[i - 1][0] * ring[i][1] - ring[i][0] * ring[i - 1][1] for i in range(len(ring)))
+
+def _prepare_ring(coordinates: Sequence[Sequence[float]], projection: TileProjector,
+                  buffer: int, tolerance: float, exterior: bool) -> Optional[List[Tuple[int, int]]]:
+    """Project, clip, simplify and quantize one ring; None if it collapses"""
+    clipped = clip_ring(projection.project_ring(coordinates), -buffer, projection.extent + buffer)
+    if len(clipped) < 3:
+        return None
+
+    ring = [tuple(point) for point in clipped.tolist()]
+
+    ring = simplify_line(ring + [ring[0]], tolerance)[:-1]
+    quantized = []
+    for px, py in ring:
+        point = (int(round(px)), int(round(py)))
+        if not quantized or quantized[-1] != point:
+            quantized.append(point)
+    while len(quantized) > 1 and quantized[0] == quantized[-1]:
+        quantized.pop()
+    if len(quantized) < 3:
+        return None
+
+    area = _ring_area(quantized)
+    if area == 0:
+        return None
+    if (area > 0) != exterior:
+        quantized.reverse()
+    return quantized
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+class _GeometryWriter:
+    """Builds a feature's command stream with the cursor carried across parts"""
+
+    def __init__(self):
+        self.commands: List[int] = []
+        self.cursor = (0, 0)
+
+    def _delta(self, point: Tuple[int, int]):
+        self.commands.append(_zigzag(point[0] - self.cursor[0]))
+        self.commands.append(_zigzag(point[1] - self.cursor[1]))
+        self.cursor = point
+
+    def points(self, points: List[Tuple[int, int]]):
+        self.commands.append(_command(CMD_MOVE_TO, len(points)))
+        for point in points:
+            self._delta(point)
+
+    def ring(self, ring: List[Tuple[int, int]]):
+        self.commands.append(_command(CMD_MOVE_TO, 1))
+        self._delta(ring[0])
+        self.commands.append(_command(CMD_LINE_TO, len(ring) - 1))
+        for point in ring[1:]:
+            self._delta(point)
+        self.commands.append(_command(CMD_CLOSE_PATH, 1))
+
+def encode_geometry(geometry: Dict, projection: TileProjector, buffer: int = BUFFER,
+                    tolerance: float = SIMPLIFY_TOLERANCE) -> Optional[Tuple[int, List[int]]]:
+    """(geometry type, command stream) of a GeoJSON geometry within a tile
+
+    Points and polygons (with holes, single or multi) are supported. Returns
+    None when nothing of the geometry is left inside the buffered tile.
+    """
+    geometry_type = geometry.get('type')
+    coordinates = geometry.get('coordinates') or []
+    writer = _GeometryWriter()
+
+    if geometry_type in ('Point', 'MultiPoint'):
+        positions = [coordinates] if geometry_type == 'Point' else coordinates
+        low, high = -buffer, projection.extent + buffer
+        points = []
+        for position in positions:
+            if len(position) < 2:
+                continue
+            px, py = projection.project(position[0], position[1])
+            if low <= px <= high and low <= py <= high:
+                points.append((int(round(px)), int(round(py))))
+        if not points:
+            return None
+        writer.points(points)
+        return GEOM_POINT, writer.commands
+
+    if geometry_type in ('Polygon', 'MultiPolygon'):
+        polygons = [coordinates] if geometry_type == 'Polygon' else coordinates
+        for polygon in polygons:
+            if not polygon:
+                continue
+            exterior = _prepare_ring(polygon[0], projection, buffer, tolerance, exterior=True)
+            if exterior is None:
+                continue
+            writer.ring(exterior)
+            for hole in polygon[1:]:
+                interior = _prepare_ring(hole, projection, buffer, tolerance, exterior=False)
+                if interior is not None:
+                    writer.ring(interior)
+        if not writer.commands:
+            return None
+        return GEOM_POLYGON, writer.commands
+
+    return None
+
+def encode_layer(name: str, features: Iterable[Dict], projection: TileProjector,
+                 buffer: int = BUFFER, tolerance: float = SIMPLIFY_TOLERANCE) -> Optional[bytes]:
+    """Encode GeoJSON-like features into a ``Layer`` message; None if it is empty
+
+    Scalar properties (str, int, float, bool) become feature attributes;
+    keys and values are deduplicated across the layer as the spec requires.
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, object], int] = {}
+    encoded_features = []
+
+    for feature in features:
+        encoded = encode_geometry(feature.get('geometry') or {}, projection, buffer, tolerance)
+        if encoded is None:
+            continue
+        geometry_type, commands = encoded
+
+        tags = []
+        for key, value in (feature.get('properties') or {}).items():
+            if value is None or not isinstance(value, (str, int, float, bool)):
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        message = b''
+        feature_id = feature.get('id')
+        if _valid_id(feature_id):
+            message += _uint_field(1, feature_id)
+        if tags:
+            message += _packed_field(2, tags)
+        message += _uint_field(3, geometry_type) + _packed_field(4, commands)
+        encoded_features.append(message)
+
+    if not encoded_features:
+        return None
+
+    layer = _bytes_field(1, name.encode('utf-8'))
+    layer += b''.join(_bytes_field(2, feature) for feature in encoded_features)
+    layer += b''.join(_bytes_field(3, key.encode('utf-8')) for key in keys)
+    layer += b''.join(_bytes_field(4, _encode_value(value)) for _, value in values)
+    layer += _uint_field(5, projection.extent) + _uint_field(15, 2)
+    return layer
+
+def encode_tile(layers: Dict[str, Iterable[Dict]], z: int, x: int, y: int, extent: int = EXTENT,
+                buffer: int = BUFFER, tolerance: float = SIMPLIFY_TOLERANCE) -> bytes:
+    """Encode named feature layers into one vector tile; empty layers are left out"""
+    projection = TileProjector(z, x, y, extent)
+    tile = b''
+    for name, features in layers.items():
+        layer = encode_layer(name, features, projection, buffer, tolerance)
+        if layer is not None:
+            tile += _bytes_field(3, layer)
+    return tile
+
+def _decode_value(data: bytes):
+    for field, value in _read_fields(data):
+        if field == 1:
+            return value.decode('utf-8')
+        if field == 2:
+            return struct.unpack('<f', value)[0]
+        if field == 3:
+            return struct.unpack('<d', value)[0]
+        if field in (4, 5):
+            return value
+        if field == 6:
+            return _unzigzag(value)
+        if field == 7:
+            return bool(value)
+    return None
+
+def _decode_geometry(commands: List[int]) -> List[List[Tuple[int, int]]]:
+    """Split a command stream into parts (points, or rings without the closing point)"""
+    parts: List[List[Tuple[int, int]]] = []
+    x = y = 0
+    i = 0
+    while i < len(commands):
+        command, count = commands[i] & 0x7, commands[i] >> 3
+        i += 1
+        if command == CMD_CLOSE_PATH:
+            continue
+        if command == CMD_MOVE_TO:
+            parts.append([])
+        for _ in range(count):
+            x += _unzigzag(commands[i])
+            y += _unzigzag(commands[i + 1])
+            i += 2
+            parts[-1].append((x, y))
+    return parts
+
+def decode_tile(data: bytes) -> Dict[str, Dict]:
+    """Decode a vector tile into ``{layer: {'extent', 'features'}}`` (for tests and debugging)"""
+    layers = {}
+    for field, layer_data in _read_fields(data):
+        if field != 3:
+            continue
+        name, extent, keys, values, raw_features = None, EXTENT, [], [], []
+        for layer_field, value in _read_fields(layer_data):
+            if layer_field == 1:
+                name = value.decode('utf-8')
+            elif layer_field == 2:
+                raw_features.append(value)
+            elif layer_field == 3:
+                keys.append(value.decode('utf-8'))
+            elif layer_field == 4:
+                values.append(_decode_value(value))
+            elif layer_field == 5:
+                extent = value
+
+        features = []
+        for raw in raw_features:
+            feature = {'id': None, 'properties': {}, 'type': None, 'geometry': []}
+            for feature_field, value in _read_fields(raw):
+                if feature_field == 1:
+                    feature['id'] = value
+                elif feature_field == 2:
+                    tags = _read_packed(value)
+                    feature['properties'] = {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])}
+                elif feature_field == 3:
+                    feature['type'] = value
+                elif feature_field == 4:
+                    feature['geometry'] = _decode_geometry(_read_packed(value))
+            features.append(feature)
+        layers[name] = {'extent': extent, 'features': features}
+    return layers
@@ -0,0 +1,185 @@
+"""
+Web-Mercator Projection for FRA-SENTINEL Tiles
+Vectorized lon/lat to tile-pixel projection, ring clipping and line
+simplification shared by the raster, vector tile, clustering and boundary paths
+"""
+
+import itertools
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+MAX_LATITUDE = 85.0511287798
+
+# Pixel grid of a raster tile
+TILE_EXTENT = 256
+
+def mercator_x(lon: float) -> float:
+    """Longitude as a fraction of the world width (0 at 180W, 1 at 180E)"""
+    return (lon + 180.0) / 360.0
+
+def mercator_y(lat: float) -> float:
+    """Latitude as a fraction of the world height (0 at the top, 1 at the bottom)"""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    return (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0
+
+def mercator_lon(x: float) -> float:
+    return x * 360.0 - 180.0
+
+def mercator_lat(y: float) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1.0 - 2.0 * y))))
+
+class TileProjector:
+    """Projects lon/lat into the pixel grid of one tile
+
+    (0, 0) is the tile's north-west corner and (extent, extent) its
+    south-east corner; positions outside the tile project outside that
+    range. Whole arrays or rings are projected with one pass of NumPy math.
+    """
+
+    def __init__(self, z: int, x: float, y: float, extent: float = TILE_EXTENT):
+        self.z, self.x, self.y = z, x, y
+        self.extent = extent
+        self.scale = 2.0 ** z
+        # pixel = mercator fraction * scale - offset; exact powers of two for whole tiles
+        self.scale_x = self.scale_y = extent * self.scale
+        self.offset_x, self.offset_y = x * extent, y * extent
+
+    @classmethod
+    def from_bounds(cls, lat_min: float, lon_min: float, lat_max: float, lon_max: float,
+                    extent: float = TILE_EXTENT) -> 'TileProjector':
+        """Projector mapping a lat/lon box onto the tile's pixel grid"""
+        projector = cls(0, 0, 0, extent)
+        projector.scale_x = extent / (mercator_x(lon_max) - mercator_x(lon_min))
+        projector.scale_y = extent / (mercator_y(lat_min) - mercator_y(lat_max))
+        projector.offset_x = mercator_x(lon_min) * projector.scale_x
+        projector.offset_y = mercator_y(lat_max) * projector.scale_y
+        return projector
+
+    def project(self, lon: float, lat: float) -> Tuple[float, float]:
+        """Pixel position of a single lon/lat"""
+        return (mercator_x(lon) * self.scale_x - self.offset_x,
+                mercator_y(lat) * self.scale_y - self.offset_y)
+
+    def project_many(self, lons: np.ndarray, lats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Pixel positions of arrays of longitudes and latitudes"""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.clip(np.asarray(lats, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+        px = (lons + 180.0) / 360.0 * self.scale_x - self.offset_x
+        py = (1.0 - np.arcsinh(np.tan(np.radians(lats))) / np.pi) / 2.0 * self.scale_y - self.offset_y
+        return px, py
+
+    def project_ring(self, coordinates: Sequence[Sequence[float]]) -> np.ndarray:
+        """(n, 2) array of pixel positions of a GeoJSON ring, closing point dropped"""
+        # Flattening through fromiter is several times faster than np.asarray
+        # on nested lists; positions with altitudes take the slower path
+        flat = np.fromiter(itertools.chain.from_iterable(coordinates), dtype=np.float64)
+        if len(flat) != 2 * len(coordinates):
+            flat = np.fromiter(itertools.chain.from_iterable(
+                coord[:2] for coord in coordinates if len(coord) >= 2), dtype=np.float64)
+        if len(flat) == 0:
+            return np.empty((0, 2))
+        positions = flat.reshape(-1, 2)
+
+        px, py = self.project_many(positions[:, 0], positions[:, 1])
+        ring = np.column_stack((px, py))
+        if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+            ring = ring[:-1]
+        return ring
+
+    def project_polygons(self, geometry: Dict, buffer: float) -> List[List[np.ndarray]]:
+        """Rings of a (Multi)Polygon projected and clipped to the tile plus ``buffer``
+
+        One list of rings per polygon, exterior first. Holes that vanish
+        are dropped, and so are polygons whose exterior vanishes.
+        """
+        geometry_type = geometry.get('type')
+        coordinates = geometry.get('coordinates') or []
+        if geometry_type == 'Polygon':
+            polygons = [coordinates]
+        elif geometry_type == 'MultiPolygon':
+            polygons = coordinates
+        else:
+            return []
+
+        low, high = -buffer, self.extent + buffer
+        projected = []
+        for polygon in polygons:
+            rings = []
+            for index, ring in enumerate(polygon or []):
+                clipped = clip_ring(self.project_ring(ring), low, high)
+                if len(clipped) >= 3:
+                    rings.append(clipped)
+                elif index == 0:
+                    break
+            if rings:
+                projected.append(rings)
+        return projected
+
+def clip_ring(ring: np.ndarray, low: float, high: float) -> np.ndarray:
+    """Sutherland-Hodgman clip of an open (n, 2) ring to the square [low, high]
+
+    Each of the four clip edges is one vectorized pass: every vertex emits
+    the crossing point of its incoming edge (if it crosses) followed by
+    itself (if inside), and a running count of emitted points gives each
+    one its slot in the output.
+    """
+    if len(ring) == 0 or (ring.min() >= low and ring.max() <= high):
+        return ring
+
+    for axis, bound, keep_above in ((0, low, True), (0, high, False), (1, low, True), (1, high, False)):
+        if len(ring) == 0:
+            break
+        values = ring[:, axis]
+        inside = values >= bound if keep_above else values <= bound
+        if inside.all():
+            continue
+
+        crossing = np.flatnonzero(inside != np.concatenate((inside[-1:], inside[:-1])))
+        a, b = ring[crossing - 1], ring[crossing]
+        t = (bound - a[:, axis]) / (b[:, axis] - a[:, axis])
+        points = a + t[:, None] * (b - a)
+        points[:, axis] = bound
+
+        emitted = inside.astype(np.intp)
+        emitted[crossing] += 1
+        last = np.cumsum(emitted) - 1
+        clipped = np.empty((int(emitted.sum()), 2))
+        clipped[last[inside]] = ring[inside]
+        clipped[last[crossing] - inside[crossing]] = points
+        ring = clipped
+    return ring
+
+def simplify_line(points: Sequence[Tuple[float, float]], tolerance: float) -> List[Tuple[float, float]]:
+    """Douglas-Peucker simplification that always keeps both end points"""
+    if tolerance <= 0 or len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (ax, ay), (bx, by) = points[first], points[last]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+
+        farthest, max_dist_sq = 0, tolerance_sq
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length_sq == 0:
+                dist_sq = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+                dist_sq = (px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2
+            if dist_sq > max_dist_sq:
+                farthest, max_dist_sq = i, dist_sq
+
+        if farthest:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
@@ -0,0 +1,183 @@
+"""
+Tile Seeding for FRA-SENTINEL
+Parallel, resumable pre-rendering of a layer's tile pyramid into the tile store
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from . import deg2num, num2deg, render_tile_png, tile_renderer, tile_store
+
+logger = logging.getLogger(__name__)
+
+# India bounds as (lon_min, lat_min, lon_max, lat_max)
+INDIA_BOUNDS = (68.0, 6.0, 97.0, 37.0)
+
+# Work units are square blocks of BLOCK_SIZE x BLOCK_SIZE tiles
+BLOCK_SIZE = 8
+
+WorkUnit = Tuple[int, int, int, int, int]  # z, x_min, x_max, y_min, y_max (inclusive)
+
+def work_units(min_zoom: int, max_zoom: int, bounds: Tuple[float, float, float, float] = INDIA_BOUNDS,
+               block_size: int = BLOCK_SIZE) -> Iterator[WorkUnit]:
+    """Split the tile pyramid over ``bounds`` into blocks of tiles"""
+    lon_min, lat_min, lon_max, lat_max = bounds
+    for z in range(min_zoom, max_zoom + 1):
+        x_start, y_start = deg2num(lat_max, lon_min, z)  # North-west corner
+        x_end, y_end = deg2num(lat_min, lon_max, z)      # South-east corner
+        for x0 in range(x_start, x_end + 1, block_size):
+            for y0 in range(y_start, y_end + 1, block_size):
+                yield z, x0, min(x0 + block_size - 1, x_end), y0, min(y0 + block_size - 1, y_end)
+
+def unit_id(unit: WorkUnit) -> str:
+    return '/'.join(str(value) for value in unit)
+
+def seed_unit(layer: str, unit: WorkUnit) -> Tuple[int, int]:
+    """Render one work unit into the tile store; returns (rendered, skipped)
+
+    Blocks and tiles whose bounds hold no layer data are skipped without
+    rendering.
+    """
+    z, x_min, x_max, y_min, y_max = unit
+    tile_count = (x_max - x_min + 1) * (y_max - y_min + 1)
+
+    lat_lo, lon_lo = num2deg(x_min, y_max + 1, z)
+    lat_hi, lon_hi = num2deg(x_max + 1, y_min, z)
+    if not tile_renderer.has_data_in_bounds(layer, lat_lo, lon_lo, lat_hi, lon_hi):
+        return 0, tile_count
+
+    def tiles():
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                lat_lo, lon_lo = num2deg(x, y + 1, z)
+                lat_hi, lon_hi = num2deg(x + 1, y, z)
+                if tile_renderer.has_data_in_bounds(layer, lat_lo, lon_lo, lat_hi, lon_hi):
+                    yield z, x, y, render_tile_png(layer, z, x, y)
+
+    rendered = tile_store.put_many(layer, tiles())
+    return rendered, tile_count - rendered
+
+def checkpoint_path(layer: str) -> str:
+    return os.path.join(tile_store.directory, f"{layer}.seed.json")
+
+def read_seed_progress(layer: str) -> Optional[Dict]:
+    """Progress recorded in a layer's seeding checkpoint, if any"""
+    try:
+        with open(checkpoint_path(layer), 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return checkpoint.get('progress')
+
+class TileSeeder:
+    """Seeds a layer's pyramid in parallel work units with checkpoints
+
+    Completed unit ids are written to ``<layer>.seed.json`` next to the
+    layer's MBTiles file after every unit, so a rerun with the same
+    parameters (and the same layer version) resumes where it stopped.
+    """
+
+    def __init__(self, layer: str, min_zoom: int = 1, max_zoom: int = 10,
+                 bounds: Tuple[float, float, float, float] = INDIA_BOUNDS,
+                 workers: Optional[int] = None, block_size: int = BLOCK_SIZE,
+                 progress_callback: Optional[Callable[[Dict], None]] = None):
+        self.layer = layer
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.bounds = tuple(bounds)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.block_size = block_size
+        self.progress_callback = progress_callback
+        self.checkpoint_path = checkpoint_path(layer)
+        self.params = {
+            'layer': layer,
+            'min_zoom': min_zoom,
+            'max_zoom': max_zoom,
+            'bounds': list(self.bounds),
+            'block_size': block_size,
+            'version': tile_store.layer_version(layer)
+        }
+
+    def _load_checkpoint(self) -> Tuple[set, Dict]:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return set(), {}
+
+        if checkpoint.get('params') != self.params:
+            logger.info(f"Seeding parameters for {self.layer} changed, starting over")
+            return set(), {}
+        return set(checkpoint.get('completed', [])), checkpoint.get('progress', {})
+
+    def _save_checkpoint(self, completed: set, progress: Dict):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'params': self.params, 'completed': sorted(completed), 'progress': progress}, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def run(self) -> Dict:
+        """Seed every remaining work unit; returns the final progress"""
+        units = list(work_units(self.min_zoom, self.max_zoom, self.bounds, self.block_size))
+        completed, previous = self._load_checkpoint()
+        pending = [unit for unit in units if unit_id(unit) not in completed]
+
+        progress = {
+            'layer': self.layer,
+            'total_units': len(units),
+            'done_units': len(units) - len(pending),
+            'tiles_rendered': previous.get('tiles_rendered', 0),
+            'tiles_skipped': previous.get('tiles_skipped', 0),
+            'tiles_per_sec': 0.0,
+            'elapsed_seconds': 0.0,
+            'finished': False
+        }
+        if len(pending) < len(units):
+            logger.info(f"Resuming {self.layer} seeding at {progress['done_units']}/{len(units)} units")
+
+        started = time.monotonic()
+        session_rendered = 0
+
+        def record(unit: WorkUnit, rendered: int, skipped: int):
+            nonlocal session_rendered
+            session_rendered += rendered
+            completed.add(unit_id(unit))
+            elapsed = time.monotonic() - started
+            progress.update({
+                'done_units': progress['done_units'] + 1,
+                'tiles_rendered': progress['tiles_rendered'] + rendered,
+                'tiles_skipped': progress['tiles_skipped'] + skipped,
+                'tiles_per_sec': round(session_rendered / elapsed, 1) if elapsed > 0 else 0.0,
+                'elapsed_seconds': round(elapsed, 2)
+            })
+            self._save_checkpoint(completed, progress)
+            if self.progress_callback:
+                self.progress_callback(dict(progress))
+
+        if self.workers <= 1:
+            for unit in pending:
+                record(unit, *seed_unit(self.layer, unit))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(seed_unit, self.layer, unit): unit for unit in pending}
+                for future in as_completed(futures):
+                    record(futures[future], *future.result())
+
+        progress['finished'] = True
+        self._save_checkpoint(completed, progress)
+        logger.info(
+            f"Seeded {self.layer}: {progress['tiles_rendered']} tiles rendered, "
+            f"{progress['tiles_skipped']} empty tiles skipped, {progress['tiles_per_sec']} tiles/sec"
+        )
+        return progress
+
+def seed_layer(layer: str, min_zoom: int = 1, max_zoom: int = 10, workers: Optional[int] = None,
+               progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """Seed a layer over the India bounds, resuming any interrupted run"""
+    return TileSeeder(layer, min_zoom, max_zoom, workers=workers,
+                      progress_callback=progress_callback).run()
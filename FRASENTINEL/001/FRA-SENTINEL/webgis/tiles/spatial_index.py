@@ -0,0 +1,432 @@
+"""
+Spatial Index for FRA-SENTINEL Tiles
+Bounding-box lookups of patta holders, villages and asset polygons per tile
+In-memory grid index for SQLite, bbox (&&) queries on the GIST index for PostGIS
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+BBox = Tuple[float, float, float, float]  # lon_min, lat_min, lon_max, lat_max
+
+# Grid cell size in degrees (~5.5 km), about a z11 tile
+GRID_CELL_DEGREES = 0.05
+
+# Items spanning more cells than this are kept in a separate list
+MAX_ITEM_CELLS = 1024
+
+# Seconds between checks of the tables for newly inserted rows
+REFRESH_INTERVAL = 5.0
+
+class GridIndex:
+    """Uniform grid over lon/lat bounding boxes with incremental updates
+
+    Unlike an STR-tree, which has to be rebuilt to take a new item, inserts
+    and removals here only touch the cells an item overlaps. Queries
+    collect candidates from the cells under the query box, then check the
+    exact bounding boxes.
+    """
+
+    def __init__(self, cell_size: float = GRID_CELL_DEGREES, max_item_cells: int = MAX_ITEM_CELLS):
+        self.cell_size = cell_size
+        self.max_item_cells = max_item_cells
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = defaultdict(set)
+        self._items: Dict[Hashable, Tuple[BBox, Dict]] = {}
+        self._large: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _cell_range(self, bbox: BBox) -> Tuple[int, int, int, int]:
+        lon_min, lat_min, lon_max, lat_max = bbox
+        return (math.floor(lon_min / self.cell_size), math.floor(lat_min / self.cell_size),
+                math.floor(lon_max / self.cell_size), math.floor(lat_max / self.cell_size))
+
+    def insert(self, key: Hashable, bbox: BBox, record: Dict):
+        """Add or replace an item"""
+        if key in self._items:
+            self.remove(key)
+
+        self._items[key] = (bbox, record)
+        col_min, row_min, col_max, row_max = self._cell_range(bbox)
+        if (col_max - col_min + 1) * (row_max - row_min + 1) > self.max_item_cells:
+            self._large.add(key)
+            return
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                self._cells[(col, row)].add(key)
+
+    def remove(self, key: Hashable) -> bool:
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return False
+        if key in self._large:
+            self._large.discard(key)
+            return True
+
+        col_min, row_min, col_max, row_max = self._cell_range(entry[0])
+        for col in range(col_min, col_max + 1):
+            for row in range(row_min, row_max + 1):
+                cell = self._cells.get((col, row))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self._cells[(col, row)]
+        return True
+
+    def clear(self):
+        self._cells.clear()
+        self._items.clear()
+        self._large.clear()
+
+    def records(self) -> List[Dict]:
+        """Every indexed record, in key order"""
+        return [self._items[key][1] for key in sorted(self._items)]
+
+    def query(self, lon_min: float, lat_min: float, lon_max: float, lat_max: float) -> List[Dict]:
+        """Records whose bounding boxes intersect the query box, in key order"""
+        col_min, row_min, col_max, row_max = self._cell_range((lon_min, lat_min, lon_max, lat_max))
+        query_cells = (col_max - col_min + 1) * (row_max - row_min + 1)
+
+        if query_cells > len(self._cells):
+            # Low-zoom boxes cover more cells than are occupied
+            candidates: Iterable[Hashable] = self._items.keys()
+        else:
+            keys = set(self._large)
+            for col in range(col_min, col_max + 1):
+                for row in range(row_min, row_max + 1):
+                    cell = self._cells.get((col, row))
+                    if cell:
+                        keys.update(cell)
+            candidates = keys
+
+        matches = []
+        for key in candidates:
+            bbox, record = self._items[key]
+            if bbox[0] <= lon_max and bbox[2] >= lon_min and bbox[1] <= lat_max and bbox[3] >= lat_min:
+                matches.append((key, record))
+        matches.sort(key=lambda match: match[0])
+        return [record for _, record in matches]
+
+def geometry_bbox(geometry: Dict) -> Optional[BBox]:
+    """Bounding box of a GeoJSON geometry, or None if it has no coordinates"""
+    lons, lats = [], []
+
+    def walk(coordinates):
+        if coordinates and isinstance(coordinates[0], (int, float)):
+            lons.append(coordinates[0])
+            lats.append(coordinates[1])
+        else:
+            for part in coordinates or []:
+                walk(part)
+
+    walk(geometry.get('coordinates'))
+    if not lons:
+        return None
+    return min(lons), min(lats), max(lons), max(lats)
+
+def _parse_geometry(value) -> Optional[Dict]:
+    """GeoJSON dict from a geometry column (GeoJSON text or ST_AsGeoJSON output)"""
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return value
+    try:
+        geometry = json.loads(value)
+    except (TypeError, ValueError):
+        return None
+    return geometry if isinstance(geometry, dict) and geometry.get('coordinates') else None
+
+def _number(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+# Claim types with a tile layer; rows with any other claim type are not indexed
+PATTA_LAYERS = ('ifr', 'cr', 'cfr')
+
+def _patta_record(row: Dict, geometry: Dict) -> Optional[Tuple[str, Dict]]:
+    if geometry.get('type') != 'Point' or not row.get('claim_type'):
+        return None
+    layer = str(row['claim_type']).strip().lower()
+    if layer not in PATTA_LAYERS:
+        return None
+    lon, lat = geometry['coordinates'][:2]
+    area = row.get('area_vested') if row.get('area_vested') is not None else row.get('area_claimed')
+    return layer, {
+        'id': row['id'],
+        'latitude': lat,
+        'longitude': lon,
+        'claim_type': row['claim_type'],
+        'holder_name': row.get('holder_name'),
+        'status': row.get('status'),
+        'area_hectares': _number(area)
+    }
+
+def _village_record(row: Dict, geometry: Dict) -> Optional[Tuple[str, Dict]]:
+    return 'villages', {
+        'id': row['id'],
+        'name': row.get('name'),
+        'code': row.get('code'),
+        'area_hectares': _number(row.get('area_hectares')),
+        'population': row.get('population'),
+        'forest_cover_pct': _number(row.get('forest_cover_pct')),
+        'geometry': geometry
+    }
+
+# Dominant asset class -> TileRenderer colour key
+ASSET_LAND_USE = {
+    'farmland_pct': 'agriculture',
+    'forest_pct': 'forest',
+    'water_pct': 'water',
+    'homestead_pct': 'homestead'
+}
+
+def _asset_record(row: Dict, geometry: Dict) -> Optional[Tuple[str, Dict]]:
+    shares = {column: _number(row.get(column)) or 0.0 for column in ASSET_LAND_USE}
+    dominant = max(shares, key=shares.get)
+    return 'assets', {
+        'id': row['id'],
+        'village_id': row.get('village_id'),
+        'land_use': ASSET_LAND_USE[dominant],
+        'confidence_score': _number(row.get('confidence_score')),
+        'geometry': geometry
+    }
+
+# table -> (selected columns, record builder, tile layers it feeds)
+SPATIAL_TABLES = {
+    'patta_holders': (
+        'id, holder_name, claim_type, status, area_claimed, area_vested',
+        _patta_record, PATTA_LAYERS
+    ),
+    'villages': (
+        'id, name, code, area_hectares, population, forest_cover_pct',
+        _village_record, ('villages',)
+    ),
+    'asset_mapping': (
+        'id, village_id, farmland_pct, forest_pct, water_pct, homestead_pct, confidence_score',
+        _asset_record, ('assets',)
+    ),
+}
+
+LAYER_TABLES = {layer: table for table, (_, _, layers) in SPATIAL_TABLES.items() for layer in layers}
+
+class TileDataSource:
+    """Per-layer feature lookups for tile rendering
+
+    With PostGIS every lookup is a bounding-box (``&&``) query that the
+    GIST indexes answer. Otherwise each layer is held in a GridIndex,
+    loaded once and then topped up with rows whose id is above the last
+    one seen, at most every ``refresh_interval`` seconds. Rows can also be
+    pushed in right after they are inserted with ``add``.
+
+    ``marks`` holds the highest row id seen per layer (read with a cheap
+    ``max(id)`` query on PostGIS). Whenever marks move, ``on_change`` is
+    called with the layers that moved so their tiles can be invalidated.
+    """
+
+    def __init__(self, db_manager, refresh_interval: float = REFRESH_INTERVAL,
+                 cell_size: float = GRID_CELL_DEGREES):
+        self.db_manager = db_manager
+        self.refresh_interval = refresh_interval
+        self.indexes = {layer: GridIndex(cell_size) for layer in LAYER_TABLES}
+        self._last_ids = {table: 0 for table in SPATIAL_TABLES}
+        self._last_refresh: Optional[float] = None
+        self.marks = {layer: 0 for layer in LAYER_TABLES}
+        self.on_change: Optional[Callable[[Dict[str, int]], None]] = None
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+
+    @property
+    def engine(self):
+        if os.getpid() != self._pid:
+            # Forked (e.g. a tile seeding worker): don't reuse the parent's connections
+            self._pid = os.getpid()
+            if self.db_manager.engine is not None:
+                self.db_manager.engine.dispose(close=False)
+        return self.db_manager.engine
+
+    def available(self) -> bool:
+        """Whether any of the spatial tables exist"""
+        try:
+            tables = set(inspect(self.engine).get_table_names())
+        except Exception as e:
+            logger.warning(f"Could not inspect database tables: {e}")
+            return False
+        return bool(tables & set(SPATIAL_TABLES))
+
+    def _geometry_column(self) -> str:
+        return 'ST_AsGeoJSON(geometry)' if self.db_manager.is_postgis else 'geometry'
+
+    def _records(self, table: str, rows) -> Iterable[Tuple[int, str, Dict, BBox]]:
+        """(id, layer, record, bbox) for rows with a usable geometry"""
+        build = SPATIAL_TABLES[table][1]
+        for row in rows:
+            row = dict(row._mapping)
+            geometry = _parse_geometry(row.pop('geojson', None))
+            bbox = geometry_bbox(geometry) if geometry else None
+            if bbox is None:
+                continue
+            built = build(row, geometry)
+            if built is not None:
+                yield row['id'], built[0], built[1], bbox
+
+    def refresh(self, force: bool = False) -> int:
+        """Index rows inserted since the last refresh; returns how many were added"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+                return 0
+            self._last_refresh = now
+
+            if self.db_manager.is_postgis:
+                added, seen = 0, self._postgis_marks()
+            else:
+                added, seen = self._index_new_rows()
+            moved = self._advance(seen)
+        self._notify(moved)
+        return added
+
+    def _index_new_rows(self) -> Tuple[int, Dict[str, int]]:
+        """Load rows above the last indexed ids; returns (added, highest id per layer)"""
+        added, seen = 0, {}
+        for table, (columns, _, _) in SPATIAL_TABLES.items():
+            sql = text(
+                f"SELECT {columns}, {self._geometry_column()} AS geojson FROM {table} "
+                "WHERE id > :last_id ORDER BY id"
+            )
+            try:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(sql, {'last_id': self._last_ids[table]}).fetchall()
+            except Exception as e:
+                logger.debug(f"Skipping {table} in tile index refresh: {e}")
+                continue
+
+            for row_id, layer, record, bbox in self._records(table, rows):
+                self.indexes[layer].insert(row_id, bbox, record)
+                seen[layer] = max(seen.get(layer, 0), row_id)
+                added += 1
+            if rows:
+                self._last_ids[table] = max(self._last_ids[table], rows[-1]._mapping['id'])
+
+        if added:
+            logger.info(f"Tile index refreshed with {added} new features")
+        return added, seen
+
+    def _postgis_marks(self) -> Dict[str, int]:
+        """Highest row id per layer, straight from the tables"""
+        seen = {}
+        for table, (_, _, layers) in SPATIAL_TABLES.items():
+            if table == 'patta_holders':
+                sql = f"SELECT lower(trim(claim_type)) AS layer, max(id) AS mark FROM {table} GROUP BY 1"
+            else:
+                sql = f"SELECT '{layers[0]}' AS layer, max(id) AS mark FROM {table}"
+            try:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(text(sql)).fetchall()
+            except Exception as e:
+                logger.debug(f"Skipping {table} in tile mark refresh: {e}")
+                continue
+
+            for row in rows:
+                layer, mark = row._mapping['layer'], row._mapping['mark']
+                if layer in layers and mark is not None:
+                    seen[layer] = mark
+        return seen
+
+    def _advance(self, seen: Dict[str, int]) -> Dict[str, int]:
+        """Raise the marks of layers with newer rows; returns those layers (lock held)"""
+        moved = {layer: mark for layer, mark in seen.items() if mark > self.marks[layer]}
+        self.marks.update(moved)
+        return moved
+
+    def _notify(self, moved: Dict[str, int]):
+        if moved and self.on_change is not None:
+            try:
+                self.on_change(moved)
+            except Exception as e:
+                logger.warning(f"Tile data change handler failed: {e}")
+
+    def rebuild(self) -> int:
+        """Drop and reload every layer index (after updates or deletes)"""
+        with self._lock:
+            for index in self.indexes.values():
+                index.clear()
+            self._last_ids = {table: 0 for table in SPATIAL_TABLES}
+            return self.refresh(force=True)
+
+    def add(self, table: str, row: Dict) -> Optional[str]:
+        """Index a row right after inserting it; returns the tile layer it went to
+
+        ``row`` carries the table's columns with ``geometry`` as GeoJSON.
+        """
+        row = dict(row)
+        geometry = _parse_geometry(row.pop('geometry', None))
+        bbox = geometry_bbox(geometry) if geometry else None
+        if bbox is None:
+            return None
+        built = SPATIAL_TABLES[table][1](row, geometry)
+        if built is None:
+            return None
+
+        with self._lock:
+            self.indexes[built[0]].insert(row['id'], bbox, built[1])
+            self._last_ids[table] = max(self._last_ids[table], row['id'])
+            moved = self._advance({built[0]: row['id']})
+        self._notify(moved)
+        return built[0]
+
+    def query(self, layer: str, lat_min: float, lon_min: float,
+              lat_max: float, lon_max: float) -> List[Dict]:
+        """Records of a tile layer whose bounding boxes intersect the bounds"""
+        if layer not in LAYER_TABLES:
+            return []
+        self.refresh()
+        if self.db_manager.is_postgis:
+            return self._query_postgis(layer, lat_min, lon_min, lat_max, lon_max)
+
+        with self._lock:
+            return self.indexes[layer].query(lon_min, lat_min, lon_max, lat_max)
+
+    def records(self, layer: str) -> List[Dict]:
+        """Every record of a tile layer (e.g. to build point clusters)"""
+        if layer not in LAYER_TABLES:
+            return []
+        self.refresh()
+        if self.db_manager.is_postgis:
+            return self._query_postgis(layer)
+
+        with self._lock:
+            return self.indexes[layer].records()
+
+    def _query_postgis(self, layer: str, lat_min: Optional[float] = None, lon_min: Optional[float] = None,
+                       lat_max: Optional[float] = None, lon_max: Optional[float] = None) -> List[Dict]:
+        table = LAYER_TABLES[layer]
+        columns = SPATIAL_TABLES[table][0]
+        conditions, params = [], {}
+        if lat_min is not None:
+            conditions.append("geometry && ST_MakeEnvelope(:lon_min, :lat_min, :lon_max, :lat_max, 4326)")
+            params.update({'lon_min': lon_min, 'lat_min': lat_min, 'lon_max': lon_max, 'lat_max': lat_max})
+        if table == 'patta_holders':
+            conditions.append("lower(trim(claim_type)) = :claim_type")
+            params['claim_type'] = layer
+        sql = f"SELECT {columns}, ST_AsGeoJSON(geometry) AS geojson FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(sql), params).fetchall()
+        except Exception as e:
+            logger.error(f"PostGIS tile query failed for {layer}: {e}")
+            return []
+        return [record for _, _, record, _ in self._records(table, rows)]